@@ -0,0 +1,200 @@
+"""
+Headless batch clustering: no window, no pygame.
+
+    python Scripts/Kmeans_Batch.py data/*.csv --algorithm kmeans --k 5 --out results --jobs 4
+
+Each input CSV is read like the game's CSV import (x, y in the first two
+columns, header optional) and clustered to convergence with the same engines
+the visualizer animates. For every input it writes, into --out:
+
+- <name>_labels.csv: x, y, cluster (-1 = DBSCAN noise), streamed in chunks
+- <name>_summary.json: iterations, inertia, cluster sizes, wall time, settings
+
+<name> is the file name without its extension; inputs that share one (e.g.
+a/points.csv and b/points.csv) get _2, _3, ... in command-line order.
+
+--play-area scales the points into the game's play area first (as the
+visualizer does on import), so eps means the same pixels as in the game.
+--jobs N clusters N files at once on a process pool. The exit status is 1
+if any file failed.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+import config
+import csv_io
+from clustering import datasets, fit, pool, seeding
+
+
+# Rows per write when streaming the labeled CSV
+_ROW_CHUNK = 65536
+
+
+def _area():
+    # The game's datasets.play_area() without its pygame imports
+    return datasets.play_area(
+        config.WIDTH, config.HEIGHT, config.SIDE_MARGIN, config.TOP_MARGIN, config.UI_PANEL_HEIGHT + 20
+    )
+
+
+def write_labels(path, x, y, labels):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["x", "y", "cluster"])
+        for s in range(0, x.shape[0], _ROW_CHUNK):
+            e = s + _ROW_CHUNK
+            writer.writerows(zip(x[s:e].tolist(), y[s:e].tolist(), labels[s:e].tolist()))
+
+
+def summarize(result, n):
+    labels = result.labels
+    sizes = np.bincount(labels[labels >= 0]) if n else np.zeros(0, dtype=np.int64)
+    return {
+        "points": int(n),
+        "iterations": int(result.iterations),
+        "inertia": result.inertia,
+        "clusters": int(result.n_clusters),
+        "cluster_sizes": [int(c) for c in sizes],
+        "noise": int((labels < 0).sum()),
+    }
+
+
+def fit_params(args):
+    if args.algorithm == "dbscan":
+        return {"eps": args.eps, "min_samples": args.min_samples, "workers": args.workers}
+    params = {"k": args.k, "seed": args.seed, "max_iter": args.max_iter}
+    if args.seeding is not None:
+        params["init"] = args.seeding
+    if args.algorithm == "minibatch":
+        params["batch_size"] = args.batch_size
+    return params
+
+
+def output_names(paths):
+    """
+    Output name per input: the file name without extension, plus _2, _3, ...
+    for repeats (compared case-insensitively, for Windows and macOS).
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    # A suffixed name must not collide with another input's own name either.
+    inputs = {stem.lower() for stem in stems}
+    used = set()
+    names = []
+    for stem in stems:
+        name = stem
+        i = 2
+        while name.lower() in used or (name != stem and name.lower() in inputs):
+            name = f"{stem}_{i}"
+            i += 1
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def run_file(path, out_dir, algorithm, params, play_area, name=None):
+    """Cluster one CSV and write its outputs as <name>_*. Returns the summary dict."""
+    start = time.perf_counter()
+    xy = csv_io.read_xy_from_csv(path)
+    if not xy:
+        raise ValueError("no (x, y) rows")
+    x = np.array([p[0] for p in xy], dtype=np.float64)
+    y = np.array([p[1] for p in xy], dtype=np.float64)
+    fx, fy = datasets.fit_to_area(x, y, _area()) if play_area else (x, y)
+
+    result = fit.fit(fx, fy, algorithm, **params)
+
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    write_labels(os.path.join(out_dir, f"{name}_labels.csv"), x, y, result.labels)
+    summary = {"input": os.path.abspath(path), "algorithm": algorithm, "params": params, "play_area": play_area}
+    summary.update(summarize(result, x.shape[0]))
+    summary["wall_time_s"] = round(time.perf_counter() - start, 6)
+    with open(os.path.join(out_dir, f"{name}_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cluster CSV files without a window.")
+    parser.add_argument("inputs", nargs="+", help="CSV files with x, y in the first two columns")
+    parser.add_argument("--algorithm", choices=fit.ALGORITHMS, default="kmeans")
+    parser.add_argument("--k", type=int, default=3, help="clusters (k-means variants, k-medoids)")
+    parser.add_argument("--eps", type=float, default=45.0, help="DBSCAN neighborhood radius")
+    parser.add_argument("--min-samples", type=int, default=5, help="DBSCAN core point threshold")
+    parser.add_argument("--seeding", choices=seeding.METHODS, default=None, help="initial centers (default k-means++)")
+    parser.add_argument("--batch-size", type=int, default=256, help="mini-batch size")
+    parser.add_argument("--max-iter", type=int, default=fit.MAX_ITER)
+    parser.add_argument("--seed", type=int, default=None, help="random seed (same seed, same result)")
+    parser.add_argument("--play-area", action="store_true", help="scale points into the game's play area first")
+    parser.add_argument("--out", default=".", help="output directory")
+    parser.add_argument("--jobs", type=int, default=1, help="files clustered in parallel")
+    parser.add_argument("--workers", type=int, default=1, help="DBSCAN strip workers per file (with --jobs 1)")
+    return parser.parse_args(argv)
+
+
+def _report(path, summary=None, error=None):
+    if error is not None:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    else:
+        print(
+            f"{path}: {summary['points']} points, {summary['clusters']} clusters, "
+            f"{summary['iterations']} iterations, {summary['wall_time_s']:.3f}s"
+        )
+
+
+def _run_serial(args, params, names):
+    """Cluster the inputs one after another; returns the number that failed."""
+    failed = 0
+    for path, name in zip(args.inputs, names):
+        try:
+            _report(path, run_file(path, args.out, args.algorithm, params, args.play_area, name))
+        except Exception as e:
+            failed += 1
+            _report(path, error=e)
+    return failed
+
+
+def _run_parallel(args, params, names):
+    """Cluster one input per pool process; returns the number that failed."""
+    # Strip-parallel DBSCAN inside a job would oversubscribe.
+    if args.algorithm == "dbscan":
+        params = dict(params, workers=1)
+    executor = pool.get_pool(args.jobs)
+    futures = {
+        executor.submit(run_file, path, args.out, args.algorithm, params, args.play_area, name): path
+        for path, name in zip(args.inputs, names)
+    }
+    failed = 0
+    for future in as_completed(futures):
+        try:
+            _report(futures[future], future.result())
+        except Exception as e:
+            failed += 1
+            _report(futures[future], error=e)
+    return failed
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    names = output_names(args.inputs)
+    for path, name in zip(args.inputs, names):
+        if name != os.path.splitext(os.path.basename(path))[0]:
+            print(f"{path}: name already used by another input, writing {name}_*", file=sys.stderr)
+
+    run = _run_serial if args.jobs <= 1 else _run_parallel
+    return 1 if run(args, fit_params(args), names) else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import multiprocessing
+
 from app import App
 
 
@@ -6,6 +8,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed by the DBSCAN worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
 
 
@@ -1,6 +1,9 @@
 import pygame
 
 import config
+import csv_io
+import perf
+import profiling
 from scenes.start_scene import StartScene
 
 
@@ -10,6 +13,11 @@ class App:
         self.screen = pygame.display.set_mode((config.WIDTH, config.HEIGHT))
         pygame.display.set_caption("Clustering Visualizer (K‑Means / K‑Medoids / DBSCAN)")
         self.clock = pygame.time.Clock()
+        # Per-phase frame timings (perf HUD / CSV dump in the game scene)
+        self.perf = perf.FrameTimings()
+        # On-demand cProfile / tracemalloc captures (hotkeys in the game scene)
+        self.cpu_profile = profiling.CpuProfile()
+        self.memory_snapshots = profiling.MemorySnapshots()
 
         # Fonts (shared across scenes)
         self.font = pygame.font.Font(None, 32)
@@ -56,15 +64,22 @@ class App:
             dt_ms = self.clock.tick(config.FPS)
             self.fps = self.clock.get_fps() if self.clock.get_fps() > 0 else config.FPS
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    break
-                self.scene.handle_event(event)
+            self.perf.begin_frame()
+            with self.perf.span("events"):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                        break
+                    self.scene.handle_event(event)
 
-            self.scene.update(dt_ms)
+            with self.perf.span("update"):
+                self.scene.update(dt_ms)
             self.scene.draw()
+            self.perf.end_frame()
 
+        # Keep a CPU profile that was still recording when the window closed
+        if self.cpu_profile.active:
+            self.cpu_profile.stop(csv_io.project_root(__file__))
         pygame.quit()
 
 
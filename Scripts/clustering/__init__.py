@@ -0,0 +1,9 @@
+"""
+Headless clustering core: plain NumPy on coordinate arrays, no pygame.
+
+- `fit`: fit an algorithm to (x, y) arrays -> labels, centers, inertia
+- `algorithms`, `kmedoids`, `dbscan_engine`: the step-wise engines the scene animates
+- `pointstore`: struct-of-arrays point / label store they work on
+- `seeding`, `metrics`, `datasets`: initial centers, WCSS / per-cluster stats, generators
+- `pool`, `restarts`, `elbow`: worker-process pool and the jobs that run on it
+"""
@@ -0,0 +1,325 @@
+"""
+Step-wise clustering on a `PointStore`: nearest-centroid assignment (with
+Hamerly bounds), centroid / medoid updates, mini-batch K-Means and DBSCAN.
+
+Functions that write labels accept an optional `on_change(changed)` callback,
+called with the indices whose label changed. The scene uses it to mirror
+labels onto its Point views and trigger visual feedback (see
+`scenes/feedback.py`); headless callers leave it out.
+"""
+
+import random
+
+import numpy as np
+
+from clustering import dbscan_engine
+
+
+# Rows per block when building point-to-centroid distance matrices (bounds peak
+# memory to _CHUNK * k floats regardless of dataset size).
+_CHUNK = 65536
+
+
+def centroid_arrays(centroids):
+    """Return centroid coordinates as two float64 arrays (cx, cy)."""
+    cx = np.fromiter((c.x for c in centroids), dtype=np.float64, count=len(centroids))
+    cy = np.fromiter((c.y for c in centroids), dtype=np.float64, count=len(centroids))
+    return cx, cy
+
+
+def nearest_centroids(x, y, cx, cy):
+    """Vectorized nearest-centroid search. Returns (labels, squared distances)."""
+    n = x.shape[0]
+    labels = np.empty(n, dtype=np.int32)
+    dist_sq = np.empty(n, dtype=np.float64)
+    for s in range(0, n, _CHUNK):
+        e = min(n, s + _CHUNK)
+        dx = x[s:e, None] - cx[None, :]
+        dy = y[s:e, None] - cy[None, :]
+        d = dx * dx + dy * dy
+        lab = d.argmin(axis=1)
+        labels[s:e] = lab
+        dist_sq[s:e] = d[np.arange(e - s), lab]
+    return labels, dist_sq
+
+
+def _two_nearest(x, y, cx, cy):
+    """Nearest label plus distances (not squared) to the nearest and second-nearest centroid."""
+    n = x.shape[0]
+    labels = np.empty(n, dtype=np.int32)
+    d1 = np.empty(n, dtype=np.float64)
+    d2 = np.full(n, np.inf, dtype=np.float64)
+    for s in range(0, n, _CHUNK):
+        e = min(n, s + _CHUNK)
+        dx = x[s:e, None] - cx[None, :]
+        dy = y[s:e, None] - cy[None, :]
+        d = dx * dx + dy * dy
+        lab = d.argmin(axis=1)
+        rows = np.arange(e - s)
+        labels[s:e] = lab
+        d1[s:e] = d[rows, lab]
+        if d.shape[1] > 1:
+            d[rows, lab] = np.inf
+            d2[s:e] = d.min(axis=1)
+    return labels, np.sqrt(d1), np.sqrt(d2)
+
+
+class HamerlyAssigner:
+    """
+    Triangle-inequality accelerated assignment (Hamerly's bounds).
+
+    Per point it keeps an upper bound on the distance to the assigned centroid
+    and one lower bound on the distance to every other centroid. Between steps
+    the bounds are loosened by how far centroids moved; a point whose upper
+    bound stays below max(lower bound, half the gap to the nearest other
+    centroid) cannot change cluster, so no distances are computed for it.
+
+    Hamerly (one lower bound) rather than Elkan (k lower bounds) because with
+    2D points and k <= 10 the extra bounds cost more memory traffic than the
+    distances they save.
+
+    `last_evaluated` / `last_skipped` count point-to-centroid distance
+    evaluations performed / avoided by the most recent call.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._version = None
+        self._labels = None
+        self._upper = None
+        self._lower = None
+        self._cx = None
+        self._cy = None
+        self.last_evaluated = 0
+        self.last_skipped = 0
+
+    def _is_valid(self, store, k):
+        if self._labels is None or self._cx.shape[0] != k:
+            return False
+        m = self._labels.shape[0]
+        if self._version != store.version:
+            # Points appended since the last call can be absorbed; removals cannot.
+            if store.clear_version > self._version or store.n < m:
+                return False
+        # Labels rewritten elsewhere (reset, DBSCAN, medoid swap) void the bounds
+        return np.array_equal(self._labels, store.cluster[:m])
+
+    def _extend(self, store):
+        """Give appended points exact bounds against the previous centroid positions."""
+        m = self._labels.shape[0]
+        lab, up, low = _two_nearest(store.x[m:], store.y[m:], self._cx, self._cy)
+        self._labels = np.concatenate([self._labels, lab])
+        self._upper = np.concatenate([self._upper, up])
+        self._lower = np.concatenate([self._lower, low])
+        return lab.shape[0] * self._cx.shape[0]
+
+    def assign(self, store, cx, cy):
+        """Return nearest-centroid labels for every point in `store`."""
+        n = store.n
+        k = cx.shape[0]
+        x, y = store.x, store.y
+
+        if not self._is_valid(store, k):
+            labels, upper, lower = _two_nearest(x, y, cx, cy)
+            evaluated = n * k
+        else:
+            evaluated = self._extend(store) if self._labels.shape[0] < n else 0
+            labels = self._labels.copy()
+            move = np.hypot(cx - self._cx, cy - self._cy)
+            upper = self._upper + move[labels]
+
+            if k > 1:
+                # Lower bound drops by the largest move among the *other* centroids.
+                order = np.argsort(move)
+                fastest, runner_up = move[order[-1]], move[order[-2]]
+                lower = self._lower - np.where(labels == order[-1], runner_up, fastest)
+
+                gap = np.hypot(cx[:, None] - cx[None, :], cy[:, None] - cy[None, :])
+                np.fill_diagonal(gap, np.inf)
+                half_gap = 0.5 * gap.min(axis=1)
+            else:
+                lower = self._lower
+                half_gap = np.full(1, np.inf)
+
+            bound = np.maximum(half_gap[labels], lower)
+            cand = np.flatnonzero(upper > bound)
+
+            # Tighten the upper bound with one exact distance, then re-test.
+            lc = labels[cand]
+            upper[cand] = np.hypot(x[cand] - cx[lc], y[cand] - cy[lc])
+            evaluated += cand.size
+            cand = cand[upper[cand] > bound[cand]]
+
+            if cand.size:
+                lab2, up2, low2 = _two_nearest(x[cand], y[cand], cx, cy)
+                labels[cand] = lab2
+                upper[cand] = up2
+                lower[cand] = low2
+                evaluated += cand.size * k
+
+        self._version = store.version
+        self._labels = labels
+        self._upper = upper
+        self._lower = lower
+        self._cx = cx.copy()
+        self._cy = cy.copy()
+        self.last_evaluated = int(evaluated)
+        self.last_skipped = int(n * k - evaluated)
+        return labels
+
+
+def nearest_centroid_index(x, y, centroids):
+    """Index of the centroid nearest to a single (x, y) position."""
+    best_i = 0
+    best_d = float("inf")
+    for i, c in enumerate(centroids):
+        dx = c.x - x
+        dy = c.y - y
+        d = dx * dx + dy * dy
+        if d < best_d:
+            best_d = d
+            best_i = i
+    return best_i
+
+
+def _move_centroid(centroid, x, y):
+    centroid.x = x
+    centroid.y = y
+    centroid.target_x = x
+    centroid.target_y = y
+
+
+def assign_clusters(store, centroids, assigner=None, on_change=None):
+    """
+    Assign each point to the nearest centroid. Returns True if no assignments changed.
+
+    Pass a `HamerlyAssigner` (kept across steps) to skip distance work for points
+    whose bounds prove they cannot switch cluster.
+    """
+    if not store.n or not centroids:
+        return True
+
+    cx, cy = centroid_arrays(centroids)
+    if assigner is not None:
+        labels = assigner.assign(store, cx, cy)
+    else:
+        labels, _dist_sq = nearest_centroids(store.x, store.y, cx, cy)
+    changed = store.set_labels(labels)
+    if on_change is not None:
+        on_change(changed)
+    return changed.size == 0
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch K-Means (Sculley, 2010) update state.
+
+    Each step samples `batch_size` points, assigns only those, and pulls each
+    centroid towards its batch members with a per-centroid learning rate of
+    1 / (points it has absorbed so far). A step costs O(batch_size * k) no
+    matter how large the dataset is; only the sampled points get new labels.
+    """
+
+    def __init__(self, seed=None):
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.counts = None
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(32))
+        self.last_shift = 0.0
+        self.last_inertia = 0.0
+
+    def step(self, store, centroids, batch_size, on_change=None):
+        """Run one mini-batch update. Returns the number of sampled points that changed cluster."""
+        if not store.n or not centroids:
+            return 0
+
+        k = len(centroids)
+        if self.counts is None or self.counts.shape[0] != k:
+            self.counts = np.zeros(k, dtype=np.float64)
+
+        batch = self._rng.integers(0, store.n, size=max(1, min(int(batch_size), store.n)))
+        bx = store.x[batch]
+        by = store.y[batch]
+        cx, cy = centroid_arrays(centroids)
+        labels, dist_sq = nearest_centroids(bx, by, cx, cy)
+
+        # Sequential per-sample updates with eta = 1 / count collapse to a
+        # running mean per centroid: c' = (v * c + sum(batch members)) / (v + m).
+        m = np.bincount(labels, minlength=k)
+        sum_x = np.bincount(labels, weights=bx, minlength=k)
+        sum_y = np.bincount(labels, weights=by, minlength=k)
+        hit = m > 0
+        v = self.counts
+        new_v = v + m
+        nx = cx.copy()
+        ny = cy.copy()
+        nx[hit] = (v[hit] * cx[hit] + sum_x[hit]) / new_v[hit]
+        ny[hit] = (v[hit] * cy[hit] + sum_y[hit]) / new_v[hit]
+        self.counts = new_v
+
+        for i in np.flatnonzero(hit):
+            _move_centroid(centroids[i], float(nx[i]), float(ny[i]))
+
+        self.last_shift = float(np.hypot(nx - cx, ny - cy).max())
+        # Unbiased estimate of the full-data WCSS from the batch
+        self.last_inertia = float(dist_sq.mean() * store.n)
+
+        changed = store.set_labels_at(batch, labels)
+        if on_change is not None:
+            on_change(changed)
+        return int(changed.size)
+
+
+def update_centroids(store, centroids):
+    """Move centroids to the mean of their clusters (from the store's running sums)."""
+    if not store.n or not centroids:
+        return
+    counts, sum_x, sum_y = store.cluster_sums(len(centroids))
+    for i in np.flatnonzero(counts):
+        _move_centroid(centroids[i], float(sum_x[i] / counts[i]), float(sum_y[i] / counts[i]))
+
+
+def update_medoids(store, centroids, engine):
+    """Move medoids using a `kmedoids.KMedoidsEngine` (FastPAM swaps or CLARA, by dataset size)."""
+    if not store.n or not centroids:
+        return
+    cx, cy = centroid_arrays(centroids)
+    medoids = engine.update(store, cx, cy)
+    for centroid, j in zip(centroids, medoids.tolist()):
+        _move_centroid(centroid, float(store.x[j]), float(store.y[j]))
+
+
+def dbscan(store, eps, min_samples, graph=None, workers=1, on_change=None):
+    """
+    Density-based clustering (DBSCAN), computed by the vectorized grid engine
+    in `dbscan_engine.py`.
+
+    - eps: neighborhood radius (in the same coordinate system as the store x/y, i.e. pixels)
+    - min_samples: minimum number of points (including the point itself) required to form a core point
+    - graph: optional `dbscan_engine.NeighborGraph`; repeated calls on the same
+      dataset then relabel from cached neighbor distances
+    - workers: process-pool size for large uncached runs (1 = serial)
+
+    Writes cluster labels into store.cluster:
+    - -1 = noise
+    - 0..(k-1) = cluster id
+
+    Returns the number of clusters found.
+    """
+    if not store.n:
+        return 0
+
+    eps = float(max(1.0, eps))
+    min_samples = int(max(1, min_samples))
+    if graph is not None:
+        labels, n_clusters = graph.labels(store, eps, min_samples)
+    else:
+        labels, n_clusters = dbscan_engine.parallel_dbscan_labels(store.x, store.y, eps, min_samples, workers=workers)
+    changed = store.set_labels(labels)
+    if on_change is not None:
+        on_change(changed)
+
+    return n_clusters
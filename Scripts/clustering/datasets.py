@@ -0,0 +1,144 @@
+"""
+Dataset generators returning (x, y) float64 arrays inside a rectangular area
+`(left, top, right, bottom)`. Shapes are laid out relative to the area, so the
+same call works for the game window and for headless runs.
+
+`rng` is a NumPy Generator or a seed (same seed, same dataset).
+"""
+
+import numpy as np
+
+
+DEFAULT_AREA = (80, 80, 1120, 640)
+
+
+def play_area(width, height, side_margin, top_margin, bottom_margin):
+    """
+    (left, top, right, bottom) left free inside a `width` x `height` window
+    by the given margins; at least one pixel wide and tall.
+    """
+    return (
+        side_margin,
+        top_margin,
+        max(side_margin + 1, int(width) - side_margin),
+        max(top_margin + 1, int(height) - bottom_margin),
+    )
+
+
+def _clamp(x, y, area):
+    left, top, right, bottom = area
+    return np.clip(x, left, right), np.clip(y, top, bottom)
+
+
+def uniform(n, area=DEFAULT_AREA, rng=None):
+    rng = np.random.default_rng(rng)
+    left, top, right, bottom = area
+    return rng.uniform(left, right, n), rng.uniform(top, bottom, n)
+
+
+def _crowded(grid, x, y, px, py, cell, min_dist_sq):
+    """True if a placed point in the 3x3 cells around (px, py) is closer than min_dist."""
+    gx = int(px // cell)
+    gy = int(py // cell)
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            for j in grid.get((gx + ox, gy + oy), ()):
+                if (x[j] - px) ** 2 + (y[j] - py) ** 2 < min_dist_sq:
+                    return True
+    return False
+
+
+def spaced_random(n, min_dist=25, max_tries_per_point=250, area=DEFAULT_AREA, rng=None):
+    """
+    Integer points at least `min_dist` apart (rejection sampling against a
+    grid of min_dist cells). A point that finds no free spot in
+    `max_tries_per_point` tries goes anywhere; later points are still spaced.
+    """
+    rng = np.random.default_rng(rng)
+    left, top, right, bottom = area
+    right = max(left + 1, right)
+    bottom = max(top + 1, bottom)
+    x = np.empty(n)
+    y = np.empty(n)
+    min_dist_sq = min_dist * min_dist
+    cell = max(1.0, float(min_dist))
+    grid = {}
+    for i in range(n):
+        for _try in range(max_tries_per_point):
+            px = float(rng.integers(left, right, endpoint=True))
+            py = float(rng.integers(top, bottom, endpoint=True))
+            if not _crowded(grid, x, y, px, py, cell, min_dist_sq):
+                break
+        else:
+            # No free spot found: this point goes anywhere.
+            px = float(rng.integers(left, right, endpoint=True))
+            py = float(rng.integers(top, bottom, endpoint=True))
+        x[i] = px
+        y[i] = py
+        grid.setdefault((int(px // cell), int(py // cell)), []).append(i)
+    return x, y
+
+
+def blobs(n, centers=3, spread=40.0, area=DEFAULT_AREA, rng=None):
+    """Gaussian blobs around `centers` random centers; any remainder is uniform noise."""
+    rng = np.random.default_rng(rng)
+    left, top, right, bottom = area
+    per = max(1, n // centers)
+    count = min(n, per * centers)
+    bx = rng.uniform(left + 170, max(left + 171, right - 170), centers)
+    by = rng.uniform(top + 120, max(top + 121, bottom - 140), centers)
+    owner = np.repeat(np.arange(centers), per)[:count]
+    angle = rng.uniform(0, 2 * np.pi, count)
+    radius = rng.normal(0, spread, count)
+    x, y = _clamp(bx[owner] + radius * np.cos(angle), by[owner] + radius * np.sin(angle), area)
+    ux, uy = uniform(n - count, area, rng)
+    return np.concatenate([x, ux]), np.concatenate([y, uy])
+
+
+def moons(n, area=DEFAULT_AREA, rng=None):
+    """Two interleaved half rings."""
+    rng = np.random.default_rng(rng)
+    left, top, right, bottom = area
+    mx = (left + right) / 2
+    my = (top + bottom) / 2
+    half = n // 2
+    angle = np.concatenate([rng.uniform(0, np.pi, half), rng.uniform(np.pi, 2 * np.pi, n - half)])
+    radius = rng.uniform(60, 100, n)
+    ox = np.where(np.arange(n) < half, mx - 150, mx + 150)
+    oy = np.where(np.arange(n) < half, my - 80, my + 70)
+    return _clamp(ox + radius * np.cos(angle), oy + radius * np.sin(angle), area)
+
+
+def circles(n, area=DEFAULT_AREA, rng=None):
+    """A small disk-shaped ring inside a larger ring (a third of the points inside)."""
+    rng = np.random.default_rng(rng)
+    left, top, right, bottom = area
+    cx = (left + right) / 2
+    cy = (top + bottom) / 2 - 40
+    inner = n // 3
+    angle = rng.uniform(0, 2 * np.pi, n)
+    radius = np.concatenate([rng.uniform(30, 70, inner), rng.uniform(120, 180, n - inner)])
+    return _clamp(cx + radius * np.cos(angle), cy + radius * np.sin(angle), area)
+
+
+def fit_to_area(x, y, area=DEFAULT_AREA):
+    """Scale raw coordinates linearly so their bounding box fills `area` (as CSV imports are shown)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if not x.size:
+        return x, y
+    left, top, right, bottom = area
+    dx = float(x.max() - x.min()) or 1.0
+    dy = float(y.max() - y.min()) or 1.0
+    return (
+        left + (x - x.min()) / dx * max(1, right - left),
+        top + (y - y.min()) / dy * max(1, bottom - top),
+    )
+
+
+GENERATORS = {
+    "random": spaced_random,
+    "blobs": blobs,
+    "moons": moons,
+    "circles": circles,
+}
@@ -0,0 +1,491 @@
+"""
+Vectorized grid DBSCAN.
+
+Points are bucketed into eps-sized grid cells (the same `x // eps` cells the
+original spatial hash used) and sorted by cell id, so every cell is a
+contiguous slice. Each cell is paired with itself and its four forward
+neighbor cells (so every unordered pair of cells is visited once):
+- dense cell pairs are tested as broadcast distance blocks over the two slices
+- sparse ones are flattened into candidate point pairs and tested in chunks
+
+A first pass counts neighbors; a second one joins core points with a
+vectorized union-find and attaches border points.
+
+`parallel_dbscan_labels` splits the data into vertical strips, runs the same
+two passes per strip in a process pool, and merges strips with the same
+union-find.
+
+Labels match the classic sequential expansion exactly:
+- clusters are the connected components of the core points, numbered in the
+  order of their lowest point index
+- a border point joins the lowest-numbered cluster among its core neighbors
+- everything else is noise (-1)
+"""
+
+import numpy as np
+
+from clustering import pool
+from clustering.pointstore import NOISE
+
+
+# Candidate pairs tested per vectorized chunk (bounds peak memory)
+_PAIR_CHUNK = 1 << 22
+# Cell pairs with at least this many candidate pairs are tested as blocks
+_BLOCK_MIN = 1024
+# Below this many points the parallel engine runs serially (pool overhead wins)
+PARALLEL_MIN_POINTS = 50_000
+# NeighborGraph memory cap, in candidate pairs (about a third are kept, at
+# 16 bytes each)
+GRAPH_MAX_PAIRS = 20_000_000
+
+
+class Grid:
+    """Points sorted by eps-sized cell, plus the cell pairs worth testing."""
+
+    def __init__(self, x, y, eps):
+        gx = np.floor_divide(x, eps).astype(np.int64)
+        gy = np.floor_divide(y, eps).astype(np.int64)
+        # One-cell border so neighbor offsets never wrap around a row
+        gx -= gx.min() - 1
+        gy -= gy.min() - 1
+        width = int(gx.max()) + 2
+        key = gy * width + gx
+        self.order = np.argsort(key, kind="stable")
+        self.xs = x[self.order]
+        self.ys = y[self.order]
+        self.n = x.shape[0]
+
+        ukeys, starts, counts = np.unique(key[self.order], return_index=True, return_counts=True)
+        self.starts = starts
+        self.ends = starts + counts
+        ncells = ukeys.shape[0]
+
+        cell_a = [np.arange(ncells)]
+        cell_b = [np.arange(ncells)]
+        for offset in (1, width - 1, width, width + 1):
+            target = ukeys + offset
+            idx = np.minimum(np.searchsorted(ukeys, target), ncells - 1)
+            found = ukeys[idx] == target
+            cell_a.append(np.flatnonzero(found))
+            cell_b.append(idx[found])
+        cell_a = np.concatenate(cell_a)
+        cell_b = np.concatenate(cell_b)
+        size = counts[cell_a] * counts[cell_b]
+        # Upper bound on within-eps pairs (each unordered pair once)
+        self.candidate_pairs = int((size - np.where(cell_a == cell_b, (size + counts[cell_a]) // 2, 0)).sum())
+        big = size >= _BLOCK_MIN
+        self.blocks = np.stack([cell_a[big], cell_b[big]], axis=1)
+
+        # Sparse pairs become rows (point p, partner slice [lo, hi)); within a
+        # cell only later points are partners.
+        cell_a = cell_a[~big]
+        cell_b = cell_b[~big]
+        rows = counts[cell_a]
+        self.src = np.repeat(starts[cell_a], rows) + _ramp(rows)
+        same = np.repeat(cell_a == cell_b, rows)
+        self.lo = np.where(same, self.src + 1, np.repeat(starts[cell_b], rows))
+        self.hi = np.repeat(self.ends[cell_b], rows)
+
+    def block_slices(self):
+        """Yield (a slice, b slice, same cell) for every dense cell pair."""
+        for a, b in self.blocks.tolist():
+            yield slice(self.starts[a], self.ends[a]), slice(self.starts[b], self.ends[b]), a == b
+
+    def pairs(self, eps_sq):
+        """Yield (i, j, d2) chunks of sparse candidate pairs within eps (sorted positions)."""
+        xs, ys = self.xs, self.ys
+        lens = np.maximum(self.hi - self.lo, 0)
+        cum = np.cumsum(lens)
+        start = 0
+        while start < lens.shape[0]:
+            base = int(cum[start - 1]) if start else 0
+            end = max(start + 1, int(np.searchsorted(cum, base + _PAIR_CHUNK, side="right")))
+            run = lens[start:end]
+            total = int(run.sum())
+            if total:
+                src = self.src[start:end]
+                i = np.repeat(src, run)
+                j = np.repeat(self.lo[start:end] - (cum[start:end] - run - base), run) + np.arange(total)
+                dx = np.repeat(xs[src], run) - xs[j]
+                dy = np.repeat(ys[src], run) - ys[j]
+                d2 = dx * dx + dy * dy
+                hit = d2 <= eps_sq
+                yield i[hit], j[hit], d2[hit]
+            start = end
+
+    def block_d2(self, sa, sb):
+        """|a| x |b| squared distances between two cell slices."""
+        dx = self.xs[sa, None] - self.xs[None, sb]
+        dy = self.ys[sa, None] - self.ys[None, sb]
+        dx *= dx
+        dy *= dy
+        dx += dy
+        return dx
+
+    def block_hits(self, sa, sb, eps_sq):
+        """Boolean |a| x |b| within-eps matrix for two cell slices."""
+        return self.block_d2(sa, sb) <= eps_sq
+
+
+def _ramp(lengths):
+    """Concatenated aranges: [0..l0-1, 0..l1-1, ...]."""
+    total = int(lengths.sum())
+    return np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+
+def _compress(parent):
+    """Point every node straight at its root (pointer jumping)."""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent[:] = grand
+
+
+def find(parent, idx):
+    """Roots of `idx`; the visited nodes are re-pointed at their roots."""
+    root = parent[idx]
+    while True:
+        up = parent[root]
+        if np.array_equal(up, root):
+            parent[idx] = root
+            return root
+        root = up
+
+
+def union(parent, a, b):
+    """Vectorized union-find: merge the sets of every edge (a[t], b[t])."""
+    while a.size:
+        if a.size * 4 >= parent.shape[0]:
+            # Many edges: pointer-jump the whole forest (O(n log depth)).
+            _compress(parent)
+            ra = parent[a]
+            rb = parent[b]
+        else:
+            ra = find(parent, a)
+            rb = find(parent, b)
+        diff = ra != rb
+        if not diff.any():
+            return
+        a, b, ra, rb = a[diff], b[diff], ra[diff], rb[diff]
+        # Hook the larger root under the smaller one; conflicting hooks are
+        # resolved on the next round.
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+
+
+def label_components(core, parent, index, border, border_core):
+    """
+    Number core components by their lowest `index` and attach border points to
+    the lowest-numbered neighboring cluster. Returns (labels, cluster count).
+    """
+    n = core.shape[0]
+    big = np.iinfo(np.int64).max
+    _compress(parent)
+    root = parent[core]
+    first = np.full(n, big, dtype=np.int64)
+    np.minimum.at(first, root, index[core])
+    roots = np.flatnonzero(first < big)
+    cid = np.full(n, -1, dtype=np.int64)
+    cid[roots[np.argsort(first[roots], kind="stable")]] = np.arange(roots.shape[0])
+
+    labels = np.full(n, NOISE, dtype=np.int64)
+    labels[core] = cid[root]
+    if border.size:
+        best = np.full(n, big, dtype=np.int64)
+        np.minimum.at(best, border, cid[parent[border_core]])
+        hit = best < big
+        labels[hit] = best[hit]
+    return labels, int(roots.shape[0])
+
+
+def neighbor_counts(grid, eps_sq):
+    """Neighbors within eps of every sorted point, the point itself included."""
+    n = grid.n
+    counts = np.ones(n, dtype=np.int64)
+    for sa, sb, same in grid.block_slices():
+        hits = grid.block_hits(sa, sb, eps_sq)
+        if same:
+            counts[sa] += hits.sum(axis=1) - 1
+        else:
+            counts[sa] += hits.sum(axis=1)
+            counts[sb] += hits.sum(axis=0)
+    for i, j, _d2 in grid.pairs(eps_sq):
+        counts += np.bincount(i, minlength=n)
+        counts += np.bincount(j, minlength=n)
+    return counts
+
+
+def _link(parent, core, i, j, border, border_core):
+    """Union core-core pairs; record (border, core) pairs."""
+    ci = core[i]
+    cj = core[j]
+    both = ci & cj
+    union(parent, i[both], j[both])
+    for b, c, mask in ((j, i, ci & ~cj), (i, j, cj & ~ci)):
+        if mask.any():
+            border.append(b[mask])
+            border_core.append(c[mask])
+
+
+def _link_block(parent, core, grid, sa, sb, same, eps_sq, border, border_core):
+    """
+    `_link` for a dense cell pair. Core components inside the block are found
+    by min-label propagation first, so the union-find sees one edge per core
+    point instead of one per within-eps pair.
+    """
+    a = np.arange(sa.start, sa.stop)
+    b = np.arange(sb.start, sb.stop)
+    ca = core[sa]
+    cb = core[sb]
+    la = find(parent, a[ca])
+    lb = find(parent, b[cb])
+    all_core = ca.all() and cb.all()
+    if all_core and la.min() == la.max() == lb.min() == lb.max():
+        return  # already one component, no border points
+
+    hits = grid.block_hits(sa, sb, eps_sq)
+    if not all_core:
+        # (border, core) pairs in both directions; a same-cell block is symmetric.
+        bi, bj = np.nonzero(hits & ~ca[:, None] & cb[None, :])
+        border.append(a[bi])
+        border_core.append(b[bj])
+        if not same:
+            bi, bj = np.nonzero(hits & ca[:, None] & ~cb[None, :])
+            border.append(b[bj])
+            border_core.append(a[bi])
+        if not (la.size and lb.size):
+            return
+        hits = hits[ca][:, cb]
+
+    big = parent.shape[0]
+    while True:
+        na = np.minimum(la, np.where(hits, lb[None, :], big).min(axis=1))
+        nb = np.minimum(lb, np.where(hits, na[:, None], big).min(axis=0))
+        if np.array_equal(na, la) and np.array_equal(nb, lb):
+            break
+        la, lb = na, nb
+    union(parent, np.concatenate([a[ca], b[cb]]), np.concatenate([la, lb]))
+
+
+def link_core(grid, core, eps_sq):
+    """
+    Second pass: union-find over core pairs. Returns (parent, border, border_core)
+    where each (border[t], border_core[t]) is a non-core point and a core neighbor.
+    """
+    parent = np.arange(grid.n)
+    border = []
+    border_core = []
+    for sa, sb, same in grid.block_slices():
+        if core[sa].any() or core[sb].any():
+            _link_block(parent, core, grid, sa, sb, same, eps_sq, border, border_core)
+    for i, j, _d2 in grid.pairs(eps_sq):
+        _link(parent, core, i, j, border, border_core)
+
+    border = np.concatenate(border) if border else np.zeros(0, dtype=np.int64)
+    border_core = np.concatenate(border_core) if border_core else np.zeros(0, dtype=np.int64)
+    return parent, border, border_core
+
+
+def dbscan_labels(x, y, eps, min_samples):
+    """
+    DBSCAN labels for coordinate arrays. `min_samples` counts the point itself.
+    Returns (int32 labels in input order, number of clusters).
+    """
+    n = x.shape[0]
+    if not n:
+        return np.zeros(0, dtype=np.int32), 0
+    eps = float(eps)
+    eps_sq = eps * eps
+
+    grid = Grid(x, y, eps)
+    core = neighbor_counts(grid, eps_sq) >= min_samples
+    parent, border, border_core = link_core(grid, core, eps_sq)
+    labels, n_clusters = label_components(core, parent, grid.order, border, border_core)
+
+    out = np.empty(n, dtype=np.int32)
+    out[grid.order] = labels
+    return out, n_clusters
+
+
+def _strip_worker(x, y, owned, inner, eps, min_samples):
+    """
+    Cluster one strip. `owned` points lie in the strip, `inner` ones within eps
+    of it; the rest of the input is the outer halo (within 2 * eps), which only
+    makes the neighbor counts of inner points exact.
+
+    Returns local indices: owned core flags, (core point, root) pairs linking
+    inner core points, and (border, core) pairs for owned border points.
+    """
+    eps_sq = eps * eps
+    grid = Grid(x, y, eps)
+    core = neighbor_counts(grid, eps_sq) >= min_samples
+    # Only inner core flags are exact; halo points take no part in linking.
+    core &= inner[grid.order]
+    parent, border, border_core = link_core(grid, core, eps_sq)
+    _compress(parent)
+
+    order = grid.order
+    members = np.flatnonzero(core)
+    keep = owned[order[border]]
+    return (
+        core[np.argsort(order)][owned],
+        order[members],
+        order[parent[members]],
+        order[border[keep]],
+        order[border_core[keep]],
+    )
+
+
+def _strip_bounds(x, eps, strips):
+    """Equal-count x boundaries, merged until every strip is wider than 4 * eps."""
+    cuts = np.unique(np.quantile(x, np.linspace(0.0, 1.0, strips + 1)[1:-1]))
+    kept = []
+    last = x.min()
+    for c in cuts.tolist():
+        if c - last > 4 * eps and x.max() - c > 4 * eps:
+            kept.append(c)
+            last = c
+    return np.array(kept)
+
+
+def parallel_dbscan_labels(x, y, eps, min_samples, workers=None, strips=None, min_points=PARALLEL_MIN_POINTS):
+    """
+    `dbscan_labels` on a process pool. The x range is cut into `strips`
+    (default 2 per worker) equal-count strips; each worker gets its strip plus a
+    2 * eps halo, so its core flags and links are exact, and the parent process
+    merges the per-strip components with union-find. Labels are identical to
+    `dbscan_labels`.
+    """
+    n = x.shape[0]
+    workers = int(workers or pool.default_workers())
+    eps = float(eps)
+    cuts = _strip_bounds(x, eps, int(strips or 2 * workers)) if n else np.zeros(0)
+    if n < min_points or workers < 2 or not cuts.size:
+        return dbscan_labels(x, y, eps, min_samples)
+
+    lows = np.concatenate([[-np.inf], cuts])
+    highs = np.concatenate([cuts, [np.inf]])
+    strip_of = np.searchsorted(cuts, x, side="right")
+    jobs = []
+    for s in range(lows.shape[0]):
+        take = np.flatnonzero((x >= lows[s] - 2 * eps) & (x < highs[s] + 2 * eps))
+        if not take.size:
+            # Several cuts in one gap between points (e.g. strips > n): nothing to cluster
+            continue
+        xt = x[take]
+        inner = (xt >= lows[s] - eps) & (xt < highs[s] + eps)
+        jobs.append((take, (xt, y[take], strip_of[take] == s, inner, eps, min_samples)))
+
+    core = np.zeros(n, dtype=bool)
+    parent = np.arange(n)
+    border = []
+    border_core = []
+    executor = pool.get_pool(workers)
+    futures = [(take, executor.submit(_strip_worker, *args)) for take, args in jobs]
+    for (take, future), (_take, args) in zip(futures, jobs):
+        owned_core, members, roots, b, c = future.result()
+        core[take[args[2]]] = owned_core
+        union(parent, take[members], take[roots])
+        border.append(take[b])
+        border_core.append(take[c])
+
+    labels, n_clusters = label_components(core, parent, np.arange(n), np.concatenate(border), np.concatenate(border_core))
+    return labels.astype(np.int32), n_clusters
+
+
+class NeighborGraph:
+    """
+    Per-side DBSCAN cache: every pair within `max_eps`, sorted by distance.
+
+    Built once per dataset at `headroom` x the requested eps (or at eps itself
+    if that would exceed `max_pairs` candidates). Any eps <= max_eps is then a
+    prefix of the pair list and any min_samples a recount, so relabeling needs
+    no distance computations. Falls back to `parallel_dbscan_labels` when even
+    eps does not fit the budget.
+    """
+
+    def __init__(self, headroom=2.0, max_pairs=GRAPH_MAX_PAIRS, workers=1):
+        self.headroom = float(headroom)
+        self.max_pairs = int(max_pairs)
+        # Process-pool size for the uncached fallback
+        self.workers = int(workers)
+        self.reset()
+
+    def reset(self):
+        self._store = None
+        self._version = None
+        self.max_eps = 0.0
+        # Smallest eps known not to fit the budget for this dataset
+        self._too_big = float("inf")
+        self.order = None
+        self.i = self.j = self.d2 = None
+        # Whether the last `labels` call was served from the cache
+        self.last_cached = False
+
+    def _build(self, store, eps):
+        if self._store is not store or self._version != store.version:
+            self.reset()
+        if eps >= self._too_big:
+            return False
+        x, y = store.x, store.y
+        for max_eps in (eps * self.headroom, eps):
+            grid = Grid(x, y, max_eps)
+            if grid.candidate_pairs > self.max_pairs:
+                continue
+            eps_sq = max_eps * max_eps
+            ii, jj, dd = [], [], []
+            for sa, sb, same in grid.block_slices():
+                d2 = grid.block_d2(sa, sb)
+                hit = d2 <= eps_sq
+                if same:
+                    hit = np.triu(hit, 1)
+                i, j = np.nonzero(hit)
+                ii.append(i + sa.start)
+                jj.append(j + sb.start)
+                dd.append(d2[i, j])
+            for i, j, d2 in grid.pairs(eps_sq):
+                ii.append(i)
+                jj.append(j)
+                dd.append(d2)
+            d2 = np.concatenate(dd) if dd else np.zeros(0)
+            by_dist = np.argsort(d2, kind="stable")
+            self.d2 = d2[by_dist]
+            self.i = np.concatenate(ii).astype(np.int32)[by_dist] if ii else np.zeros(0, dtype=np.int32)
+            self.j = np.concatenate(jj).astype(np.int32)[by_dist] if jj else np.zeros(0, dtype=np.int32)
+            self.order = grid.order
+            self.max_eps = max_eps
+            self._store = store
+            self._version = store.version
+            return True
+        self._store = store
+        self._version = store.version
+        self._too_big = eps
+        return False
+
+    def labels(self, store, eps, min_samples):
+        """Same result as `dbscan_labels(store.x, store.y, eps, min_samples)`."""
+        eps = float(eps)
+        stale = self._store is not store or self._version != store.version
+        if (stale or eps > self.max_eps) and not self._build(store, eps):
+            self.last_cached = False
+            return parallel_dbscan_labels(store.x, store.y, eps, min_samples, workers=self.workers)
+        self.last_cached = True
+
+        n = store.n
+        m = int(np.searchsorted(self.d2, eps * eps, side="right"))
+        i = self.i[:m].astype(np.int64)
+        j = self.j[:m].astype(np.int64)
+        counts = 1 + np.bincount(i, minlength=n) + np.bincount(j, minlength=n)
+        core = counts >= min_samples
+
+        parent = np.arange(n)
+        border = []
+        border_core = []
+        _link(parent, core, i, j, border, border_core)
+        border = np.concatenate(border) if border else np.zeros(0, dtype=np.int64)
+        border_core = np.concatenate(border_core) if border_core else np.zeros(0, dtype=np.int64)
+        labels, n_clusters = label_components(core, parent, self.order, border, border_core)
+
+        out = np.empty(n, dtype=np.int32)
+        out[self.order] = labels
+        return out, n_clusters
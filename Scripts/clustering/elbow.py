@@ -0,0 +1,113 @@
+"""
+Elbow method (K vs inertia) on the shared worker pool.
+
+The coordinates are written once into a shared-memory buffer that every task
+attaches to by name, instead of each task receiving its own pickled copy.
+Each task fits a run of consecutive K values; with warm starts every K after
+the first starts from the K-1 solution plus one new center drawn with
+probability proportional to the squared distance to its centroid (a k-means++
+step), which usually converges in a few iterations.
+`GameScene` polls an `ElbowRun` every frame and draws results as they arrive.
+"""
+
+import numpy as np
+
+from clustering import algorithms, fit, pool, seeding
+
+
+# Lloyd iterations per K
+MAX_ITER = 50
+
+
+def fit_range(x, y, ks, warm_start, seed, method="kmeans++"):
+    """
+    Fit each K in `ks` (ascending). Returns [(k, inertia), ...]. Cold starts
+    use the `seeding` method `method`.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    rng = np.random.default_rng(seed)
+    results = []
+    cx = cy = None
+    for k in ks:
+        if warm_start and cx is not None and cx.shape[0] == k - 1:
+            _labels, dist_sq = algorithms.nearest_centroids(x, y, cx, cy)
+            total = dist_sq.sum()
+            j = int(rng.choice(n, p=dist_sq / total)) if total > 0 else int(rng.integers(n))
+            cx = np.append(cx, x[j])
+            cy = np.append(cy, y[j])
+        else:
+            pick = seeding.seed_points(x, y, k, method, rng)
+            cx = x[pick]
+            cy = y[pick]
+        result = fit.fit_kmeans(x, y, k, start=(cx, cy), max_iter=MAX_ITER)
+        cx, cy = result.cx, result.cy
+        results.append((k, result.inertia))
+    return results
+
+
+def _fit_range_shared(name, n, ks, warm_start, seed, method):
+    x, y = pool.attach_xy(name, n)
+    return fit_range(x, y, ks, warm_start, seed, method)
+
+
+class ElbowRun:
+    """
+    One elbow computation in flight. K = 1..max_k is split into up to
+    2 * workers runs of consecutive K (one task per K without warm starts).
+    """
+
+    def __init__(self, x, y, max_k, workers, warm_start=True, method="kmeans++", seed=None):
+        n = x.shape[0]
+        self.max_k = max(1, min(int(max_k), n))
+        self.results = {}
+        # K -> exception for every K whose task failed in the worker
+        self.errors = {}
+
+        self._shared = pool.SharedXY(x, y)
+
+        ks = np.arange(1, self.max_k + 1)
+        if warm_start:
+            runs = [r.tolist() for r in np.array_split(ks, min(self.max_k, 2 * max(1, int(workers))))]
+        else:
+            runs = [[k] for k in ks.tolist()]
+        seeds = np.random.SeedSequence(seed).generate_state(len(runs)).tolist()
+        executor = pool.get_pool(workers)
+        self._futures = {
+            executor.submit(_fit_range_shared, self._shared.name, n, run, warm_start, s, method): run
+            for run, s in zip(runs, seeds)
+        }
+
+    @property
+    def done(self):
+        return not self._futures
+
+    def failed(self):
+        """K values whose task raised, sorted."""
+        return sorted(self.errors)
+
+    def data(self):
+        """Finished (k, inertia) pairs, sorted by K."""
+        return sorted(self.results.items())
+
+    def poll(self):
+        """Collect finished tasks. Returns True if new results arrived."""
+        finished = [f for f in self._futures if f.done()]
+        for f in finished:
+            ks = self._futures.pop(f)
+            if f.cancelled():
+                continue
+            if f.exception() is not None:
+                self.errors.update((k, f.exception()) for k in ks)
+            else:
+                self.results.update(f.result())
+        if self.done:
+            self._shared.release()
+        return bool(finished)
+
+    def cancel(self):
+        for f in self._futures:
+            f.cancel()
+        self._futures = {}
+        self._shared.release()
@@ -0,0 +1,125 @@
+"""
+Array-level entry points: fit an algorithm to plain (x, y) coordinate arrays
+and get labels, centers and inertia back.
+
+These run the same step functions the scene animates (one step per frame
+there), to convergence, on a headless store. Worker-pool tasks (restarts,
+elbow), benchmarks and batch tools use them.
+"""
+
+import numpy as np
+
+from clustering import algorithms, kmedoids, metrics, seeding
+from clustering.pointstore import PointStore
+
+
+ALGORITHMS = ("kmeans", "kmedoids", "minibatch", "dbscan")
+# Step cap (Lloyd / swap steps; mini-batch steps get 10x)
+MAX_ITER = 100
+
+
+class Center:
+    """Position-only center for headless runs (the scene uses `entities.Centroid`)."""
+
+    def __init__(self, x, y):
+        self.x = self.target_x = float(x)
+        self.y = self.target_y = float(y)
+
+
+class FitResult:
+    """
+    Outcome of a fit: int32 `labels` (-1 = noise), center coordinates `cx` /
+    `cy` (empty for DBSCAN), `inertia` (WCSS; None for DBSCAN), the number of
+    steps run and the number of clusters.
+    """
+
+    def __init__(self, labels, cx, cy, inertia, iterations, n_clusters):
+        self.labels = labels
+        self.cx = cx
+        self.cy = cy
+        self.inertia = inertia
+        self.iterations = iterations
+        self.n_clusters = n_clusters
+
+
+def _centers(store, k, start, init, seed):
+    """Centers at `start` ((cx, cy) arrays) or at `seeding` picks for `init`."""
+    if start is None:
+        pick = seeding.seed_points(store.x, store.y, k, init, seed)
+        start = (store.x[pick], store.y[pick])
+    cx, cy = start
+    return [Center(a, b) for a, b in zip(np.asarray(cx).tolist(), np.asarray(cy).tolist())]
+
+
+def _result(store, centers, iterations):
+    cx, cy = algorithms.centroid_arrays(centers)
+    return FitResult(store.cluster.copy(), cx, cy, metrics.calculate_inertia(store, centers), iterations, len(centers))
+
+
+def fit_kmeans(x, y, k, init="kmeans++", seed=None, start=None, max_iter=MAX_ITER):
+    """Lloyd's K-Means until no label changes (Hamerly-accelerated assignment)."""
+    store = PointStore.from_xy(x, y)
+    centers = _centers(store, k, start, init, seed)
+    assigner = algorithms.HamerlyAssigner()
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        done = algorithms.assign_clusters(store, centers, assigner=assigner)
+        algorithms.update_centroids(store, centers)
+        if done:
+            break
+    return _result(store, centers, iterations)
+
+
+def fit_minibatch(x, y, k, init="kmeans++", seed=None, start=None, batch_size=256, tol=0.5, max_iter=MAX_ITER):
+    """Mini-batch K-Means until the largest centroid shift drops below `tol`, then one full assignment."""
+    store = PointStore.from_xy(x, y)
+    centers = _centers(store, k, start, init, seed)
+    minibatch = algorithms.MiniBatchKMeans(seed)
+    iterations = 0
+    for iterations in range(1, 10 * max_iter + 1):
+        minibatch.step(store, centers, batch_size)
+        if minibatch.last_shift < tol:
+            break
+    algorithms.assign_clusters(store, centers)
+    return _result(store, centers, iterations)
+
+
+def fit_kmedoids(
+    x, y, k, init=None, seed=None, start=None, pam_max_n=3000, sample_size=400, swap_budget=2, max_iter=MAX_ITER
+):
+    """
+    K-Medoids (FastPAM swaps up to `pam_max_n` points, CLARA above) until
+    labels are stable and no swap is pending. `init=None` starts small
+    datasets from PAM BUILD (as the scene does) and large ones from k-means++.
+    """
+    store = PointStore.from_xy(x, y)
+    engine = kmedoids.KMedoidsEngine(pam_max_n=pam_max_n, sample_size=sample_size, swap_budget=swap_budget, seed=seed)
+    if start is None and init is None and store.n <= pam_max_n:
+        pick = engine.build(store, k)
+        start = (store.x[pick], store.y[pick])
+    centers = _centers(store, k, start, init or "kmeans++", seed)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        done = algorithms.assign_clusters(store, centers)
+        algorithms.update_medoids(store, centers, engine)
+        if done and engine.settled:
+            break
+    return _result(store, centers, iterations)
+
+
+def fit_dbscan(x, y, eps, min_samples, workers=1):
+    """DBSCAN labels (one pass; large inputs use the strip-parallel engine when `workers` > 1)."""
+    store = PointStore.from_xy(x, y)
+    n_clusters = algorithms.dbscan(store, eps, min_samples, workers=workers)
+    empty = np.zeros(0)
+    return FitResult(store.cluster.copy(), empty, empty.copy(), None, 1, n_clusters)
+
+
+_FITTERS = {"kmeans": fit_kmeans, "kmedoids": fit_kmedoids, "minibatch": fit_minibatch, "dbscan": fit_dbscan}
+
+
+def fit(x, y, algorithm, **kwargs):
+    """Dispatch to fit_<algorithm> ("kmeans", "kmedoids", "minibatch" or "dbscan")."""
+    if algorithm not in _FITTERS:
+        raise ValueError(f"unknown algorithm {algorithm!r} (expected one of {', '.join(ALGORITHMS)})")
+    return _FITTERS[algorithm](x, y, **kwargs)
@@ -0,0 +1,327 @@
+"""
+K-Medoids engines.
+
+- FastPAM-style swap search (Schubert & Rousseeuw, 2019) for small datasets:
+  every (medoid, non-medoid) swap is scored in a single O(n^2) pass using each
+  point's nearest and second-nearest medoid distances.
+- CLARA (Kaufman & Rousseeuw, 1990) for large datasets: run the same swap
+  search on a random sample that always contains the current medoids, and keep
+  the result only if it lowers the cost on the full dataset.
+
+On small datasets the swap search and the deterministic PAM BUILD start read
+from a float32 distance matrix (`PairwiseDistances`) that the scene computes
+once per dataset and shares across steps, resets and battle sides.
+
+The dissimilarity is plain Euclidean distance (the classic PAM objective).
+"""
+
+import random
+
+import numpy as np
+
+
+# Candidate columns scored per block (bounds peak memory to n * _COL_CHUNK * k)
+_COL_CHUNK = 256
+# Rows per block when assigning the full dataset to candidate medoids
+_ROW_CHUNK = 65536
+# CLARA draws in a row that may fail to improve before the engine settles
+CLARA_PATIENCE = 3
+
+
+def _dist_cols(x, y, cols):
+    """Dense Euclidean distance block D[:, cols] computed from coordinates."""
+    dx = x[:, None] - x[cols][None, :]
+    dy = y[:, None] - y[cols][None, :]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+class PairwiseDistances:
+    """
+    Cached float32 Euclidean distance matrix for the exact (small-n) path.
+
+    Stored square rather than condensed: the swap search and BUILD read whole
+    column blocks, which are plain strided slices here but would need an
+    index gather from condensed storage (slower than recomputing them).
+    Built lazily and keyed on a copy of the coordinates it was built from, so
+    any change to the data (points added, CSV imported, new dataset, even at
+    the same size) rebuilds it; comparing O(n) coordinates is negligible next
+    to the O(n^2) matrix. Both battle sides hold the same points and share it.
+    `invalidate()` just frees the memory early.
+    """
+
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self.n = 0
+        self.matrix = None
+        self._x = None
+        self._y = None
+
+    def ensure(self, x, y):
+        """Build the matrix for (x, y) unless it is already cached for exactly these coordinates."""
+        n = x.shape[0]
+        if self.matrix is not None and np.array_equal(self._x, x) and np.array_equal(self._y, y):
+            return self
+        matrix = np.empty((n, n), dtype=np.float32)
+        for s in range(0, n, _COL_CHUNK):
+            matrix[s:s + _COL_CHUNK] = _dist_cols(x, y, slice(s, s + _COL_CHUNK)).T
+        self.n = n
+        self.matrix = matrix
+        self._x = np.array(x, dtype=np.float64)
+        self._y = np.array(y, dtype=np.float64)
+        return self
+
+    def cols(self, cols):
+        """Distance block D[:, cols] (a view for slices)."""
+        return self.matrix[:, cols]
+
+
+def build(cols_fn, n, k):
+    """
+    PAM BUILD: deterministic greedy start. The first medoid minimizes the total
+    distance; each next one maximizes the cost reduction. Ties go to the lowest index.
+    """
+    k = min(int(k), n)
+    medoids = []
+    is_medoid = np.zeros(n, dtype=bool)
+    d1 = None
+    for _ in range(k):
+        best_gain = -np.inf
+        best_c = -1
+        for s in range(0, n, _COL_CHUNK):
+            e = min(n, s + _COL_CHUNK)
+            dc = cols_fn(slice(s, e))
+            if d1 is None:
+                gain = -dc.sum(axis=0, dtype=np.float64)
+            else:
+                gain = np.maximum(d1[:, None] - dc, 0.0).sum(axis=0)
+                gain[is_medoid[s:e]] = -np.inf
+            j = int(gain.argmax())
+            if gain[j] > best_gain:
+                best_gain = gain[j]
+                best_c = s + j
+        medoids.append(best_c)
+        is_medoid[best_c] = True
+        dm = cols_fn(np.array([best_c]))[:, 0].astype(np.float64)
+        d1 = dm if d1 is None else np.minimum(d1, dm)
+    return np.array(medoids, dtype=np.int64)
+
+
+def _nearest_two(dm):
+    """Nearest medoid slot and nearest / second-nearest distances from an n x k block."""
+    rows = np.arange(dm.shape[0])
+    nn = dm.argmin(axis=1)
+    d1 = dm[rows, nn]
+    if dm.shape[1] > 1:
+        rest = dm.copy()
+        rest[rows, nn] = np.inf
+        d2 = rest.min(axis=1)
+    else:
+        d2 = np.full(dm.shape[0], np.inf)
+    return nn, d1, d2
+
+
+def best_swap(cols_fn, n, medoids):
+    """
+    Score every (medoid, non-medoid) swap in one pass (FastPAM1).
+
+    `cols_fn(cols)` must return the distance block D[:, cols] for an index
+    array or a slice of candidate columns.
+    Returns (delta, medoid slot, candidate index, current cost); delta < 0
+    means the swap lowers the total cost.
+    """
+    medoids = np.asarray(medoids)
+    k = medoids.shape[0]
+    nn, d1, d2 = _nearest_two(cols_fn(medoids))
+    cost = float(d1.sum())
+
+    is_medoid = np.zeros(n, dtype=bool)
+    is_medoid[medoids] = True
+
+    if k > 1:
+        # Removing medoid i sends each of its members to their second-nearest medoid.
+        loss = np.bincount(nn, weights=d2 - d1, minlength=k)
+        owner = np.zeros((k, n))
+        owner[nn, np.arange(n)] = 1.0
+
+    best = (0.0, -1, -1)
+    for s in range(0, n, _COL_CHUNK):
+        e = min(n, s + _COL_CHUNK)
+        dc = cols_fn(slice(s, e))
+        if k == 1:
+            delta = (dc.sum(axis=0, dtype=np.float64) - cost)[None, :]
+        else:
+            # Points that would move to the candidate whichever medoid leaves...
+            gain = np.minimum(dc - d1[:, None], 0.0).sum(axis=0)
+            # ...plus the per-medoid correction for points owned by the leaving medoid:
+            # d1 - d2 if they move to the candidate anyway, dc - d2 if the candidate
+            # beats their second-nearest medoid, else 0.
+            corr = np.maximum(np.minimum(dc, d2[:, None]), d1[:, None]) - d2[:, None]
+            delta = loss[:, None] + owner @ corr + gain[None, :]
+        delta[:, is_medoid[s:e]] = np.inf
+
+        flat = int(delta.argmin())
+        i, j = divmod(flat, e - s)
+        if delta[i, j] < best[0]:
+            best = (float(delta[i, j]), i, s + j)
+
+    return best[0], best[1], best[2], cost
+
+
+def _run_swaps(cols_fn, n, medoids, budget):
+    """Apply up to `budget` best swaps in place. Returns (swaps made, settled)."""
+    swaps = 0
+    for _ in range(max(1, int(budget))):
+        delta, slot, cand, cost = best_swap(cols_fn, n, medoids)
+        if slot < 0 or delta >= -1e-9 * max(1.0, cost):
+            return swaps, True
+        medoids[slot] = cand
+        swaps += 1
+    return swaps, False
+
+
+def total_cost(x, y, medoids):
+    """Sum of distances from every point to its nearest medoid (chunked)."""
+    mx = x[medoids]
+    my = y[medoids]
+    total = 0.0
+    for s in range(0, x.shape[0], _ROW_CHUNK):
+        e = min(x.shape[0], s + _ROW_CHUNK)
+        dx = x[s:e, None] - mx[None, :]
+        dy = y[s:e, None] - my[None, :]
+        total += float(np.sqrt((dx * dx + dy * dy).min(axis=1)).sum())
+    return total
+
+
+def nearest_points(x, y, cx, cy):
+    """Index of the point nearest to each center (chunked; ties go to the lowest index)."""
+    best = np.full(cx.shape[0], np.inf)
+    idx = np.zeros(cx.shape[0], dtype=np.int64)
+    for s in range(0, x.shape[0], _ROW_CHUNK):
+        e = min(x.shape[0], s + _ROW_CHUNK)
+        d = x[s:e, None] - cx[None, :]
+        dy = y[s:e, None] - cy[None, :]
+        d *= d
+        dy *= dy
+        d += dy
+        j = d.argmin(axis=0)
+        dj = d[j, np.arange(cx.shape[0])]
+        closer = dj < best
+        best[closer] = dj[closer]
+        idx[closer] = s + j[closer]
+    return idx
+
+
+class KMedoidsEngine:
+    """
+    Per-side K-Medoids state. Picks FastPAM swaps up to `pam_max_n` points and
+    CLARA above that; `sample_size` (CLARA) and `swap_budget` (swaps per step)
+    are the user-facing knobs.
+    """
+
+    def __init__(self, pam_max_n=3000, sample_size=400, swap_budget=2, distances=None, seed=None):
+        self.pam_max_n = int(pam_max_n)
+        self.sample_size = int(sample_size)
+        self.swap_budget = int(swap_budget)
+        # Shared PairwiseDistances cache for the exact (small-n) path
+        self.distances = distances if distances is not None else PairwiseDistances()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.medoids = None
+        self.mode = None
+        self.settled = False
+        self.last_swaps = 0
+        self.best_cost = float("inf")
+        self.stale_draws = 0
+        self._version = None
+        self._rng = np.random.default_rng(seed if seed is not None else random.getrandbits(32))
+
+    def _sync(self, store, cx, cy):
+        """Map the current centers onto point indices (re-snapping if they moved externally)."""
+        x, y = store.x, store.y
+        k = cx.shape[0]
+        m = self.medoids
+        if (
+            m is not None
+            and m.shape[0] == k
+            and int(m.max()) < store.n
+            and np.array_equal(x[m], cx)
+            and np.array_equal(y[m], cy)
+        ):
+            if self._version != store.version:
+                self.best_cost = float("inf")
+                self._version = store.version
+            return m
+
+        m = nearest_points(x, y, cx, cy)
+        # Two centers on the same point would be a degenerate medoid set.
+        _uniq, first = np.unique(m, return_index=True)
+        if first.shape[0] < k:
+            used = set(m[first].tolist())
+            spare = self._rng.choice(store.n, size=min(store.n, 4 * k), replace=False).tolist()
+            for slot in sorted(set(range(k)) - set(first.tolist())):
+                free = [j for j in spare if j not in used]
+                if free:
+                    m[slot] = free[0]
+                    used.add(free[0])
+        self.medoids = m
+        self.best_cost = float("inf")
+        self.stale_draws = 0
+        self._version = store.version
+        return m
+
+    def update(self, store, cx, cy):
+        """Run one step of the active engine. Returns the medoid point indices."""
+        if not store.n or cx.shape[0] == 0:
+            return np.zeros(0, dtype=np.int64)
+        k = min(cx.shape[0], store.n)
+        medoids = self._sync(store, cx[:k], cy[:k]).copy()
+
+        if store.n <= self.pam_max_n:
+            self.mode = "fastpam"
+            self.medoids, self.last_swaps, self.settled = self._pam(store, medoids)
+        else:
+            self.mode = "clara"
+            self.medoids, self.last_swaps, self.settled = self._clara(store, medoids)
+        return self.medoids
+
+    def build(self, store, k):
+        """Deterministic PAM BUILD medoids for a small dataset (point indices)."""
+        dist = self.distances.ensure(store.x, store.y)
+        self.medoids = build(dist.cols, store.n, k)
+        self.best_cost = float("inf")
+        self.stale_draws = 0
+        self._version = store.version
+        return self.medoids
+
+    def _pam(self, store, medoids):
+        dist = self.distances.ensure(store.x, store.y)
+        swaps, settled = _run_swaps(dist.cols, store.n, medoids, self.swap_budget)
+        return medoids, swaps, settled
+
+    def _clara(self, store, medoids):
+        x, y = store.x, store.y
+        n = store.n
+        k = medoids.shape[0]
+        if self.best_cost == float("inf"):
+            self.best_cost = total_cost(x, y, medoids)
+
+        size = min(n, max(self.sample_size, 2 * k + 2))
+        sample = np.unique(np.concatenate([medoids, self._rng.choice(n, size=size, replace=False)]))
+        sx = x[sample]
+        sy = y[sample]
+        local = np.searchsorted(sample, medoids)
+        swaps, _settled = _run_swaps(lambda cols: _dist_cols(sx, sy, cols), sample.shape[0], local, self.swap_budget)
+
+        candidate = sample[local]
+        if swaps:
+            cost = total_cost(x, y, candidate)
+            if cost < self.best_cost:
+                self.best_cost = cost
+                self.stale_draws = 0
+                return candidate, swaps, False
+
+        self.stale_draws += 1
+        return medoids, 0, self.stale_draws >= CLARA_PATIENCE
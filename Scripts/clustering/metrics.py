@@ -0,0 +1,52 @@
+"""
+Clustering quality metrics on a `PointStore` and a list of centers (any
+objects with `x` / `y`).
+"""
+
+import numpy as np
+
+from clustering.algorithms import centroid_arrays
+
+
+def cluster_wcss(store, centroids):
+    """
+    Per-cluster Within-Cluster Sum of Squares, from the store's running sums in
+    O(k): sum |p - c|^2 = sum |p|^2 - 2 c . sum p + n |c|^2.
+    """
+    k = len(centroids)
+    if not store.n or not k:
+        return np.zeros(k)
+    cx, cy = centroid_arrays(centroids)
+    counts, sum_x, sum_y = store.cluster_sums(k)
+    sum_sq = store.cluster_sq_sums(k)
+    wcss = sum_sq - 2.0 * (cx * sum_x + cy * sum_y) + counts * (cx * cx + cy * cy)
+    # The expansion can dip just below zero through rounding (e.g. all points on the center).
+    return np.maximum(wcss, 0.0)
+
+
+def calculate_inertia(store, centroids):
+    """Within-Cluster Sum of Squares (WCSS) / Inertia."""
+    if not store.n or not centroids:
+        return 0
+    return float(cluster_wcss(store, centroids).sum())
+
+
+def cluster_metrics(store, centroids):
+    """Per-cluster size / mean distance to center / distance variance / compactness."""
+    metrics = {}
+    if not store.n or not centroids:
+        return metrics
+    cx, cy = centroid_arrays(centroids)
+    for i in range(len(centroids)):
+        members = store.members(i)
+        if members.size == 0:
+            continue
+        d = np.hypot(store.x[members] - cx[i], store.y[members] - cy[i])
+        variance = float(d.var())
+        metrics[i] = {
+            "size": int(members.size),
+            "avg_distance": float(d.mean()),
+            "variance": variance,
+            "compactness": 1.0 / (1.0 + variance),
+        }
+    return metrics
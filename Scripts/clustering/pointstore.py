@@ -0,0 +1,286 @@
+"""
+Struct-of-arrays storage for point coordinates and cluster labels.
+
+`GameScene` owns one store per side. The clustering code in this package
+works on these contiguous arrays directly; the `entities.Point` objects kept in
+`store.points` are render-only views (trails, pulses, color transitions) that
+receive label updates only for the points that actually changed cluster.
+
+Every label write also maintains per-cluster running sums/counts (and sums of
+squared norms), so a centroid (mean) update or a WCSS evaluation costs
+O(changed points + k) instead of k full scans.
+"""
+
+import numpy as np
+
+
+# Label sentinels (stored in the int32 `cluster` / `prev_cluster` arrays)
+UNASSIGNED = -2
+NOISE = -1
+
+
+def _label_to_py(label):
+    label = int(label)
+    return None if label == UNASSIGNED else label
+
+
+class PointStore:
+    def __init__(self, points=None):
+        # Render-side Point views. The list object is shared with the scene, so
+        # mutating it through `append`/`clear` keeps both in sync.
+        self.points = points if points is not None else []
+
+        n = len(self.points)
+        cap = max(16, n)
+        self._x = np.empty(cap, dtype=np.float64)
+        self._y = np.empty(cap, dtype=np.float64)
+        self._cluster = np.full(cap, UNASSIGNED, dtype=np.int32)
+        self._prev_cluster = np.full(cap, UNASSIGNED, dtype=np.int32)
+        self.n = n
+        # Bumped whenever points are added/removed so cached per-point state
+        # (e.g. assignment bounds) can detect that it is stale. `clear_version`
+        # records the last removal: state older than that cannot be extended.
+        self.version = 0
+        self.clear_version = 0
+        # Bumped on every label write; keys the cached cluster grouping.
+        self.labels_version = 0
+        self._groups = None
+        self._groups_version = -1
+
+        if n:
+            self._x[:n] = [p.x for p in self.points]
+            self._y[:n] = [p.y for p in self.points]
+            self._cluster[:n] = [UNASSIGNED if p.cluster is None else p.cluster for p in self.points]
+            self._prev_cluster[:n] = [UNASSIGNED if p.prev_cluster is None else p.prev_cluster for p in self.points]
+        self._recount()
+
+    @classmethod
+    def from_xy(cls, x, y):
+        """Build a headless store (no Point views) from coordinate arrays."""
+        store = cls(None)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        store._reserve(len(x))
+        store._x[: len(x)] = x
+        store._y[: len(y)] = y
+        store.n = len(x)
+        store._recount()
+        return store
+
+    def copy(self, with_points=False):
+        """Copy coordinates and labels; Point views are only shared if requested."""
+        out = PointStore.from_xy(self.x, self.y)
+        out.cluster[:] = self.cluster
+        out.prev_cluster[:] = self.prev_cluster
+        out._recount()
+        if with_points:
+            out.points = self.points
+        return out
+
+    def __len__(self):
+        return self.n
+
+    # Views over the live region of the (over-allocated) buffers
+    @property
+    def x(self):
+        return self._x[: self.n]
+
+    @property
+    def y(self):
+        return self._y[: self.n]
+
+    @property
+    def cluster(self):
+        return self._cluster[: self.n]
+
+    @property
+    def prev_cluster(self):
+        return self._prev_cluster[: self.n]
+
+    def _reserve(self, cap):
+        if cap <= len(self._x):
+            return
+        new_cap = max(cap, len(self._x) * 2)
+        for name, fill in (("_x", 0.0), ("_y", 0.0), ("_cluster", UNASSIGNED), ("_prev_cluster", UNASSIGNED)):
+            old = getattr(self, name)
+            buf = np.full(new_cap, fill, dtype=old.dtype)
+            buf[: self.n] = old[: self.n]
+            setattr(self, name, buf)
+
+    # -----------------------
+    # Running per-cluster sums
+    # -----------------------
+    def _recount(self):
+        self.labels_version += 1
+        lab = self.cluster
+        mask = lab >= 0
+        size = int(lab[mask].max()) + 1 if mask.any() else 0
+        lab = lab[mask]
+        px = self.x[mask]
+        py = self.y[mask]
+        self._count = np.bincount(lab, minlength=size).astype(np.int64)
+        self._sum_x = np.bincount(lab, weights=px, minlength=size)
+        self._sum_y = np.bincount(lab, weights=py, minlength=size)
+        self._sum_sq = np.bincount(lab, weights=px * px + py * py, minlength=size)
+
+    def _grow_sums(self, size):
+        extra = size - self._count.shape[0]
+        if extra > 0:
+            self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+            self._sum_x = np.concatenate([self._sum_x, np.zeros(extra)])
+            self._sum_y = np.concatenate([self._sum_y, np.zeros(extra)])
+            self._sum_sq = np.concatenate([self._sum_sq, np.zeros(extra)])
+
+    def _move_sums(self, idx, old, new):
+        """Move points `idx` from clusters `old` to clusters `new` in the running sums."""
+        self.labels_version += 1
+        px = self._x[idx]
+        py = self._y[idx]
+        sq = px * px + py * py
+        for lab, sign in ((old, -1), (new, 1)):
+            mask = lab >= 0
+            if not mask.any():
+                continue
+            lab = lab[mask]
+            self._grow_sums(int(lab.max()) + 1)
+            size = self._count.shape[0]
+            self._count += sign * np.bincount(lab, minlength=size)
+            self._sum_x += sign * np.bincount(lab, weights=px[mask], minlength=size)
+            self._sum_y += sign * np.bincount(lab, weights=py[mask], minlength=size)
+            self._sum_sq += sign * np.bincount(lab, weights=sq[mask], minlength=size)
+
+    def cluster_sums(self, k):
+        """Per-cluster (count, sum_x, sum_y) for clusters 0..k-1, in O(k)."""
+        self._grow_sums(k)
+        return self._count[:k].copy(), self._sum_x[:k].copy(), self._sum_y[:k].copy()
+
+    def cluster_sq_sums(self, k):
+        """Per-cluster sum of squared norms (x^2 + y^2) for clusters 0..k-1, in O(k)."""
+        self._grow_sums(k)
+        return self._sum_sq[:k].copy()
+
+    # -----------------------
+    # Cluster -> indices grouping
+    # -----------------------
+    def _group_index(self):
+        """
+        CSR-style grouping built in one pass and cached until labels change:
+        `order` is a label-sorted permutation of point indices and the members
+        of label c are order[offsets[c + 2]:offsets[c + 3]] (the +2 shift makes
+        room for UNASSIGNED and NOISE).
+        """
+        if self._groups_version != self.labels_version:
+            keys = self.cluster + 2
+            size = int(keys.max()) + 1 if self.n else 0
+            # Stable sort on int16 keys is a radix sort in NumPy (O(n)).
+            if size < np.iinfo(np.int16).max:
+                keys = keys.astype(np.int16)
+            order = np.argsort(keys, kind="stable")
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+            self._groups = (order, offsets)
+            self._groups_version = self.labels_version
+        return self._groups
+
+    def members(self, label):
+        """Indices of the points currently labelled `label`."""
+        order, offsets = self._group_index()
+        c = int(label) + 2
+        if c < 0 or c + 1 >= offsets.shape[0]:
+            return order[:0]
+        return order[offsets[c]:offsets[c + 1]]
+
+    def label_count(self, label):
+        """Number of points currently labelled `label` (O(1) once grouped)."""
+        _order, offsets = self._group_index()
+        c = int(label) + 2
+        if c < 0 or c + 1 >= offsets.shape[0]:
+            return 0
+        return int(offsets[c + 1] - offsets[c])
+
+    # -----------------------
+    # Mutation
+    # -----------------------
+    def append(self, point, cluster=None):
+        """Add one point (amortized O(1)); it starts unassigned unless `cluster` is given."""
+        self._reserve(self.n + 1)
+        i = self.n
+        label = UNASSIGNED if cluster is None else int(cluster)
+        self._x[i] = point.x
+        self._y[i] = point.y
+        self._cluster[i] = label
+        self._prev_cluster[i] = UNASSIGNED
+        self.n += 1
+        self.version += 1
+        self.labels_version += 1
+        if label >= 0:
+            self._grow_sums(label + 1)
+            self._count[label] += 1
+            self._sum_x[label] += point.x
+            self._sum_y[label] += point.y
+            self._sum_sq[label] += point.x * point.x + point.y * point.y
+        point.cluster = cluster
+        point.prev_cluster = None
+        # Headless stores (from_xy) stay headless
+        if len(self.points) == i:
+            self.points.append(point)
+
+    def clear(self):
+        self.n = 0
+        self.version += 1
+        self.clear_version = self.version
+        self.points.clear()
+        self._recount()
+
+    def reset_labels(self):
+        self.cluster[:] = UNASSIGNED
+        self.prev_cluster[:] = UNASSIGNED
+        self._recount()
+
+    def set_labels(self, labels):
+        """
+        Write a full label array. Returns the indices whose label changed;
+        `prev_cluster` is updated for those indices only.
+        """
+        labels = np.asarray(labels, dtype=np.int32)
+        cur = self.cluster
+        changed = np.flatnonzero(cur != labels)
+        if changed.size:
+            old = cur[changed]
+            new = labels[changed]
+            self.prev_cluster[changed] = old
+            cur[changed] = new
+            self._move_sums(changed, old, new)
+        return changed
+
+    def set_labels_at(self, indices, labels):
+        """
+        Write labels for a subset of points (duplicates allowed). Returns the
+        unique indices whose label changed.
+        """
+        indices = np.asarray(indices)
+        labels = np.asarray(labels, dtype=np.int32)
+        cur = self.cluster[indices]
+        diff = cur != labels
+        idx, first = np.unique(indices[diff], return_index=True)
+        if idx.size:
+            old = cur[diff][first]
+            new = labels[diff][first]
+            self.prev_cluster[idx] = old
+            self.cluster[idx] = new
+            self._move_sums(idx, old, new)
+        return idx
+
+    def sync_points(self, indices=None):
+        """Mirror labels onto the Point views (all of them, or just `indices`)."""
+        if not self.points:
+            return
+        if indices is None:
+            indices = range(self.n)
+        cluster = self.cluster
+        prev = self.prev_cluster
+        points = self.points
+        for i in indices:
+            p = points[i]
+            p.cluster = _label_to_py(cluster[i])
+            p.prev_cluster = _label_to_py(prev[i])
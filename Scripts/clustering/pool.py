@@ -0,0 +1,66 @@
+"""
+Worker-process pool shared by the parallel engines (DBSCAN strips, elbow runs,
+n_init restarts).
+
+Worker start-up dominates small jobs, so one `ProcessPoolExecutor` is kept
+alive and reused until a different worker count is requested.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+_executor = None
+_executor_workers = 0
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def get_pool(workers):
+    """The shared pool, (re)created with `workers` processes if needed."""
+    global _executor, _executor_workers
+    workers = max(1, int(workers))
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+class SharedXY:
+    """
+    Point coordinates in a shared-memory block, so tasks attach by name
+    instead of each receiving its own pickled copy. The owner calls
+    `release()` once no task needs it any more.
+    """
+
+    def __init__(self, x, y):
+        self.n = int(x.shape[0])
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * self.n * 8))
+        self.name = self._shm.name
+        coords = np.ndarray((2, self.n), dtype=np.float64, buffer=self._shm.buf)
+        coords[0] = x
+        coords[1] = y
+        del coords
+
+    def release(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def attach_xy(name, n):
+    """Copy of the (x, y) arrays published by a `SharedXY` (called in a worker)."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        coords = np.ndarray((2, n), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+    return coords[0], coords[1]
@@ -0,0 +1,79 @@
+"""
+n_init restarts: N independently seeded fits of a centroid algorithm on the
+shared worker pool, keeping the start whose fit reaches the lowest inertia.
+
+A restart is fully described by its seed: the seed drives the configured
+seeding method (`seeding.seed_points`) that picks the k starting points and
+also seeds the algorithm's own random state (mini-batch sampling, CLARA
+draws). `GameScene` places its centroids on the winning start and reseeds its
+engines with the winning seed, so the animated run retraces the best fit.
+"""
+
+import numpy as np
+
+from clustering import fit, pool
+
+
+def fit_seed(x, y, algorithm, k, seed, init, params):
+    """
+    Fit `algorithm` ("kmeans", "kmedoids" or "minibatch") from the `init`
+    start of `seed` until it settles. Returns the final inertia (WCSS).
+    `params` holds the engine settings (see `GameScene._fit_params`).
+    """
+    return fit.fit(x, y, algorithm, k=k, init=init, seed=seed, **params).inertia
+
+
+def _fit_seed_shared(name, n, algorithm, k, seed, init, params):
+    x, y = pool.attach_xy(name, n)
+    return fit_seed(x, y, algorithm, k, seed, init, params)
+
+
+class RestartRun:
+    """One batch of n_init restarts in flight (one pool task per seed)."""
+
+    def __init__(self, x, y, algorithm, k, n_init, workers, init, params, seed=None):
+        n = x.shape[0]
+        self.n = n
+        self.n_init = max(1, int(n_init))
+        self.results = {}
+        # seed -> exception for every restart that failed in the worker
+        self.errors = {}
+
+        self._shared = pool.SharedXY(x, y)
+        seeds = np.random.SeedSequence(seed).generate_state(self.n_init).tolist()
+        executor = pool.get_pool(workers)
+        self._futures = {
+            executor.submit(_fit_seed_shared, self._shared.name, n, algorithm, k, s, init, params): s for s in seeds
+        }
+
+    @property
+    def done(self):
+        return not self._futures
+
+    def best(self):
+        """(inertia, seed) of the best finished restart, or None."""
+        if not self.results:
+            return None
+        seed = min(self.results, key=self.results.get)
+        return self.results[seed], seed
+
+    def poll(self):
+        """Collect finished restarts. Returns True if new results arrived."""
+        finished = [f for f in self._futures if f.done()]
+        for f in finished:
+            seed = self._futures.pop(f)
+            if f.cancelled():
+                continue
+            if f.exception() is not None:
+                self.errors[seed] = f.exception()
+            else:
+                self.results[seed] = f.result()
+        if self.done:
+            self._shared.release()
+        return bool(finished)
+
+    def cancel(self):
+        for f in self._futures:
+            f.cancel()
+        self._futures = {}
+        self._shared.release()
@@ -0,0 +1,121 @@
+"""
+Initial centroid placement, shared by the scene (single and battle mode),
+n_init restarts and the elbow method.
+
+- "random": k distinct points drawn uniformly.
+- "kmeans++" (Arthur & Vassilvitskii, 2007): each next center is drawn with
+  probability proportional to the squared distance to the nearest center
+  chosen so far; greedy variant that keeps the best of 2 + ln(k) draws per
+  center. Vectorized: a few O(n) distance updates per center.
+- "kmeans||" (Bahmani et al., 2012): a few oversampling rounds each add about
+  `2k` centers at once; the candidates, weighted by how many points they are
+  nearest to, are then reduced to k with weighted k-means++. Its pass count
+  does not grow with k, but it evaluates more distances than k-means++, so in
+  a single process it only pays off for large K on large imports.
+
+Every method returns point indices, so the centers sit on data points.
+"""
+
+import numpy as np
+
+
+METHODS = ("random", "kmeans++", "kmeans||")
+# k-means|| oversampling rounds
+PARALLEL_ROUNDS = 5
+
+
+def _d2_pick(d2, rng):
+    """Index drawn with probability proportional to d2 (uniform if all zero)."""
+    total = float(d2.sum())
+    if total <= 0.0:
+        return int(rng.integers(d2.shape[0]))
+    j = int(np.searchsorted(np.cumsum(d2), rng.random() * total, side="right"))
+    return min(j, d2.shape[0] - 1)
+
+
+def kmeans_pp(x, y, k, rng, weights=None):
+    """k-means++ center indices (optionally with per-point weights)."""
+    n = x.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    w = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    trials = 2 + int(np.log(k))
+    picks = [_d2_pick(w, rng)]
+    d2 = (x - x[picks[0]]) ** 2 + (y - y[picks[0]]) ** 2
+    for _ in range(1, k):
+        weighted = w * d2
+        if weighted.sum() <= 0.0:
+            # Fewer distinct locations than k: fall back to unused points.
+            free = np.setdiff1d(np.arange(n), picks)
+            j = int(rng.choice(free))
+            np.minimum(d2, (x - x[j]) ** 2 + (y - y[j]) ** 2, out=d2)
+        else:
+            # Greedy variant: draw a few candidates, keep the one that lowers the potential most.
+            cum = np.cumsum(weighted)
+            cand = np.minimum(np.searchsorted(cum, rng.random(trials) * cum[-1], side="right"), n - 1)
+            dc = np.minimum(d2[None, :], (x[None, :] - x[cand, None]) ** 2 + (y[None, :] - y[cand, None]) ** 2)
+            best = int((dc * w[None, :]).sum(axis=1).argmin())
+            j = int(cand[best])
+            d2 = dc[best]
+        picks.append(j)
+    return np.array(picks, dtype=np.int64)
+
+
+def _absorb(x, y, d2, nearest, centers, first_id):
+    """Lower d2 / relabel `nearest` for points closer to one of the new `centers`."""
+    for i, j in enumerate(centers.tolist()):
+        dj = (x - x[j]) ** 2 + (y - y[j]) ** 2
+        closer = dj < d2
+        d2[closer] = dj[closer]
+        nearest[closer] = first_id + i
+
+
+def kmeans_parallel(x, y, k, rng, rounds=PARALLEL_ROUNDS, oversample=None):
+    """k-means|| center indices."""
+    n = x.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    ell = float(oversample if oversample is not None else 2 * k)
+
+    first = int(rng.integers(n))
+    cand = [np.array([first])]
+    size = 1
+    d2 = (x - x[first]) ** 2 + (y - y[first]) ** 2
+    # Candidate each point is nearest to, kept up to date so weighting needs no extra pass
+    nearest = np.zeros(n, dtype=np.int64)
+    for _ in range(rounds):
+        phi = float(d2.sum())
+        if phi <= 0.0:
+            break
+        new = np.flatnonzero(rng.random(n) < ell * d2 / phi)
+        if not new.size:
+            continue
+        _absorb(x, y, d2, nearest, new, size)
+        cand.append(new)
+        size += new.shape[0]
+
+    cand = np.concatenate(cand)
+    if cand.shape[0] <= k:
+        extra = rng.choice(np.setdiff1d(np.arange(n), cand), size=k - cand.shape[0], replace=False)
+        return np.concatenate([cand, extra])
+
+    weights = np.bincount(nearest, minlength=cand.shape[0])
+    return cand[kmeans_pp(x[cand], y[cand], k, rng, weights=weights)]
+
+
+def seed_points(x, y, k, method="kmeans++", rng=None):
+    """
+    Indices of min(k, n) distinct starting points chosen by `method`.
+    `rng` is a NumPy Generator or a seed (same seed, same start).
+    """
+    rng = np.random.default_rng(rng)
+    n = x.shape[0]
+    k = min(int(k), n)
+    if method == "kmeans||":
+        return kmeans_parallel(x, y, k, rng)
+    if method == "kmeans++":
+        return kmeans_pp(x, y, k, rng)
+    return rng.choice(n, size=k, replace=False)
@@ -0,0 +1,86 @@
+"""
+Per-phase frame timing.
+
+Code wraps each phase of a frame in `span(name)`; the time spent in each
+phase is summed per frame (a phase can run several times, e.g. once per
+battle side) and `end_frame` stores the totals as one row of a fixed-size
+ring buffer, so the last `capacity` frames are always available for
+percentiles or a CSV dump. A phase that did not run in a frame records 0.
+"""
+
+import csv
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Phase names in display order. "update" includes "algorithm" steps run by
+# auto-iteration; "frame" is the whole frame's work (not the clock.tick wait).
+PHASES = ("events", "update", "algorithm", "voronoi", "trails", "points", "particles", "overlays", "flip", "frame")
+
+
+class FrameTimings:
+    def __init__(self, phases=PHASES, capacity=600):
+        self.phases = tuple(phases)
+        self._column = {name: i for i, name in enumerate(self.phases)}
+        self._rows = np.zeros((max(1, int(capacity)), len(self.phases)))
+        self._frame_ids = np.zeros(self._rows.shape[0], dtype=np.int64)
+        self._current = np.zeros(len(self.phases))
+        self._frames = 0  # frames recorded so far (also the next frame id)
+        self._frame_start = None
+
+    @property
+    def capacity(self):
+        return self._rows.shape[0]
+
+    def __len__(self):
+        return min(self._frames, self.capacity)
+
+    def begin_frame(self):
+        self._current[:] = 0.0
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self._frame_start is not None and "frame" in self._column:
+            self._current[self._column["frame"]] = time.perf_counter() - self._frame_start
+        row = self._frames % self.capacity
+        self._rows[row] = self._current
+        self._frame_ids[row] = self._frames
+        self._frames += 1
+        self._frame_start = None
+
+    def add(self, name, seconds):
+        self._current[self._column[name]] += seconds
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def frames(self):
+        """(frame ids, per-phase milliseconds) of the buffered frames, oldest first."""
+        n = len(self)
+        order = np.arange(self._frames - n, self._frames) % self.capacity
+        return self._frame_ids[order], self._rows[order] * 1000.0
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """{phase: [ms at each percentile]} over the buffered frames (zeros when empty)."""
+        _ids, ms = self.frames()
+        if not len(ms):
+            return {name: [0.0] * len(qs) for name in self.phases}
+        values = np.percentile(ms, qs, axis=0)
+        return {name: values[:, i].tolist() for i, name in enumerate(self.phases)}
+
+    def write_csv(self, path):
+        """One row per buffered frame: frame id, then milliseconds per phase."""
+        ids, ms = self.frames()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in self.phases])
+            for frame_id, row in zip(ids.tolist(), np.round(ms, 4).tolist()):
+                writer.writerow([frame_id] + row)
+        return len(ids)
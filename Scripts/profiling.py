@@ -0,0 +1,104 @@
+"""
+On-demand profiling captures for a running session (no restart under a
+profiler needed).
+
+- CpuProfile: a cProfile session toggled on and off; stopping writes a
+  .pstats file (open it with `python -m pstats` or snakeviz).
+- MemorySnapshots: tracemalloc snapshots; each capture after the first writes
+  a text report of the top allocation sites and of the biggest growth since
+  the previous snapshot.
+"""
+
+import cProfile
+import linecache
+import os
+import pstats
+import time
+import tracemalloc
+
+
+def _timestamped(directory, prefix, ext):
+    return os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{ext}")
+
+
+class CpuProfile:
+    def __init__(self):
+        self._profile = None
+        self._started = 0.0
+
+    @property
+    def active(self):
+        return self._profile is not None
+
+    def start(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._started = time.perf_counter()
+            self._profile.enable()
+
+    def stop(self, directory):
+        """Stop the session and write it as .pstats; returns (path, seconds profiled)."""
+        if self._profile is None:
+            return None, 0.0
+        self._profile.disable()
+        profile, self._profile = self._profile, None
+        path = _timestamped(directory, "profile", ".pstats")
+        pstats.Stats(profile).dump_stats(path)
+        return path, time.perf_counter() - self._started
+
+
+# Allocations from these files are the tracer's own bookkeeping
+_IGNORED = (tracemalloc.__file__, linecache.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+class MemorySnapshots:
+    def __init__(self, frames=10, top=25):
+        self.frames = int(frames)
+        self.top = int(top)
+        self._previous = None
+        self._started_here = False
+
+    @property
+    def active(self):
+        return self._previous is not None
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, name) for name in _IGNORED])
+
+    def capture(self, directory):
+        """
+        Take a snapshot (starting tracemalloc on the first call). Returns the
+        report path, or None for the first snapshot (nothing to diff against).
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+            self._previous = None
+        snapshot = self._snapshot()
+        previous, self._previous = self._previous, snapshot
+        if previous is None:
+            return None
+
+        path = _timestamped(directory, "memory", ".txt")
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Traced memory: {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak\n\n")
+            f.write(f"Top {self.top} growth since the previous snapshot (by line):\n")
+            for stat in snapshot.compare_to(previous, "lineno")[: self.top]:
+                f.write(f"  {stat}\n")
+            f.write(f"\nTop {self.top} allocation sites now (by line):\n")
+            for stat in snapshot.statistics("lineno")[: self.top]:
+                f.write(f"  {stat}\n")
+            f.write("\nLargest growth, full traceback:\n")
+            for stat in snapshot.compare_to(previous, "traceback")[:3]:
+                f.write(f"  {stat}\n")
+                for line in stat.traceback.format():
+                    f.write(f"    {line}\n")
+        return path
+
+    def stop(self):
+        """Drop the snapshots and stop tracing (if tracing was started here)."""
+        self._previous = None
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_here = False
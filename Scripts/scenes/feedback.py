@@ -0,0 +1,32 @@
+"""
+Scene-side reaction to label changes reported by the clustering core.
+
+The `clustering` functions that write labels call `on_change(changed)` with
+the indices whose label changed; `label_feedback` builds that callback for a
+side of the scene: it mirrors labels onto the render-side Point views, pulses
+the changed points and spawns a few particle bursts.
+"""
+
+from entities import ParticleEffect
+
+
+def label_feedback(store, centroids=(), particles=None, max_particles=0, pulse=True):
+    """`on_change` callback for `store` (DBSCAN relabels pass pulse=False)."""
+
+    def on_change(changed):
+        store.sync_points(changed)
+        if not pulse or not store.points or not changed.size:
+            return
+
+        points = store.points
+        particle_count = 0
+        for i in changed:
+            point = points[i]
+            point.transition = 0
+            point.scale = 1.5
+
+            if particles is not None and point.prev_cluster is not None and particle_count < max_particles:
+                particles.append(ParticleEffect(point.x, point.y, centroids[point.cluster].color))
+                particle_count += 1
+
+    return on_change
@@ -1,31 +1,49 @@
 import math
 import os
 import random
+import time
 
 import pygame
 
-import algorithms
 import csv_io
 import datasets
 import voronoi
 import config
+from clustering import algorithms, dbscan_engine, elbow, kmedoids, metrics, pool, restarts, seeding
+from clustering.pointstore import NOISE, PointStore
 from entities import Centroid, ParticleEffect, Point
+from scenes.feedback import label_feedback
+
+
+# Algorithms that place k centroids/medoids (DBSCAN has none)
+CENTROID_ALGORITHMS = ("kmeans", "kmedoids", "minibatch")
+
+# Number key -> (algorithm, battle opponent)
+ALGORITHM_KEYS = {
+    pygame.K_5: ("kmeans", "kmedoids"),
+    pygame.K_6: ("kmedoids", "kmeans"),
+    pygame.K_7: ("dbscan", "kmeans"),
+    pygame.K_8: ("minibatch", "kmeans"),
+}
 
 
 class GameScene:
     def __init__(self, app, settings):
         self.app = app
 
+        # Point lists are render-side views; the stores own coordinates + labels.
         self.points = []
+        self.store = PointStore(self.points)
         self.centroids = []
         self.particles = []
 
         self.points_b = []
+        self.store_b = PointStore(self.points_b)
         self.centroids_b = []
         self.particles_b = []
 
         self.k = int(settings.get("k", 3))
-        self.algorithm = settings.get("algorithm", "kmeans")  # kmeans/kmedoids/dbscan
+        self.algorithm = settings.get("algorithm", "kmeans")  # kmeans/kmedoids/dbscan/minibatch
         if self.algorithm == "kmeans":
             self.algorithm_b = "kmedoids"
         elif self.algorithm == "kmedoids":
@@ -61,10 +79,29 @@ class GameScene:
         self.show_stats = False
         self.show_graph = False
         self.show_elbow = False
+        # Per-phase frame timing HUD (see perf.FrameTimings)
+        self.show_perf = False
+        # Last perf/profiling message (shown in the HUD and, briefly, the debug panel)
+        self._perf_status = ""
+        self._perf_status_until = 0
 
         self.inertia_history = []
         self.inertia_history_b = []
         self.elbow_data = []
+        # K values whose elbow task raised (reported in the chart title)
+        self.elbow_failed = []
+
+        # Worker processes for the parallel engines (DBSCAN strips, elbow runs)
+        self.workers = int(settings.get("workers", pool.default_workers()))
+        # Elbow method: K range and whether each K starts from the K-1 solution
+        self.elbow_max_k = int(settings.get("elbow_max_k", 10))
+        self.elbow_warm_start = bool(settings.get("elbow_warm_start", True))
+        self._elbow_run = None
+        # Initial centroid placement (see seeding.METHODS)
+        self.seeding = settings.get("seeding", "kmeans++")
+        # Independently seeded fits per reset; the lowest-inertia start is animated
+        self.n_init = int(settings.get("n_init", 1))
+        self._restart_run = None
 
         # Performance: timer-based auto iteration
         self.last_iteration_time = 0
@@ -74,18 +111,47 @@ class GameScene:
         self.min_point_distance = 25
         self.max_tries_per_point = 250
 
-        # K-medoids settings
-        self.kmedoids_candidate_limit = 25
+        # K-medoids settings: exact FastPAM swaps up to pam_max_n points, CLARA
+        # (sample of kmedoids_sample_size points per step) above that.
+        self.kmedoids_pam_max_n = 3000
+        self.kmedoids_sample_size = int(settings.get("kmedoids_sample_size", 400))
+        self.kmedoids_swap_budget = int(settings.get("kmedoids_swap_budget", 2))
+
+        # Mini-batch K-Means: points sampled per step, and the largest centroid
+        # shift (px) below which a final full assignment marks convergence.
+        self.minibatch_size = int(settings.get("minibatch_size", 256))
+        self.minibatch_tol = 0.5
+
+        # Exact K-Medoids distance matrix, shared by both sides (same dataset)
+        # and kept until points change.
+        self._pdist = kmedoids.PairwiseDistances()
+
+        # Per-side algorithm state that persists across steps
+        self._engines_a = self._make_engines()
+        self._engines_b = self._make_engines()
 
         # Input dialog (points / k)
         self.input_active = False
         self.input_text = ""
         self.input_field = "points"
 
-        # Voronoi cache
-        self.voronoi_cell_size = 12
-        self._vor_cache_a = voronoi.VoronoiCache()
-        self._vor_cache_b = voronoi.VoronoiCache()
+        # Stats panel cache (see calculate_cluster_metrics)
+        self._metrics_key = None
+        self._metrics = {}
+        # WCSS per side, kept until labels or centroids change (see _inertia)
+        self._inertia_cache = {}
+
+        # Voronoi cache: regions follow centroid targets and are redrawn once a
+        # target moves more than voronoi_tolerance px (see voronoi.get_voronoi_surface)
+        self.voronoi_cell_size = 2
+        self.voronoi_tolerance = 1.0
+        # "polygons" (exact cells), "raster" or "quadtree" (voronoi_cell_size px cells), see voronoi.MODES
+        self.voronoi_mode = settings.get("voronoi_mode", "polygons")
+        # Stale-while-revalidate: out-of-date regions are rebuilt on a worker
+        # thread while the previous surface keeps being drawn (see voronoi.BackgroundVoronoi)
+        self.voronoi_background = True
+        self._voronoi_a = voronoi.BackgroundVoronoi()
+        self._voronoi_b = voronoi.BackgroundVoronoi()
 
         self._load_initial_dataset(int(settings.get("points", 50)))
         self.reset_algorithm()
@@ -98,59 +164,63 @@ class GameScene:
         if self.dataset_type == "csv":
             if not self.csv_points:
                 self.dataset_type = "random"
-                self.points = datasets.generate_spaced_random_points(
+                points = datasets.generate_spaced_random_points(
                     n, min_dist=self.min_point_distance, max_tries_per_point=self.max_tries_per_point
                 )
             else:
-                self.points = self._points_from_xy(self.csv_points)
+                points = self._points_from_xy(self.csv_points)
         elif self.dataset_type == "blobs":
-            self.points = datasets.generate_blobs(n, centers=max(2, min(5, self.k)))
+            points = datasets.generate_blobs(n, centers=max(2, min(5, self.k)))
         elif self.dataset_type == "moons":
-            self.points = datasets.generate_moons(n)
+            points = datasets.generate_moons(n)
         elif self.dataset_type == "circles":
-            self.points = datasets.generate_circles(n)
+            points = datasets.generate_circles(n)
         else:
             self.dataset_type = "random"
-            self.points = datasets.generate_spaced_random_points(
+            points = datasets.generate_spaced_random_points(
                 n, min_dist=self.min_point_distance, max_tries_per_point=self.max_tries_per_point
             )
 
+        self._set_points(points)
+
+    def _set_points(self, points):
+        """Replace the dataset (mirrored to side B in battle mode)."""
+        self._cancel_restarts()
+        self.points = points
+        self.store = PointStore(self.points)
+        self._pdist.invalidate()
         if self.battle_mode:
-            self.points_b = [Point(p.x, p.y) for p in self.points]
+            self._mirror_points_b()
+
+    def _mirror_points_b(self):
+        self.points_b = [Point(p.x, p.y) for p in self.points]
+        self.store_b = PointStore(self.points_b)
 
     def _points_from_xy(self, xy):
         # Fit raw (x,y) into play area with scaling.
-        if not xy:
-            return []
-        xs = [p[0] for p in xy]
-        ys = [p[1] for p in xy]
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-        dx = (max_x - min_x) if max_x != min_x else 1.0
-        dy = (max_y - min_y) if max_y != min_y else 1.0
-
-        play_left = config.SIDE_MARGIN
-        play_right = config.WIDTH - config.SIDE_MARGIN
-        play_top = config.TOP_MARGIN
-        play_bottom = config.HEIGHT - config.UI_PANEL_HEIGHT - 20
-        play_w = max(1, play_right - play_left)
-        play_h = max(1, play_bottom - play_top)
-
-        pts = []
-        for x, y in xy:
-            nx = (float(x) - min_x) / dx
-            ny = (float(y) - min_y) / dy
-            px = play_left + nx * play_w
-            py = play_top + ny * play_h
-            pts.append(Point(px, py))
-        return pts
+        return datasets.points_in_play_area(xy)
 
     # -----------------------
     # Algorithm lifecycle
     # -----------------------
-    def _invalidate_voronoi_cache(self):
-        self._vor_cache_a.invalidate()
-        self._vor_cache_b.invalidate()
+    def _invalidate_voronoi_cache(self, keep_stale=True):
+        self._voronoi_a.invalidate(keep_stale)
+        self._voronoi_b.invalidate(keep_stale)
+
+    def _make_engines(self):
+        return {
+            # Bounds-accelerated nearest-centroid assignment
+            "assigner": algorithms.HamerlyAssigner(),
+            "minibatch": algorithms.MiniBatchKMeans(),
+            # Cached neighbor distances: eps/min_samples changes relabel instantly
+            "dbscan": dbscan_engine.NeighborGraph(workers=self.workers),
+            "kmedoids": kmedoids.KMedoidsEngine(
+                pam_max_n=self.kmedoids_pam_max_n,
+                sample_size=self.kmedoids_sample_size,
+                swap_budget=self.kmedoids_swap_budget,
+                distances=self._pdist,
+            ),
+        }
 
     def _reset_centroids(self, into_list, coords=None):
         into_list.clear()
@@ -169,7 +239,10 @@ class GameScene:
     def reset_algorithm(self):
         # Shared centroid starting positions (fair for battle mode) for centroid-based algorithms.
         coords = []
-        for i in range(self.k):
+        if self.points:
+            pick = seeding.seed_points(self.store.x, self.store.y, self.k, self.seeding, random.getrandbits(32))
+            coords = [(float(self.store.x[j]), float(self.store.y[j])) for j in pick.tolist()]
+        for i in range(len(coords), self.k):
             if self.points:
                 p = random.choice(self.points)
                 coords.append((p.x, p.y))
@@ -181,13 +254,13 @@ class GameScene:
                     )
                 )
 
-        if self.algorithm in ("kmeans", "kmedoids"):
+        if self.algorithm in CENTROID_ALGORITHMS:
             self._reset_centroids(self.centroids, coords=coords)
         else:
             self.centroids.clear()
 
         if self.battle_mode:
-            if self.algorithm_b in ("kmeans", "kmedoids"):
+            if self.algorithm_b in CENTROID_ALGORITHMS:
                 self._reset_centroids(self.centroids_b, coords=coords)
             else:
                 self.centroids_b.clear()
@@ -195,6 +268,8 @@ class GameScene:
             self.centroids_b.clear()
 
         # Clear assignments & counters
+        self.store.reset_labels()
+        self.store_b.reset_labels()
         for p in self.points:
             p.cluster = None
             p.prev_cluster = None
@@ -206,6 +281,20 @@ class GameScene:
 
         self.particles.clear()
         self.particles_b.clear()
+        for engines in (self._engines_a, self._engines_b):
+            engines["minibatch"].reset()
+            engines["kmedoids"].reset()
+
+        # Small K-Medoids datasets start from the deterministic PAM BUILD medoids.
+        for store, centroids, algorithm_name, engines in (
+            (self.store, self.centroids, self.algorithm, self._engines_a),
+            (self.store_b, self.centroids_b, self.algorithm_b, self._engines_b),
+        ):
+            if algorithm_name == "kmedoids" and centroids and 0 < store.n <= self.kmedoids_pam_max_n:
+                medoids = engines["kmedoids"].build(store, len(centroids))
+                for centroid, j in zip(centroids, medoids.tolist()):
+                    centroid.x = centroid.target_x = float(store.x[j])
+                    centroid.y = centroid.target_y = float(store.y[j])
 
         self.iteration_count = 0
         self.iteration_count_b = 0
@@ -213,21 +302,93 @@ class GameScene:
         self.converged_b = False
         self.inertia_history = []
         self.inertia_history_b = []
-        self.elbow_data = []
-        self.show_elbow = False
+        self._clear_elbow()
         self._dbscan_clusters_a = 0
         self._dbscan_clusters_b = 0
 
+        self._start_restarts()
         self._invalidate_voronoi_cache()
 
-    def _step_side(self, points, centroids, particles, algorithm_name, inertia_history):
-        if not points:
+    def _fit_params(self, algorithm_name):
+        """Engine settings for `clustering.fit` runs matching the animated `algorithm_name`."""
+        if algorithm_name == "minibatch":
+            return {"batch_size": self.minibatch_size, "tol": self.minibatch_tol}
+        if algorithm_name == "kmedoids":
+            return {
+                "pam_max_n": self.kmedoids_pam_max_n,
+                "sample_size": self.kmedoids_sample_size,
+                "swap_budget": self.kmedoids_swap_budget,
+            }
+        return {}
+
+    def _start_restarts(self):
+        """Launch n_init seeded fits of algorithm A; steps wait until the best start is applied."""
+        self._cancel_restarts()
+        n = self.store.n
+        if self.n_init <= 1 or self.algorithm not in CENTROID_ALGORITHMS or n <= self.k:
+            return
+        # Small K-Medoids datasets already start from the deterministic PAM BUILD.
+        if self.algorithm == "kmedoids" and n <= self.kmedoids_pam_max_n:
+            return
+        self._restart_run = restarts.RestartRun(
+            self.store.x,
+            self.store.y,
+            self.algorithm,
+            self.k,
+            self.n_init,
+            self.workers,
+            self.seeding,
+            self._fit_params(self.algorithm),
+        )
+
+    def _cancel_restarts(self):
+        if self._restart_run is not None:
+            self._restart_run.cancel()
+            self._restart_run = None
+
+    def _poll_restarts(self):
+        run = self._restart_run
+        if run is None:
+            return
+        run.poll()
+        if not run.done:
+            return
+        self._restart_run = None
+        if run.errors:
+            error = next(iter(run.errors.values()))
+            self._set_perf_status(
+                f"{len(run.errors)}/{run.n_init} restarts failed: {type(error).__name__}: {error}", seconds=10.0
+            )
+        best = run.best()
+        if best is None or run.n > self.store.n:
+            return
+        _inertia, seed = best
+        # Every path that removes or replaces points cancels the run, so the
+        # first run.n points are still the ones the restarts were fitted on.
+        pick = seeding.seed_points(self.store.x[: run.n], self.store.y[: run.n], self.k, self.seeding, seed).tolist()
+        coords = [(float(self.store.x[j]), float(self.store.y[j])) for j in pick]
+        self._reset_centroids(self.centroids, coords=coords)
+        if self.battle_mode and self.algorithm_b in CENTROID_ALGORITHMS:
+            self._reset_centroids(self.centroids_b, coords=coords)
+        for engines in (self._engines_a, self._engines_b):
+            engines["minibatch"].reset(seed)
+            engines["kmedoids"].reset(seed)
+        self._invalidate_voronoi_cache()
+
+    def _step_side(self, store, centroids, particles, algorithm_name, inertia_history, engines):
+        if not store.n:
             return True
 
         if algorithm_name == "dbscan":
             # DBSCAN is one-shot (no iterative centroid updates)
-            clusters = algorithms.dbscan(points, eps=self.dbscan_eps, min_samples=self.dbscan_min_samples)
-            if points is self.points:
+            clusters = algorithms.dbscan(
+                store,
+                eps=self.dbscan_eps,
+                min_samples=self.dbscan_min_samples,
+                graph=engines["dbscan"],
+                on_change=label_feedback(store, pulse=False),
+            )
+            if store is self.store:
                 self._dbscan_clusters_a = clusters
             else:
                 self._dbscan_clusters_b = clusters
@@ -236,14 +397,30 @@ class GameScene:
         if not centroids:
             return True
 
-        no_changes = algorithms.assign_clusters(points, centroids, particles=particles, max_particles_per_step=10)
+        assigner = engines["assigner"]
+        on_change = label_feedback(store, centroids, particles, max_particles=10)
+        if algorithm_name == "minibatch":
+            minibatch = engines["minibatch"]
+            minibatch.step(store, centroids, self.minibatch_size, on_change=on_change)
+            if minibatch.last_shift >= self.minibatch_tol:
+                inertia_history.append(minibatch.last_inertia)
+                return False
+            # Settled: one full pass so every point shows its final cluster.
+            algorithms.assign_clusters(store, centroids, assigner=assigner, on_change=on_change)
+            inertia_history.append(self._inertia(store, centroids))
+            return True
+
+        no_changes = algorithms.assign_clusters(store, centroids, assigner=assigner, on_change=on_change)
 
         if algorithm_name == "kmedoids":
-            algorithms.update_medoids(points, centroids, candidate_limit=self.kmedoids_candidate_limit)
+            medoids = engines["kmedoids"]
+            algorithms.update_medoids(store, centroids, medoids)
+            # Stable labels are not enough: a swap may still be pending.
+            no_changes = no_changes and medoids.settled
         else:
-            algorithms.update_centroids(points, centroids)
+            algorithms.update_centroids(store, centroids)
 
-        inertia = algorithms.calculate_inertia(points, centroids)
+        inertia = self._inertia(store, centroids)
         inertia_history.append(inertia)
 
         return no_changes
@@ -251,18 +428,47 @@ class GameScene:
     def step_algorithm(self):
         if self.converged and (not self.battle_mode or self.converged_b):
             return
+        if self._restart_run is not None:
+            return
 
-        if not self.converged:
-            self.converged = self._step_side(self.points, self.centroids, self.particles, self.algorithm, self.inertia_history)
-            self.iteration_count += 1
-
-        if self.battle_mode and not self.converged_b:
-            self.converged_b = self._step_side(
-                self.points_b, self.centroids_b, self.particles_b, self.algorithm_b, self.inertia_history_b
-            )
-            self.iteration_count_b += 1
-
+        with self.app.perf.span("algorithm"):
+            if not self.converged:
+                self.converged = self._step_side(
+                    self.store,
+                    self.centroids,
+                    self.particles,
+                    self.algorithm,
+                    self.inertia_history,
+                    self._engines_a,
+                )
+                self.iteration_count += 1
+
+            if self.battle_mode and not self.converged_b:
+                self.converged_b = self._step_side(
+                    self.store_b,
+                    self.centroids_b,
+                    self.particles_b,
+                    self.algorithm_b,
+                    self.inertia_history_b,
+                    self._engines_b,
+                )
+                self.iteration_count_b += 1
+
+    def _set_dbscan_params(self, eps=None, min_samples=None):
+        """Change eps/min_samples; DBSCAN sides that already ran are relabeled right away."""
+        if eps is not None:
+            self.dbscan_eps = eps
+        if min_samples is not None:
+            self.dbscan_min_samples = min_samples
+        sides = [(self.algorithm, self.iteration_count, self.store, self._engines_a)]
+        if self.battle_mode:
+            sides.append((self.algorithm_b, self.iteration_count_b, self.store_b, self._engines_b))
+        for algorithm_name, iterations, store, engines in sides:
+            if algorithm_name == "dbscan" and iterations:
+                self._step_side(store, [], [], algorithm_name, [], engines)
         self._invalidate_voronoi_cache()
+        if self.tutorial_mode:
+            self._set_tutorial_flash(f"DBSCAN eps={self.dbscan_eps}  min_samples={self.dbscan_min_samples}", seconds=1.2)
 
     def enable_battle_mode(self):
         if self.battle_mode:
@@ -274,12 +480,12 @@ class GameScene:
             self.algorithm_b = "kmeans"
         else:
             self.algorithm_b = "kmeans"
-        self.points_b = [Point(p.x, p.y) for p in self.points]
+        self._mirror_points_b()
         self.reset_algorithm()
 
     def disable_battle_mode(self):
         self.battle_mode = False
-        self.points_b.clear()
+        self.store_b.clear()
         self.centroids_b.clear()
         self.particles_b.clear()
         self.converged_b = False
@@ -317,6 +523,8 @@ class GameScene:
             return "K-Medoids"
         if key == "dbscan":
             return "DBSCAN"
+        if key == "minibatch":
+            return "Mini-Batch K-Means"
         return str(key)
 
     def _draw_tutorial_overlay(self):
@@ -421,93 +629,76 @@ class GameScene:
     # -----------------------
     # Data mining helpers
     # -----------------------
+    def _inertia(self, store, centroids):
+        """
+        WCSS for one side. Computed once per step (O(k) from the store's running
+        sums) and reused by every panel until labels or centroids change.
+        """
+        if not store.n or not centroids:
+            return 0
+        key = (store.labels_version, tuple((c.x, c.y) for c in centroids))
+        cached = self._inertia_cache.get(id(store))
+        if cached is None or cached[0] is not store or cached[1] != key:
+            cached = (store, key, metrics.calculate_inertia(store, centroids))
+            self._inertia_cache[id(store)] = cached
+        return cached[2]
+
     def calculate_inertia(self):
-        return algorithms.calculate_inertia(self.points, self.centroids) if self.points and self.centroids else 0
-
-    def _clone_points(self, pts):
-        out = []
-        for p in pts:
-            np = Point(p.x, p.y)
-            np.cluster = p.cluster
-            np.prev_cluster = p.prev_cluster
-            out.append(np)
-        return out
-
-    def _reset_centroids_for(self, pts, k):
-        cents = []
-        for i in range(k):
-            if pts:
-                p = random.choice(pts)
-                x, y = p.x, p.y
-            else:
-                x = random.randint(config.SIDE_MARGIN, config.WIDTH - config.SIDE_MARGIN)
-                y = random.randint(config.TOP_MARGIN, config.HEIGHT - config.UI_PANEL_HEIGHT - 20)
-            cents.append(Centroid(x, y, config.COLORS[i % len(config.COLORS)]))
-        return cents
+        return self._inertia(self.store, self.centroids) if self.points else 0
 
     def run_elbow_method(self):
+        """Start an elbow run on the worker pool; update() draws results as they arrive."""
         if not self.points:
             return
+        self._cancel_elbow()
+        self._elbow_run = elbow.ElbowRun(
+            self.store.x,
+            self.store.y,
+            self.elbow_max_k,
+            self.workers,
+            warm_start=self.elbow_warm_start,
+            method=self.seeding,
+        )
+        self.elbow_data = []
+        self.elbow_failed = []
+        self.show_elbow = True
 
-        original_k = self.k
-        original_points = self._clone_points(self.points)
-        original_centroids = [Centroid(c.x, c.y, c.color) for c in self.centroids]
-        original_algorithm = self.algorithm
-        original_clusters = [p.cluster for p in self.points]
+    def _cancel_elbow(self):
+        if self._elbow_run is not None:
+            self._elbow_run.cancel()
+            self._elbow_run = None
 
+    def _clear_elbow(self):
+        """Cancel the elbow run and drop its chart (the dataset it described is gone)."""
+        self._cancel_elbow()
         self.elbow_data = []
-        self.algorithm = "kmeans"
-
-        max_k = min(10, len(self.points))
-        for test_k in range(1, max_k + 1):
-            tmp_points = self._clone_points(original_points)
-            tmp_centroids = self._reset_centroids_for(tmp_points, test_k)
-
-            # reset assignments
-            for p in tmp_points:
-                p.cluster = None
-                p.prev_cluster = None
-
-            for _ in range(50):
-                done = algorithms.assign_clusters(tmp_points, tmp_centroids, particles=None, max_particles_per_step=0)
-                algorithms.update_centroids(tmp_points, tmp_centroids)
-                if done:
-                    break
-
-            inertia = algorithms.calculate_inertia(tmp_points, tmp_centroids)
-            self.elbow_data.append((test_k, inertia))
-
-        # restore
-        self.k = original_k
-        self.algorithm = original_algorithm
-        self.points = original_points
-        self.centroids = original_centroids
-        for i, p in enumerate(self.points):
-            p.cluster = original_clusters[i] if i < len(original_clusters) else None
+        self.elbow_failed = []
+        self.show_elbow = False
 
-        self.show_elbow = True
-        self._invalidate_voronoi_cache()
+    def _poll_elbow(self):
+        run = self._elbow_run
+        if run is None:
+            return
+        if run.poll():
+            self.elbow_data = run.data()
+            failed = run.failed()
+            if len(failed) > len(self.elbow_failed):
+                error = run.errors[failed[-1]]
+                self._set_perf_status(f"Elbow K={failed[-1]} failed: {type(error).__name__}: {error}", seconds=10.0)
+            self.elbow_failed = failed
+        if run.done:
+            self._elbow_run = None
 
     def calculate_cluster_metrics(self):
         # Only meaningful for centroid-based clustering.
         if self.algorithm == "dbscan" or not self.centroids:
             return {}
-        metrics = {}
-        for i in range(self.k):
-            cluster_points = [p for p in self.points if p.cluster == i]
-            if not cluster_points:
-                continue
-            centroid = self.centroids[i]
-            distances = [p.distance_to(centroid) for p in cluster_points]
-            avg_dist = sum(distances) / len(distances) if distances else 0
-            variance = sum((d - avg_dist) ** 2 for d in distances) / len(distances) if distances else 0
-            metrics[i] = {
-                "size": len(cluster_points),
-                "avg_distance": avg_dist,
-                "variance": variance,
-                "compactness": 1.0 / (1.0 + variance),
-            }
-        return metrics
+        # Cached per frame until labels or centroid positions change.
+        key = (self.store.labels_version, tuple((c.x, c.y) for c in self.centroids))
+        if self._metrics_key != key:
+            self._metrics = metrics.cluster_metrics(self.store, self.centroids[: self.k])
+            self._metrics_key = key
+        return self._metrics
 
     # -----------------------
     # CSV I/O
@@ -523,9 +714,7 @@ class GameScene:
 
         self.csv_points = xy
         self.dataset_type = "csv"
-        self.points = self._points_from_xy(xy)
-        if self.battle_mode:
-            self.points_b = [Point(p.x, p.y) for p in self.points]
+        self._set_points(self._points_from_xy(xy))
         self.reset_algorithm()
         return True
 
@@ -546,12 +735,76 @@ class GameScene:
         csv_io.write_points_csv(path, rows, header=["x", "y", "cluster", "side", "algorithm"])
         return True
 
+    def _set_perf_status(self, msg, seconds=6.0):
+        self._perf_status = msg
+        self._perf_status_until = pygame.time.get_ticks() + int(seconds * 1000)
+
+    def export_frame_timings(self):
+        """Write the buffered per-phase frame timings next to the CSV exports."""
+        name = csv_io.default_export_name("frame_timings")
+        path = os.path.join(csv_io.project_root(__file__), name)
+        try:
+            frames = self.app.perf.write_csv(path)
+        except OSError as e:
+            self._set_perf_status(f"Timings not saved: {e.strerror}")
+            return False
+        self._set_perf_status(f"Saved {frames} frames: {name}")
+        return True
+
+    def toggle_cpu_profile(self):
+        """Start a cProfile session, or stop the running one and write its .pstats file."""
+        profile = self.app.cpu_profile
+        if not profile.active:
+            profile.start()
+            self._set_perf_status("CPU profile recording... [F5] to stop", seconds=3.0)
+            return None
+        try:
+            path, seconds = profile.stop(csv_io.project_root(__file__))
+        except OSError as e:
+            self._set_perf_status(f"Profile not saved: {e.strerror}")
+            return None
+        self._set_perf_status(f"Profiled {seconds:.1f}s: {os.path.basename(path)}")
+        return path
+
+    def capture_memory_snapshot(self):
+        """tracemalloc snapshot; from the second one on, write a top-allocators diff report."""
+        try:
+            path = self.app.memory_snapshots.capture(csv_io.project_root(__file__))
+        except OSError as e:
+            self._set_perf_status(f"Memory report not saved: {e.strerror}")
+            return None
+        if path is None:
+            self._set_perf_status("Memory tracing on: first snapshot taken, [F6] again for a diff")
+        else:
+            self._set_perf_status(f"Memory diff: {os.path.basename(path)}")
+        return path
+
     # -----------------------
     # Input / events
     # -----------------------
+    def _add_point(self, store, centroids, algorithm_name, iterations, point):
+        """
+        Append a clicked point. Once a centroid-based side has been assigned, the
+        point joins its nearest cluster immediately (updating the store's running
+        sums), so the next step only has to move that one centroid.
+        Returns True if the point was assigned.
+        """
+        self._pdist.invalidate()
+        if iterations and centroids and algorithm_name in CENTROID_ALGORITHMS:
+            label = algorithms.nearest_centroid_index(point.x, point.y, centroids)
+            store.append(point, cluster=label)
+            point.transition = 0
+            point.scale = 1.5
+            return True
+        store.append(point)
+        return False
+
     def _back_to_menu(self):
         from scenes.menu_scene import MenuScene
 
+        self._cancel_elbow()
+        self._cancel_restarts()
+
         initial = {
             "algorithm": self.algorithm,
             "dataset": self.dataset_type,
@@ -559,10 +812,62 @@ class GameScene:
             "k": self.k,
             "start_mode": "battle" if self.battle_mode else "single",
             "voronoi": self.show_voronoi,
+            "voronoi_mode": self.voronoi_mode,
             "csv_points": list(self.csv_points),
+            "dbscan_eps": self.dbscan_eps,
+            "dbscan_min_samples": self.dbscan_min_samples,
+            "workers": self.workers,
+            "elbow_max_k": self.elbow_max_k,
+            "elbow_warm_start": self.elbow_warm_start,
+            "n_init": self.n_init,
+            "seeding": self.seeding,
+            "minibatch_size": self.minibatch_size,
+            "kmedoids_sample_size": self.kmedoids_sample_size,
+            "kmedoids_swap_budget": self.kmedoids_swap_budget,
         }
         self.app.set_scene(MenuScene(self.app, initial=initial))
 
+    def _toggle_voronoi(self, cycle_mode=False):
+        """V shows/hides the regions; Shift+V switches to the next drawing mode."""
+        if cycle_mode:
+            modes = voronoi.MODES
+            self.voronoi_mode = modes[(modes.index(self.voronoi_mode) + 1) % len(modes)]
+            self.show_voronoi = True
+            self._invalidate_voronoi_cache()
+        else:
+            self.show_voronoi = not self.show_voronoi
+            # Regions from before the toggle are not worth showing.
+            self._invalidate_voronoi_cache(keep_stale=False)
+
+    def _handle_perf_keys(self, key):
+        """F3 HUD, F4 frame CSV, F5 profiler, F6 memory snapshot (Shift+F6 stops tracing)."""
+        if key == pygame.K_F3:
+            self.show_perf = not self.show_perf
+        elif key == pygame.K_F4:
+            self.export_frame_timings()
+        elif key == pygame.K_F5:
+            self.toggle_cpu_profile()
+        elif key == pygame.K_F6 and pygame.key.get_mods() & pygame.KMOD_SHIFT:
+            self.app.memory_snapshots.stop()
+            self._set_perf_status("Memory tracing stopped")
+        elif key == pygame.K_F6:
+            self.capture_memory_snapshot()
+        else:
+            return False
+        return True
+
+    def _handle_dbscan_keys(self, key):
+        """[ / ] change eps by 5, - / = change min samples by 1."""
+        if key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET):
+            step = 5 if key == pygame.K_RIGHTBRACKET else -5
+            self._set_dbscan_params(eps=max(5, min(200, self.dbscan_eps + step)))
+        elif key in (pygame.K_MINUS, pygame.K_EQUALS):
+            step = 1 if key == pygame.K_EQUALS else -1
+            self._set_dbscan_params(min_samples=max(2, min(30, self.dbscan_min_samples + step)))
+        else:
+            return False
+        return True
+
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             # Input dialog
@@ -592,6 +897,8 @@ class GameScene:
                 return
 
             # Controls
+            if self._handle_perf_keys(event.key) or self._handle_dbscan_keys(event.key):
+                return
             if event.key == pygame.K_t:
                 self.tutorial_mode = not self.tutorial_mode
                 self._set_tutorial_flash("Learning mode ON" if self.tutorial_mode else "Learning mode OFF", seconds=1.4)
@@ -603,7 +910,7 @@ class GameScene:
                     self.tutorial_page = (self.tutorial_page + 1) % 3
             elif event.key == pygame.K_SPACE:
                 self.step_algorithm()
-                if self.tutorial_mode and (self.algorithm in ("kmeans", "kmedoids")):
+                if self.tutorial_mode and (self.algorithm in CENTROID_ALGORITHMS):
                     self._set_tutorial_flash("Step = Assign → Update (one full iteration).", seconds=2.0)
             elif event.key == pygame.K_a:
                 self.auto_iterate = not self.auto_iterate
@@ -614,8 +921,7 @@ class GameScene:
             elif event.key == pygame.K_d:
                 self.show_debug = not self.show_debug
             elif event.key == pygame.K_v:
-                self.show_voronoi = not self.show_voronoi
-                self._invalidate_voronoi_cache()
+                self._toggle_voronoi(cycle_mode=pygame.key.get_mods() & pygame.KMOD_SHIFT)
             elif event.key == pygame.K_b:
                 if self.battle_mode:
                     self.disable_battle_mode()
@@ -626,11 +932,14 @@ class GameScene:
             elif event.key == pygame.K_o:
                 self.export_points_to_csv()
             elif event.key == pygame.K_c:
-                self.points.clear()
+                self._clear_elbow()
+                self._cancel_restarts()
+                self.store.clear()
+                self._pdist.invalidate()
                 self.particles.clear()
                 self.converged = False
                 if self.battle_mode:
-                    self.points_b.clear()
+                    self.store_b.clear()
                     self.particles_b.clear()
                     self.converged_b = False
                 self._invalidate_voronoi_cache()
@@ -656,47 +965,32 @@ class GameScene:
                 self.run_elbow_method()
             elif event.key == pygame.K_m:
                 self._back_to_menu()
-            elif event.key == pygame.K_5:
-                self.algorithm = "kmeans"
-                self.algorithm_b = "kmedoids"
-                self.reset_algorithm()
-            elif event.key == pygame.K_6:
-                self.algorithm = "kmedoids"
-                self.algorithm_b = "kmeans"
-                self.reset_algorithm()
-            elif event.key == pygame.K_7:
-                self.algorithm = "dbscan"
-                self.algorithm_b = "kmeans"
+            elif event.key in ALGORITHM_KEYS:
+                self.algorithm, self.algorithm_b = ALGORITHM_KEYS[event.key]
                 self.reset_algorithm()
             elif event.key == pygame.K_1:
                 n = len(self.points) if self.points else 50
                 self.dataset_type = "blobs"
-                self.points = datasets.generate_blobs(n, centers=max(2, min(5, self.k)))
-                if self.battle_mode:
-                    self.points_b = [Point(p.x, p.y) for p in self.points]
+                self._set_points(datasets.generate_blobs(n, centers=max(2, min(5, self.k))))
                 self.reset_algorithm()
             elif event.key == pygame.K_2:
                 n = len(self.points) if self.points else 50
                 self.dataset_type = "moons"
-                self.points = datasets.generate_moons(n)
-                if self.battle_mode:
-                    self.points_b = [Point(p.x, p.y) for p in self.points]
+                self._set_points(datasets.generate_moons(n))
                 self.reset_algorithm()
             elif event.key == pygame.K_3:
                 n = len(self.points) if self.points else 50
                 self.dataset_type = "circles"
-                self.points = datasets.generate_circles(n)
-                if self.battle_mode:
-                    self.points_b = [Point(p.x, p.y) for p in self.points]
+                self._set_points(datasets.generate_circles(n))
                 self.reset_algorithm()
             elif event.key == pygame.K_4:
                 n = len(self.points) if self.points else 50
                 self.dataset_type = "random"
-                self.points = datasets.generate_spaced_random_points(
-                    n, min_dist=self.min_point_distance, max_tries_per_point=self.max_tries_per_point
+                self._set_points(
+                    datasets.generate_spaced_random_points(
+                        n, min_dist=self.min_point_distance, max_tries_per_point=self.max_tries_per_point
+                    )
                 )
-                if self.battle_mode:
-                    self.points_b = [Point(p.x, p.y) for p in self.points]
                 self.reset_algorithm()
 
         elif event.type == pygame.MOUSEBUTTONDOWN and not self.input_active:
@@ -713,11 +1007,14 @@ class GameScene:
                     model_x = max(config.SIDE_MARGIN, min(w - config.SIDE_MARGIN, model_x))
                     new_a = Point(model_x, my)
                     new_b = Point(model_x, my)
-                    self.points.append(new_a)
-                    self.points_b.append(new_b)
+                    if self._add_point(self.store, self.centroids, self.algorithm, self.iteration_count, new_a):
+                        self.converged = False
+                    if self._add_point(self.store_b, self.centroids_b, self.algorithm_b, self.iteration_count_b, new_b):
+                        self.converged_b = False
                     self._invalidate_voronoi_cache()
                 else:
-                    self.points.append(Point(mx, my))
+                    if self._add_point(self.store, self.centroids, self.algorithm, self.iteration_count, Point(mx, my)):
+                        self.converged = False
                     self.particles.append(
                         ParticleEffect(mx, my, config.COLORS[random.randint(0, len(config.COLORS) - 1)])
                     )
@@ -746,7 +1043,6 @@ class GameScene:
 
                     move_nearest(self.centroids)
                     move_nearest(self.centroids_b)
-                    self._invalidate_voronoi_cache()
                 else:
                     min_dist_sq = float("inf")
                     nearest = None
@@ -762,12 +1058,14 @@ class GameScene:
                         nearest.target_y = my
                         nearest.x = mx
                         nearest.y = my
-                        self._invalidate_voronoi_cache()
 
     # -----------------------
     # Update / draw
     # -----------------------
     def update(self, dt_ms):
+        self._poll_elbow()
+        self._poll_restarts()
+
         # Animations
         for p in self.points:
             p.update()
@@ -799,7 +1097,7 @@ class GameScene:
         pygame.draw.circle(s, (*color, 70), (r, r), r)
         self.app.screen.blit(s, (pos[0] - r, pos[1] - r))
 
-    def _draw_model_view(self, points, centroids, particles, view_rect, x_scale, vor_cache, side_label, status_lines=None):
+    def _draw_model_view(self, points, centroids, particles, view_rect, x_scale, vor, side_label, status_lines=None):
         screen = self.app.screen
 
         def dbscan_color_for_cluster(cid):
@@ -815,81 +1113,94 @@ class GameScene:
             b = (93 * cid + 60) % 220 + 30
             return (r, g, b)
 
+        perf = self.app.perf
+
         # Decision regions
         if self.show_voronoi:
-            vs = voronoi.get_voronoi_surface(
-                centroids,
-                cache=vor_cache,
-                view_w=view_rect.w,
-                view_h=view_rect.h,
-                cell_size=self.voronoi_cell_size,
-                x_scale=x_scale,
-                alpha=45,
-            )
-            if vs is not None:
-                screen.blit(vs, (view_rect.x, view_rect.y))
+            with perf.span("voronoi"):
+                options = {
+                    "cell_size": self.voronoi_cell_size,
+                    "x_scale": x_scale,
+                    "alpha": 45,
+                    "tolerance": self.voronoi_tolerance,
+                    "mode": self.voronoi_mode,
+                }
+                if self.voronoi_background:
+                    vs = vor.surface(centroids, view_rect.w, view_rect.h, **options)
+                else:
+                    vs = voronoi.get_voronoi_surface(centroids, vor.cache, view_rect.w, view_rect.h, **options)
+                if vs is not None:
+                    screen.blit(vs, (view_rect.x, view_rect.y))
 
-        # Draw trails and connection lines on dedicated surfaces (perf)
-        trail_surface = pygame.Surface((view_rect.w, view_rect.h), pygame.SRCALPHA)
-        connection_surface = pygame.Surface((view_rect.w, view_rect.h), pygame.SRCALPHA)
-
-        # Connections
-        # Connection lines are core to understanding assignments, so they should not
-        # depend on debug-panel visibility.
-        if centroids:
-            for p in points:
-                if p.cluster is None:
-                    continue
-                c = centroids[p.cluster]
-                x1 = int(p.x * x_scale)
-                y1 = int(p.y)
-                x2 = int(c.x * x_scale)
-                y2 = int(c.y)
-                pygame.draw.line(connection_surface, (*c.color, 40), (x1, y1), (x2, y2), 1)
-
-        # Trails + points
-        for p in points:
-            col = (170, 170, 180)
+        def point_color(p):
             if centroids and p.cluster is not None and 0 <= p.cluster < len(centroids):
-                col = centroids[p.cluster].color
-            elif (not centroids) and (p.cluster is not None):
+                return centroids[p.cluster].color
+            if (not centroids) and (p.cluster is not None):
                 # DBSCAN mode: cluster ids live on the points (no centroids)
                 try:
                     cid = int(p.cluster)
                 except Exception:
                     cid = -1
-                col = dbscan_color_for_cluster(cid)
+                return dbscan_color_for_cluster(cid)
+            return (170, 170, 180)
+
+        colors = [point_color(p) for p in points]
+
+        # Draw trails and connection lines on dedicated surfaces (perf)
+        with perf.span("trails"):
+            trail_surface = pygame.Surface((view_rect.w, view_rect.h), pygame.SRCALPHA)
+            connection_surface = pygame.Surface((view_rect.w, view_rect.h), pygame.SRCALPHA)
+
+            # Connections
+            # Connection lines are core to understanding assignments, so they should not
+            # depend on debug-panel visibility.
+            if centroids:
+                for p in points:
+                    if p.cluster is None:
+                        continue
+                    c = centroids[p.cluster]
+                    x1 = int(p.x * x_scale)
+                    y1 = int(p.y)
+                    x2 = int(c.x * x_scale)
+                    y2 = int(c.y)
+                    pygame.draw.line(connection_surface, (*c.color, 40), (x1, y1), (x2, y2), 1)
 
             # Trails
-            if len(p.trail) > 1:
-                pts = [(int(tx * x_scale), int(ty)) for (tx, ty) in p.trail]
-                for i in range(1, len(pts)):
-                    a = int(20 + (i / len(pts)) * 70)
-                    pygame.draw.line(trail_surface, (*col, a), pts[i - 1], pts[i], 2)
-
-            # Point
-            px = view_rect.x + int(p.x * x_scale)
-            py = view_rect.y + int(p.y)
-            radius = int(6 * p.scale)
-            pygame.draw.circle(screen, col, (px, py), radius)
-            pygame.draw.circle(screen, (0, 0, 0), (px, py), radius, 1)
-
-        screen.blit(trail_surface, (view_rect.x, view_rect.y))
-        screen.blit(connection_surface, (view_rect.x, view_rect.y))
+            for p, col in zip(points, colors):
+                if len(p.trail) > 1:
+                    pts = [(int(tx * x_scale), int(ty)) for (tx, ty) in p.trail]
+                    for i in range(1, len(pts)):
+                        a = int(20 + (i / len(pts)) * 70)
+                        pygame.draw.line(trail_surface, (*col, a), pts[i - 1], pts[i], 2)
+
+        # Points (drawn before the trail/connection layers are blitted over them)
+        with perf.span("points"):
+            for p, col in zip(points, colors):
+                px = view_rect.x + int(p.x * x_scale)
+                py = view_rect.y + int(p.y)
+                radius = int(6 * p.scale)
+                pygame.draw.circle(screen, col, (px, py), radius)
+                pygame.draw.circle(screen, (0, 0, 0), (px, py), radius, 1)
+
+        with perf.span("trails"):
+            screen.blit(trail_surface, (view_rect.x, view_rect.y))
+            screen.blit(connection_surface, (view_rect.x, view_rect.y))
 
         # Centroids
-        for i, c in enumerate(centroids):
-            cx = view_rect.x + int(c.x * x_scale)
-            cy = view_rect.y + int(c.y)
-            self._draw_glow(c.color, (cx, cy), c.glow_radius)
-            pygame.draw.circle(screen, c.color, (cx, cy), 10)
-            pygame.draw.circle(screen, (255, 255, 255), (cx, cy), 10, 2)
-            txt = self.app.tiny_font.render(str(i + 1), True, (0, 0, 0))
-            screen.blit(txt, (cx - txt.get_width() // 2, cy - txt.get_height() // 2))
+        with perf.span("points"):
+            for i, c in enumerate(centroids):
+                cx = view_rect.x + int(c.x * x_scale)
+                cy = view_rect.y + int(c.y)
+                self._draw_glow(c.color, (cx, cy), c.glow_radius)
+                pygame.draw.circle(screen, c.color, (cx, cy), 10)
+                pygame.draw.circle(screen, (255, 255, 255), (cx, cy), 10, 2)
+                txt = self.app.tiny_font.render(str(i + 1), True, (0, 0, 0))
+                screen.blit(txt, (cx - txt.get_width() // 2, cy - txt.get_height() // 2))
 
         # Particles
-        for pe in particles:
-            pe.draw(screen, x_scale=x_scale, x_offset=view_rect.x, y_offset=view_rect.y)
+        with perf.span("particles"):
+            for pe in particles:
+                pe.draw(screen, x_scale=x_scale, x_offset=view_rect.x, y_offset=view_rect.y)
 
         # Side label
         label = self.app.small_font.render(side_label, True, config.TEXT_COLOR)
@@ -1023,8 +1334,11 @@ class GameScene:
             )
 
     def draw_elbow_method(self):
-        if not self.elbow_data or len(self.elbow_data) < 2:
+        running = self._elbow_run is not None
+        if not running and len(self.elbow_data) < 2 and not self.elbow_failed:
             return
+        # X axis spans the whole requested K range so partial results land in place.
+        max_k = self._elbow_run.max_k if running else max([k for k, _ in self.elbow_data] + self.elbow_failed)
 
         panel_width = 340
         panel_height = 240
@@ -1037,8 +1351,15 @@ class GameScene:
         pygame.draw.rect(s, config.COLORS[0], (0, 0, panel_width, panel_height), 2, border_radius=10)
         self.app.screen.blit(s, (panel_x, panel_y))
 
-        title = self.app.small_font.render("Elbow Method (K vs Inertia)", True, config.COLORS[0])
+        title_text = "Elbow Method (K vs Inertia)"
+        if running:
+            title_text += f"  {len(self.elbow_data)}/{max_k}"
+        if self.elbow_failed:
+            title_text += f"  ({len(self.elbow_failed)} failed)"
+        title = self.app.small_font.render(title_text, True, config.COLORS[0])
         self.app.screen.blit(title, (panel_x + 12, panel_y + 10))
+        if not self.elbow_data:
+            return
 
         max_inertia = max(v for _, v in self.elbow_data)
         min_inertia = min(v for _, v in self.elbow_data)
@@ -1049,19 +1370,21 @@ class GameScene:
         plot_h = panel_height - pad * 2
 
         pts = []
-        for i, (k, inertia) in enumerate(self.elbow_data):
-            x = panel_x + pad + (i / (len(self.elbow_data) - 1)) * plot_w
+        for k, inertia in self.elbow_data:
+            x = panel_x + pad + ((k - 1) / max(1, max_k - 1)) * plot_w
             norm = (inertia - min_inertia) / rng
             y = panel_y + pad + plot_h - (norm * plot_h)
             pts.append((x, y))
 
         if len(pts) > 1:
             pygame.draw.lines(self.app.screen, config.COLORS[1 % len(config.COLORS)], False, pts, 2)
+        label_every = max(1, math.ceil(max_k / 10))
         for i, (k, inertia) in enumerate(self.elbow_data):
             x, y = pts[i]
             pygame.draw.circle(self.app.screen, config.COLORS[1 % len(config.COLORS)], (int(x), int(y)), 4)
-            ks = self.app.tiny_font.render(f"K={k}", True, config.TEXT_COLOR)
-            self.app.screen.blit(ks, (int(x) - 10, int(y) + 6))
+            if k == 1 or k % label_every == 0:
+                ks = self.app.tiny_font.render(f"K={k}", True, config.TEXT_COLOR)
+                self.app.screen.blit(ks, (int(x) - 10, int(y) + 6))
 
     def draw_stats_panel(self):
         if self.algorithm == "dbscan":
@@ -1124,6 +1447,19 @@ class GameScene:
                 self.app.screen.blit(surf, (panel_x + 10, y))
                 y += 18
 
+    def _engine_text(self, algorithm_name, engines):
+        if algorithm_name == "dbscan":
+            graph = engines["dbscan"]
+            cache = f"cached <= {graph.max_eps:.0f}px" if graph.last_cached else "direct"
+            return f"Neighbors: {cache}"
+        if algorithm_name == "kmedoids":
+            medoids = engines["kmedoids"]
+            return f"Medoids: {medoids.mode or '-'}  swaps={medoids.last_swaps}"
+        assigner = engines["assigner"]
+        total = assigner.last_skipped + assigner.last_evaluated
+        pct = (100.0 * assigner.last_skipped / total) if total else 0.0
+        return f"Dist skipped: {assigner.last_skipped} ({pct:.0f}%)"
+
     def _draw_debug_panel(self):
         # Responsive debug panel (auto height based on content)
         if not self.show_debug:
@@ -1138,17 +1474,35 @@ class GameScene:
             (f"DBSCAN min: {self.dbscan_min_samples}", config.TEXT_COLOR),
             (f"Auto: {'On' if self.auto_iterate else 'Off'}", config.TEXT_COLOR),
             (f"Converged: {'Yes' if self.converged else 'No'}", config.TEXT_COLOR),
+            (self._engine_text(self.algorithm, self._engines_a), config.TEXT_COLOR),
         ]
+        if self.show_voronoi:
+            vor = self._voronoi_a
+            builds = vor.cache.full_updates + vor.cache.partial_updates
+            busy = "  rebuilding" if vor.rebuilding else ""
+            lines.append((f"Voronoi: {builds} builds, {vor.stale_frames} stale{busy}", config.TEXT_COLOR))
+        if self._restart_run is not None:
+            run = self._restart_run
+            failed = f" ({len(run.errors)} failed)" if run.errors else ""
+            lines.append((f"Restarts: {len(run.results)}/{run.n_init}{failed}", config.TEXT_COLOR))
+        if self.app.cpu_profile.active:
+            lines.append(("CPU profile: REC [F5]", config.COLORS[0]))
+        if self.app.memory_snapshots.active:
+            lines.append(("Memory tracing: ON [F6]", config.COLORS[0]))
+        if self._perf_status and pygame.time.get_ticks() < self._perf_status_until:
+            for line in self._wrap_text(self.app.tiny_font, self._perf_status, 220):
+                lines.append((line, config.COLORS[4 % len(config.COLORS)]))
         if self.battle_mode:
             lines += [
                 (f"Algo B: {self.algorithm_b}", config.TEXT_COLOR),
                 (f"Conv B: {'Yes' if self.converged_b else 'No'}", config.TEXT_COLOR),
+                (self._engine_text(self.algorithm_b, self._engines_b), config.TEXT_COLOR),
             ]
 
         panel_w = 240
         pad = 10
         line_h = 18
-        panel_h = min(260, max(110, pad * 2 + len(lines) * line_h))
+        panel_h = min(320, max(110, pad * 2 + len(lines) * line_h))
         w, _h = self.app.screen.get_size()
         panel_x = w - panel_w - 10
         panel_y = 10
@@ -1164,6 +1518,54 @@ class GameScene:
             self.app.screen.blit(surf, (panel_x + pad, y))
             y += line_h
 
+    def _draw_perf_hud(self):
+        if not self.show_perf:
+            return
+
+        perf = self.app.perf
+        stats = perf.percentiles((50, 95, 99))
+        font = self.app.tiny_font
+        budget = 1000.0 / config.FPS
+
+        pad = 10
+        row_h = 16
+        label_w = 70
+        bar_w = 160
+        text_w = 130
+        panel_w = pad * 2 + label_w + bar_w + 10 + text_w
+        panel_h = pad * 2 + (len(perf.phases) + 2 + (1 if self._perf_status else 0)) * row_h
+        panel_x = 10
+        panel_y = 40
+
+        s = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
+        pygame.draw.rect(s, (*config.UI_BG, 230), (0, 0, panel_w, panel_h), border_radius=10)
+        pygame.draw.rect(s, config.COLORS[4 % len(config.COLORS)], (0, 0, panel_w, panel_h), 2, border_radius=10)
+
+        title = f"FRAME TIMES  last {len(perf)} frames  (p50 / p95 / p99 ms)"
+        s.blit(font.render(title, True, config.COLORS[4 % len(config.COLORS)]), (pad, pad))
+
+        # Bars share one scale; the white tick marks the frame budget.
+        scale = bar_w / max(budget, max(v[2] for v in stats.values()), 1e-6)
+        bar_x = pad + label_w
+        y = pad + row_h
+        for name in perf.phases:
+            p50, p95, p99 = stats[name]
+            over = p95 > budget
+            color = config.COLORS[0] if over else config.COLORS[1 % len(config.COLORS)]
+            s.blit(font.render(name, True, config.TEXT_COLOR), (pad, y))
+            pygame.draw.rect(s, (*color, 60), (bar_x, y + 3, int(p99 * scale), row_h - 6))
+            pygame.draw.rect(s, (*color, 120), (bar_x, y + 3, int(p95 * scale), row_h - 6))
+            pygame.draw.rect(s, (*color, 230), (bar_x, y + 3, int(p50 * scale), row_h - 6))
+            s.blit(font.render(f"{p50:5.1f} {p95:5.1f} {p99:5.1f}", True, config.TEXT_COLOR), (bar_x + bar_w + 10, y))
+            y += row_h
+        budget_x = bar_x + int(budget * scale)
+        pygame.draw.line(s, (255, 255, 255, 160), (budget_x, pad + row_h), (budget_x, y), 1)
+
+        s.blit(font.render(f"budget {budget:.1f} ms   [F3] hide  [F4] save CSV", True, config.TEXT_COLOR), (pad, y + 2))
+        if self._perf_status:
+            s.blit(font.render(self._perf_status, True, config.TEXT_COLOR), (pad, y + 2 + row_h))
+        self.app.screen.blit(s, (panel_x, panel_y))
+
     def draw(self):
         screen = self.app.screen
         w, h = screen.get_size()
@@ -1189,12 +1591,12 @@ class GameScene:
 
             a_extra = None
             if self.algorithm == "dbscan":
-                noise_a = sum(1 for p in self.points if p.cluster == -1)
+                noise_a = self.store.label_count(NOISE)
                 a_extra = f"eps={self.dbscan_eps}  min={self.dbscan_min_samples}  clusters={self._dbscan_clusters_a}  noise={noise_a}"
 
             b_extra = None
             if self.algorithm_b == "dbscan":
-                noise_b = sum(1 for p in self.points_b if p.cluster == -1)
+                noise_b = self.store_b.label_count(NOISE)
                 b_extra = f"eps={self.dbscan_eps}  min={self.dbscan_min_samples}  clusters={self._dbscan_clusters_b}  noise={noise_b}"
 
             self._draw_model_view(
@@ -1203,7 +1605,7 @@ class GameScene:
                 self.particles,
                 left_view,
                 0.5,
-                self._vor_cache_a,
+                self._voronoi_a,
                 f"A: {self.algorithm}",
                 status_lines=[
                     (f"{mode_tag} | {a_state}", a_color),
@@ -1217,7 +1619,7 @@ class GameScene:
                 self.particles_b,
                 right_view,
                 0.5,
-                self._vor_cache_b,
+                self._voronoi_b,
                 f"B: {self.algorithm_b}",
                 status_lines=[
                     (f"{mode_tag} | {b_state}", b_color),
@@ -1233,7 +1635,7 @@ class GameScene:
             state = "CONVERGED ✓" if done else "RUNNING"
             extra = None
             if self.algorithm == "dbscan":
-                noise = sum(1 for p in self.points if p.cluster == -1)
+                noise = self.store.label_count(NOISE)
                 extra = f"eps={self.dbscan_eps}  min={self.dbscan_min_samples}  clusters={self._dbscan_clusters_a}  noise={noise}"
             self._draw_model_view(
                 self.points,
@@ -1241,7 +1643,7 @@ class GameScene:
                 self.particles,
                 play_rect,
                 1.0,
-                self._vor_cache_a,
+                self._voronoi_a,
                 f"{self.algorithm}",
                 status_lines=[
                     (f"{mode_tag} | {state}", state_color),
@@ -1250,7 +1652,8 @@ class GameScene:
                 ],
             )
 
-        # Graphs / overlays
+        # Graphs / overlays (timed up to the flip)
+        overlays_start = time.perf_counter()
         if self.show_graph:
             self.draw_convergence_graph()
         if self.show_elbow:
@@ -1259,6 +1662,7 @@ class GameScene:
             self.draw_stats_panel()
         self._draw_debug_panel()
         self._draw_tutorial_overlay()
+        self._draw_perf_hud()
 
         # Bottom UI bar
         ui_rect = pygame.Rect(0, h - config.UI_PANEL_HEIGHT, w, config.UI_PANEL_HEIGHT)
@@ -1270,24 +1674,15 @@ class GameScene:
         status_color = config.COLORS[1 % len(config.COLORS)] if fully_converged else config.COLORS[0]
         status_text = "CONVERGED ✓" if fully_converged else ("AUTO" if self.auto_iterate else "PAUSED")
 
-        if self.algorithm == "kmeans":
-            algo_a = "K-Means"
-        elif self.algorithm == "kmedoids":
-            algo_a = "K-Medoids"
-        else:
-            algo_a = "DBSCAN"
+        algo_a = self._algo_pretty(self.algorithm)
         if self.battle_mode:
-            if self.algorithm_b == "kmeans":
-                algo_b = "K-Means"
-            elif self.algorithm_b == "kmedoids":
-                algo_b = "K-Medoids"
-            else:
-                algo_b = "DBSCAN"
+            algo_b = self._algo_pretty(self.algorithm_b)
             mode_text = f"BATTLE  |  A: {algo_a} vs B: {algo_b}"
         else:
             mode_text = f"SINGLE  |  Algo: {algo_a}"
 
-        header_left = f"{status_text}  |  Dataset: {self.dataset_type.upper()}  |  Voronoi: {'ON' if self.show_voronoi else 'OFF'}"
+        voronoi_text = self.voronoi_mode.upper() if self.show_voronoi else "OFF"
+        header_left = f"{status_text}  |  Dataset: {self.dataset_type.upper()}  |  Voronoi: {voronoi_text}"
         header_y = ui_rect.y + 10
         screen.blit(self.app.small_font.render(header_left, True, status_color), (20, header_y))
         right_header = self.app.small_font.render(mode_text, True, config.TEXT_COLOR)
@@ -1318,9 +1713,11 @@ class GameScene:
 
         # Keybinds (clear + scannable)
         controls_left = [
-            "CORE: [SPACE] Step  [A] Auto  [R] Reset  [M] Menu  [D] Debug  [C] Clear",
+            "CORE: [SPACE] Step  [A] Auto  [R] Reset  [M] Menu  [D] Debug  [C] Clear   "
+            "PERF: [F3] HUD  [F4] CSV  [F5] Profile  [F6] Memory",
             "DATASETS: [1] Blobs  [2] Moons  [3] Circles  [4] Random",
-            "ALGO: [5] K-Means  [6] K-Medoids  [7] DBSCAN   VIEW: [V] Voronoi  [B] Battle  [T] Tutorial",
+            "ALGO: [5] K-Means  [6] K-Medoids  [7] DBSCAN  [8] Mini-Batch   DBSCAN: [ / ] eps  - / = min   "
+            "VIEW: [V] Voronoi (SHIFT: style)  [B] Battle  [T] Tutorial",
             "ANALYSIS: [G] Graph  [S] Stats  [E] Elbow   CSV: [I] Import  [O] Export   MOUSE: L-Click add  R-Click move",
         ]
 
@@ -1328,14 +1725,14 @@ class GameScene:
         for line in controls_left:
             left_lines += wrap(self.app.tiny_font, line, left_w)
 
-        inertia_a = int(algorithms.calculate_inertia(self.points, self.centroids)) if self.points and self.centroids else 0
+        inertia_a = int(self._inertia(self.store, self.centroids)) if self.points else 0
         stats_right = [
             f"K={self.k}",
             f"IterA={self.iteration_count}  ConvA={'Y' if self.converged else 'N'}",
             f"InertiaA={inertia_a}",
         ]
         if self.battle_mode:
-            inertia_b = int(algorithms.calculate_inertia(self.points_b, self.centroids_b)) if self.points_b and self.centroids_b else 0
+            inertia_b = int(self._inertia(self.store_b, self.centroids_b)) if self.points_b else 0
             stats_right += [
                 f"IterB={self.iteration_count_b}  ConvB={'Y' if self.converged_b else 'N'}",
                 f"InertiaB={inertia_b}",
@@ -1365,7 +1762,9 @@ class GameScene:
 
         if self.input_active:
             self.draw_input_dialog()
+        self.app.perf.add("overlays", time.perf_counter() - overlays_start)
 
-        pygame.display.flip()
+        with self.app.perf.span("flip"):
+            pygame.display.flip()
 
 
@@ -6,6 +6,24 @@ import pygame
 import csv_io
 import datasets
 import config
+from clustering import pool
+
+
+# Numeric settings: key -> (min, max, step); max None is the CPU count.
+# Every setting `key` lives in the scene's `menu_<key>` attribute.
+INT_SETTINGS = {
+    "points": (1, 500, 5),
+    "k": (1, 10, 1),
+    "dbscan_eps": (5, 200, 5),
+    "dbscan_min_samples": (2, 30, 1),
+    "workers": (1, None, 1),
+    "elbow_max_k": (2, 40, 1),
+    "n_init": (1, 32, 1),
+    "minibatch_size": (32, 4096, 32),
+    "kmedoids_sample_size": (100, 5000, 100),
+    "kmedoids_swap_budget": (1, 20, 1),
+}
+BOOL_SETTINGS = ("voronoi", "tutorial", "elbow_warm_start")
 
 
 class MenuScene:
@@ -13,7 +31,7 @@ class MenuScene:
     Accessible main menu:
     - Keyboard: UP/DOWN select, LEFT/RIGHT change, ENTER activate
     - Mouse: click rows to select; click actions to activate
-    - Shortcuts: 1-4 datasets, 5/6/7 algorithms, B battle, V voronoi, I import, O export
+    - Shortcuts: 1-4 datasets, 5/6/7/8 algorithms, B battle, V voronoi, I import, O export
     """
 
     def __init__(self, app, initial=None):
@@ -22,15 +40,25 @@ class MenuScene:
         initial = initial or {}
 
         self.menu_index = 0
-        self.menu_algorithm = initial.get("algorithm", "kmeans")  # kmeans/kmedoids/dbscan
+        self.menu_scroll = 0  # first visible settings row
+        self.menu_algorithm = initial.get("algorithm", "kmeans")  # kmeans/kmedoids/dbscan/minibatch
         self.menu_dataset = initial.get("dataset", "random")  # random/blobs/moons/circles/csv
         self.menu_points = int(initial.get("points", 50))
         self.menu_k = int(initial.get("k", 3))
         self.menu_start_mode = initial.get("start_mode", "single")  # single/battle
         self.menu_voronoi = bool(initial.get("voronoi", False))
+        self.menu_voronoi_mode = initial.get("voronoi_mode", "polygons")  # polygons/raster/quadtree
         self.menu_tutorial = bool(initial.get("tutorial", False))
         self.menu_dbscan_eps = int(initial.get("dbscan_eps", 45))
         self.menu_dbscan_min_samples = int(initial.get("dbscan_min_samples", 5))
+        self.menu_workers = int(initial.get("workers", pool.default_workers()))
+        self.menu_elbow_max_k = int(initial.get("elbow_max_k", 10))
+        self.menu_elbow_warm_start = bool(initial.get("elbow_warm_start", True))
+        self.menu_n_init = int(initial.get("n_init", 1))
+        self.menu_seeding = initial.get("seeding", "kmeans++")  # random/kmeans++/kmeans||
+        self.menu_minibatch_size = int(initial.get("minibatch_size", 256))
+        self.menu_kmedoids_sample_size = int(initial.get("kmedoids_sample_size", 400))
+        self.menu_kmedoids_swap_budget = int(initial.get("kmedoids_swap_budget", 2))
 
         self.csv_points = list(initial.get("csv_points", []))  # list[(x,y)]
 
@@ -54,7 +82,12 @@ class MenuScene:
                 "type": "choice",
                 "label": "Algorithm (A)",
                 "value": self.menu_algorithm,
-                "choices": [("kmeans", "K-Means"), ("kmedoids", "K-Medoids"), ("dbscan", "DBSCAN")],
+                "choices": [
+                    ("kmeans", "K-Means"),
+                    ("kmedoids", "K-Medoids"),
+                    ("dbscan", "DBSCAN"),
+                    ("minibatch", "Mini-Batch K-Means"),
+                ],
             },
             {
                 "key": "dataset",
@@ -69,18 +102,24 @@ class MenuScene:
                     ("csv", "CSV"),
                 ],
             },
-            {"key": "points", "type": "int", "label": "Points", "value": self.menu_points, "min": 1, "max": 500, "step": 5},
-            {"key": "k", "type": "int", "label": "Clusters (K)", "value": self.menu_k, "min": 1, "max": 10, "step": 1},
-            {"key": "dbscan_eps", "type": "int", "label": "DBSCAN eps (px)", "value": self.menu_dbscan_eps, "min": 5, "max": 200, "step": 5},
+            self._int_item("points", "Points"),
+            self._int_item("k", "Clusters (K)"),
+            self._int_item("dbscan_eps", "DBSCAN eps (px)"),
+            self._int_item("dbscan_min_samples", "DBSCAN min_samples"),
+            self._int_item("workers", "Worker processes"),
+            self._int_item("elbow_max_k", "Elbow max K"),
+            {"key": "elbow_warm_start", "type": "bool", "label": "Elbow warm start", "value": self.menu_elbow_warm_start},
             {
-                "key": "dbscan_min_samples",
-                "type": "int",
-                "label": "DBSCAN min_samples",
-                "value": self.menu_dbscan_min_samples,
-                "min": 2,
-                "max": 30,
-                "step": 1,
+                "key": "seeding",
+                "type": "choice",
+                "label": "Seeding",
+                "value": self.menu_seeding,
+                "choices": [("random", "Random"), ("kmeans++", "k-means++"), ("kmeans||", "k-means||")],
             },
+            self._int_item("n_init", "Restarts (n_init)"),
+            self._int_item("minibatch_size", "Mini-batch size"),
+            self._int_item("kmedoids_sample_size", "K-Medoids CLARA sample"),
+            self._int_item("kmedoids_swap_budget", "K-Medoids swaps/step"),
             {
                 "key": "start_mode",
                 "type": "choice",
@@ -89,6 +128,13 @@ class MenuScene:
                 "choices": [("single", "Single"), ("battle", "Battle (A/B)")],
             },
             {"key": "voronoi", "type": "bool", "label": "Voronoi regions", "value": self.menu_voronoi},
+            {
+                "key": "voronoi_mode",
+                "type": "choice",
+                "label": "Voronoi style",
+                "value": self.menu_voronoi_mode,
+                "choices": [("polygons", "Exact polygons"), ("raster", "Raster cells"), ("quadtree", "Quadtree cells")],
+            },
             {"key": "tutorial", "type": "bool", "label": "Learning mode (Tutorial)", "value": self.menu_tutorial},
             {"key": "import", "type": "action", "label": "Import CSV", "value": None},
             {"key": "export", "type": "action", "label": "Export CSV", "value": None},
@@ -96,25 +142,22 @@ class MenuScene:
             {"key": "quit", "type": "action", "label": "Quit", "value": None},
         ]
 
+    def _int_item(self, key, label):
+        low, high, step = INT_SETTINGS[key]
+        if high is None:
+            high = pool.default_workers()
+        value = getattr(self, f"menu_{key}")
+        return {"key": key, "type": "int", "label": label, "value": value, "min": low, "max": high, "step": step}
+
     def _apply_item_value(self, key, value):
-        if key == "algorithm":
-            self.menu_algorithm = value
-        elif key == "dataset":
-            self.menu_dataset = value
-        elif key == "points":
-            self.menu_points = int(value)
-        elif key == "k":
-            self.menu_k = int(value)
-        elif key == "start_mode":
-            self.menu_start_mode = value
-        elif key == "voronoi":
-            self.menu_voronoi = bool(value)
-        elif key == "tutorial":
-            self.menu_tutorial = bool(value)
-        elif key == "dbscan_eps":
-            self.menu_dbscan_eps = int(value)
-        elif key == "dbscan_min_samples":
-            self.menu_dbscan_min_samples = int(value)
+        attr = f"menu_{key}"
+        if not hasattr(self, attr):
+            return
+        if key in INT_SETTINGS:
+            value = int(value)
+        elif key in BOOL_SETTINGS:
+            value = bool(value)
+        setattr(self, attr, value)
 
         self._regen_preview()
 
@@ -179,9 +222,18 @@ class MenuScene:
             "k": self.menu_k,
             "battle_mode": (self.menu_start_mode == "battle"),
             "voronoi": self.menu_voronoi,
+            "voronoi_mode": self.menu_voronoi_mode,
             "csv_points": list(self.csv_points),
             "dbscan_eps": self.menu_dbscan_eps,
             "dbscan_min_samples": self.menu_dbscan_min_samples,
+            "workers": self.menu_workers,
+            "elbow_max_k": self.menu_elbow_max_k,
+            "elbow_warm_start": self.menu_elbow_warm_start,
+            "n_init": self.menu_n_init,
+            "seeding": self.menu_seeding,
+            "minibatch_size": self.menu_minibatch_size,
+            "kmedoids_sample_size": self.menu_kmedoids_sample_size,
+            "kmedoids_swap_budget": self.menu_kmedoids_swap_budget,
             "tutorial": self.menu_tutorial,
         }
         self.app.set_scene(GameScene(self.app, settings))
@@ -230,6 +282,9 @@ class MenuScene:
         if event.key == pygame.K_7:
             self._apply_item_value("algorithm", "dbscan")
             return
+        if event.key == pygame.K_8:
+            self._apply_item_value("algorithm", "minibatch")
+            return
         if event.key == pygame.K_b:
             self._apply_item_value("start_mode", "battle" if self.menu_start_mode != "battle" else "single")
             return
@@ -324,7 +379,7 @@ class MenuScene:
         s_title = self.app.menu_section_font.render("Settings", True, config.TEXT_COLOR)
         screen.blit(s_title, (left.x + 16, left.y + 12))
 
-        # Auto-fit rows so the menu always fits all items (no clipping)
+        # Auto-fit rows; if they still don't fit, scroll to keep the selection visible
         row_start_y = left.y + 52
         gap = 6
         # Leave some padding at the bottom of the panel
@@ -334,10 +389,26 @@ class MenuScene:
         row_h = max(28, min(38, row_h))
         row_y = row_start_y
 
+        visible = max(1, (row_area_h + gap) // (row_h + gap))
+        if self.menu_index < self.menu_scroll:
+            self.menu_scroll = self.menu_index
+        elif self.menu_index >= self.menu_scroll + visible:
+            self.menu_scroll = self.menu_index - visible + 1
+        self.menu_scroll = max(0, min(self.menu_scroll, len(items) - visible))
+
         row_font = self.app.menu_item_font if row_h >= 34 else self.app.tiny_font
         self._menu_layout_cache = {"rows": []}
 
+        if self.menu_scroll > 0:
+            more = self.app.tiny_font.render("^ more", True, (180, 180, 195))
+            screen.blit(more, (left.right - more.get_width() - 16, left.y + 18))
+        if self.menu_scroll + visible < len(items):
+            more = self.app.tiny_font.render("v more", True, (180, 180, 195))
+            screen.blit(more, (left.right - more.get_width() - 16, left.bottom - more.get_height() - 2))
+
         for idx, it in enumerate(items):
+            if idx < self.menu_scroll or idx >= self.menu_scroll + visible:
+                continue
             selected = idx == self.menu_index
             row_rect = pygame.Rect(left.x + 10, row_y, left.w - 20, row_h)
             self._menu_layout_cache["rows"].append((row_rect, it["key"]))
@@ -396,7 +467,7 @@ class MenuScene:
         # Bottom help
         help_lines = [
             "NAV: [UP/DOWN] Select   [LEFT/RIGHT] Change   [ENTER] Activate   [ESC] Quit",
-            "QUICK: [1-4] Dataset   [5-7] Algorithm   [B] Battle   [V] Voronoi   [T] Tutorial   [I/O] CSV",
+            "QUICK: [1-4] Dataset   [5-8] Algorithm   [B] Battle   [V] Voronoi   [T] Tutorial   [I/O] CSV",
         ]
 
         def wrap(font, text, max_w):
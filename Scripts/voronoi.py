@@ -1,49 +1,402 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
 import pygame
 
 
+# get_voronoi_surface engines: exact clipped polygons, a grid of cells, or the
+# same grid filled by quadtree subdivision
+MODES = ("polygons", "raster", "quadtree")
+# Quadtree: side (in cells) of the top-level blocks
+QUADTREE_BLOCK = 32
+
+
 class VoronoiCache:
+    """
+    Last decision-region render of one view: the settings it was drawn with,
+    the centroid positions it reflects, and the per-cell nearest-centroid
+    labels and squared distances (kept so a few moved centroids can be
+    patched in without recomputing every cell).
+    """
+
     def __init__(self):
-        self.key = None
-        self.surface = None
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.invalidate()
 
     def invalidate(self):
         self.key = None
         self.surface = None
+        self.cx = None
+        self.cy = None
+        self.xs = None
+        self.ys = None
+        self.labels = None
+        self.best = None
+        self.grid = None
+
+
+def nearest_center_grid(cx, cy, xs, ys):
+    """
+    Index of the nearest center for every sample (xs[i], ys[j]), as a
+    (len(xs), len(ys)) array (x-major, like pygame.surfarray), and the squared
+    distance to it. Ties go to the lower index. Squared distances are
+    separable, so each center costs one broadcast add over the grid.
+    """
+    dx2 = (xs[None, :] - cx[:, None]) ** 2
+    dy2 = (ys[None, :] - cy[:, None]) ** 2
+    best = dx2[0][:, None] + dy2[0][None, :]
+    labels = np.zeros(best.shape, dtype=np.uint8 if cx.size <= 256 else np.intp)
+    d = np.empty_like(best)
+    closer = np.empty(best.shape, dtype=bool)
+    for i in range(1, cx.size):
+        np.add(dx2[i][:, None], dy2[i][None, :], out=d)
+        np.less(d, best, out=closer)
+        np.copyto(best, d, where=closer)
+        np.copyto(labels, i, where=closer)
+    return labels, best
+
+
+def _fill_blocks(labels, known, x0, y0, values, size):
+    """labels[x0:x0+size, y0:y0+size] = value for every block (clipped to the grid)."""
+    if x0.size * size * size <= 1 << 16 or size <= 4:
+        # Many small blocks: one fancy-indexed write
+        offsets = np.arange(size)
+        gx = np.broadcast_to((x0[:, None] + offsets)[:, :, None], (x0.size, size, size))
+        gy = np.broadcast_to((y0[:, None] + offsets)[:, None, :], (x0.size, size, size))
+        inside = (gx < labels.shape[0]) & (gy < labels.shape[1])
+        gx, gy = gx[inside], gy[inside]
+        labels[gx, gy] = np.broadcast_to(values[:, None, None], inside.shape)[inside]
+        known[gx, gy] = True
+        return
+    # Large blocks: paint a block-resolution map and upscale it in one pass
+    w, h = labels.shape
+    grid = np.zeros((-(-w // size), -(-h // size)), dtype=labels.dtype)
+    filled = np.zeros(grid.shape, dtype=bool)
+    grid[x0 // size, y0 // size] = values
+    filled[x0 // size, y0 // size] = True
+    filled = np.repeat(np.repeat(filled, size, axis=0), size, axis=1)[:w, :h]
+    np.copyto(labels, np.repeat(np.repeat(grid, size, axis=0), size, axis=1)[:w, :h], where=filled)
+    known |= filled
+
+
+def quadtree_center_grid(cx, cy, xs, ys, block=QUADTREE_BLOCK):
+    """
+    Same labels as nearest_center_grid, found by subdividing the grid: a block
+    whose four corner samples share a nearest center lies inside that center's
+    (convex) Voronoi cell, so all of it takes that label; other blocks split in
+    four until single samples. Only samples along region boundaries get
+    evaluated. Returns (labels, number of samples evaluated).
+    """
+    w, h = xs.size, ys.size
+    labels = np.zeros((w, h), dtype=np.uint8 if cx.size <= 256 else np.intp)
+    known = np.zeros((w, h), dtype=bool)
+    evaluated = 0
+
+    def label_at(ix, iy):
+        nonlocal evaluated
+        todo = ~known[ix, iy]
+        if todo.any():
+            tx, ty = ix[todo], iy[todo]
+            # Several blocks can share a corner; evaluate each sample once.
+            flat = np.unique(tx * h + ty)
+            tx, ty = flat // h, flat % h
+            d = (xs[tx][None, :] - cx[:, None]) ** 2 + (ys[ty][None, :] - cy[:, None]) ** 2
+            labels[tx, ty] = d.argmin(axis=0)
+            known[tx, ty] = True
+            evaluated += flat.size
+        return labels[ix, iy]
+
+    size = max(1, int(block))
+    bx, by = np.meshgrid(np.arange(-(-w // size)), np.arange(-(-h // size)), indexing="ij")
+    bx, by = bx.ravel(), by.ravel()
+    while bx.size:
+        x0, y0 = bx * size, by * size
+        if size == 1:
+            label_at(x0, y0)
+            break
+        # Corners one sample past the block (clamped): their rectangle covers every sample in it.
+        x1 = np.minimum(x0 + size, w - 1)
+        y1 = np.minimum(y0 + size, h - 1)
+        a = label_at(x0, y0)
+        uniform = (a == label_at(x1, y0)) & (a == label_at(x0, y1)) & (a == label_at(x1, y1))
+        _fill_blocks(labels, known, x0[uniform], y0[uniform], a[uniform], size)
+
+        size //= 2
+        bx = np.concatenate([2 * bx[~uniform] + dx for dx in (0, 1, 0, 1)])
+        by = np.concatenate([2 * by[~uniform] + dy for dy in (0, 0, 1, 1)])
+        keep = (bx * size < w) & (by * size < h)
+        bx, by = bx[keep], by[keep]
+    return labels, evaluated
+
+
+def _patch_moved(cache, cx, cy, moved):
+    """
+    Update cache.labels / cache.best in place when only the `moved` centroids
+    changed position. Cells owned by a moved centroid are recomputed against
+    every centroid; any other cell can only change if a moved centroid now
+    beats its owner, which one pass per moved centroid settles.
+    """
+    xs, ys, labels, best = cache.xs, cache.ys, cache.labels, cache.best
+    ix, iy = np.nonzero(moved[labels])
+    if ix.size:
+        d = (xs[ix][None, :] - cx[:, None]) ** 2 + (ys[iy][None, :] - cy[:, None]) ** 2
+        owner = d.argmin(axis=0)
+        labels[ix, iy] = owner
+        best[ix, iy] = d[owner, np.arange(owner.size)]
+
+    d = np.empty_like(best)
+    closer = np.empty(best.shape, dtype=bool)
+    for i in np.flatnonzero(moved).tolist():
+        np.add(((xs - cx[i]) ** 2)[:, None], ((ys - cy[i]) ** 2)[None, :], out=d)
+        np.less(d, best, out=closer)
+        np.copyto(best, d, where=closer)
+        np.copyto(labels, i, where=closer)
+
+
+def _clip_half_plane(poly, nx, ny, c):
+    """Part of convex polygon `poly` with nx * x + ny * y <= c (Sutherland-Hodgman)."""
+    out = []
+    for k in range(len(poly)):
+        px, py = poly[k]
+        qx, qy = poly[k - 1]
+        fp = nx * px + ny * py - c
+        fq = nx * qx + ny * qy - c
+        if (fp < 0 < fq) or (fq < 0 < fp):
+            t = fq / (fq - fp)
+            out.append((qx + t * (px - qx), qy + t * (py - qy)))
+        if fp <= 0:
+            out.append((px, py))
+    return out
+
+
+def cell_polygons(cx, cy, width, height):
+    """
+    Exact Voronoi cell of every center inside the rectangle (0, 0)-(width, height):
+    the rectangle clipped by the half-planes closer to center i than to each
+    other center, O(k^2) clips in all. Returns one vertex list per center; it is
+    empty when the cell has no area (a duplicate center loses to the lower index).
+    """
+    cx = [float(v) for v in cx]
+    cy = [float(v) for v in cy]
+    rect = [(0.0, 0.0), (float(width), 0.0), (float(width), float(height)), (0.0, float(height))]
+    polygons = []
+    for i, (xi, yi) in enumerate(zip(cx, cy)):
+        poly = rect
+        for j, (xj, yj) in enumerate(zip(cx, cy)):
+            if j == i:
+                continue
+            if xj == xi and yj == yi:
+                if j < i:
+                    poly = []
+                    break
+                continue
+            # |p - ci|^2 <= |p - cj|^2  <=>  (cj - ci) . p <= (|cj|^2 - |ci|^2) / 2
+            poly = _clip_half_plane(poly, xj - xi, yj - yi, (xj * xj + yj * yj - xi * xi - yi * yi) / 2.0)
+            if not poly:
+                break
+        polygons.append(poly)
+    return polygons
 
 
-def get_voronoi_surface(centroids, cache: VoronoiCache, view_w, view_h, cell_size=12, x_scale=1.0, alpha=45):
-    """Return a cached Voronoi/decision-region surface for the given centroids."""
+def _request(centroids, view_w, view_h, cell_size, x_scale, alpha, mode):
+    """(cell, colors, cache key, target xs, target ys) of one get_voronoi_surface call."""
+    cell = max(1, int(cell_size))
+    colors = tuple(tuple(c.color[:3]) for c in centroids)
+    key = (mode, view_w, view_h, cell, round(x_scale, 3), colors, alpha)
+    cx = np.array([getattr(c, "target_x", c.x) for c in centroids], dtype=np.float32)
+    cy = np.array([getattr(c, "target_y", c.y) for c in centroids], dtype=np.float32)
+    return cell, colors, key, cx, cy
+
+
+def is_current(
+    centroids, cache: VoronoiCache, view_w, view_h, cell_size=12, x_scale=1.0, alpha=45, tolerance=1.0, mode="raster"
+):
+    """True when get_voronoi_surface would return cache.surface unchanged."""
+    if cache.key is None or cache.surface is None:
+        return False
+    _cell, _colors, key, cx, cy = _request(centroids, view_w, view_h, cell_size, x_scale, alpha, mode)
+    if cache.key != key:
+        return False
+    return max(np.abs(cx - cache.cx).max(), np.abs(cy - cache.cy).max()) <= tolerance
+
+
+def get_voronoi_surface(
+    centroids, cache: VoronoiCache, view_w, view_h, cell_size=12, x_scale=1.0, alpha=45, tolerance=1.0, mode="raster"
+):
+    """
+    Return a cached Voronoi/decision-region surface for the given centroids.
+
+    Regions are drawn for the centroids' target positions (where they are
+    gliding to), so the surface stays cached while they animate. It is
+    redrawn once a target has moved more than `tolerance` model pixels from
+    where it was drawn; if only some centroids moved, only the cells they can
+    affect are recomputed and repainted.
+
+    mode="polygons" fills each centroid's exact cell (see cell_polygons): crisp
+    edges at any window size, cost independent of resolution and cell_size.
+    mode="raster" gives each cell_size x cell_size block the color of the
+    centroid nearest to its center (cell_size=1 is per-pixel); labels are
+    computed in vectorized passes and written into the surface through
+    surfarray. mode="quadtree" produces the same cells but only evaluates
+    samples near region boundaries (see quadtree_center_grid); it always
+    redraws in full.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown Voronoi mode {mode!r}; expected one of {MODES}")
     if not centroids or view_w <= 0 or view_h <= 0:
         return None
 
-    cell = max(4, int(cell_size))
-    centroid_key = tuple((int(c.x), int(c.y), idx) for idx, c in enumerate(centroids))
-    key = (view_w, view_h, cell, round(x_scale, 3), centroid_key, alpha)
-
+    cell, colors, key, cx, cy = _request(centroids, view_w, view_h, cell_size, x_scale, alpha, mode)
+    moved = None
     if cache.key == key and cache.surface is not None:
-        return cache.surface
-
-    s = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+        shift = np.maximum(np.abs(cx - cache.cx), np.abs(cy - cache.cy))
+        if shift.max() <= tolerance:
+            return cache.surface
+        moved = shift > 0
 
-    for y in range(0, view_h, cell):
-        for x in range(0, view_w, cell):
-            mx = x / x_scale if x_scale != 0 else x
-            my = y
+    if mode == "polygons":
+        scale = x_scale if x_scale != 0 else 1.0
+        s = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+        for color, poly in zip(colors, cell_polygons(cx, cy, view_w / scale, view_h)):
+            if len(poly) >= 3:
+                pygame.draw.polygon(s, (*color, alpha), [(x * scale, y) for x, y in poly])
+        cache.full_updates += 1
+        cache.key = key
+        cache.cx, cache.cy = cx, cy
+        cache.surface = s
+        return s
 
-            best_i = 0
-            best_d = float("inf")
-            for i, c in enumerate(centroids):
-                dx = c.x - mx
-                dy = c.y - my
-                d = dx * dx + dy * dy
-                if d < best_d:
-                    best_d = d
-                    best_i = i
+    if moved is None or moved.all() or mode == "quadtree":
+        # Cell centers in screen pixels, mapped back to model coordinates
+        xs = np.arange(0, view_w, cell, dtype=np.float32) + np.float32(cell / 2.0)
+        ys = np.arange(0, view_h, cell, dtype=np.float32) + np.float32(cell / 2.0)
+        if x_scale != 0:
+            xs = xs / np.float32(x_scale)
+        if mode == "quadtree":
+            labels, _evaluated = quadtree_center_grid(cx, cy, xs, ys)
+            best = None
+        else:
+            labels, best = nearest_center_grid(cx, cy, xs, ys)
+        grid = pygame.Surface(labels.shape, pygame.SRCALPHA)
+        cache.xs, cache.ys, cache.labels, cache.best, cache.grid = xs, ys, labels, best, grid
+        changed = None
+        cache.full_updates += 1
+    else:
+        previous = cache.labels.copy()
+        _patch_moved(cache, cx, cy, moved)
+        labels, grid = cache.labels, cache.grid
+        changed = labels != previous
+        cache.partial_updates += 1
 
-            color = centroids[best_i].color
-            pygame.draw.rect(s, (*color, alpha), (x, y, cell, cell))
+    # One 32-bit write per cell: colors mapped to the surface's pixel format (alpha included)
+    mapped = np.array([grid.map_rgb((*color, alpha)) for color in colors], dtype=np.uint32)
+    pixels = pygame.surfarray.pixels2d(grid)
+    if changed is None:
+        pixels[...] = mapped[labels]
+    else:
+        pixels[changed] = mapped[labels[changed]]
+    del pixels
+    if cell == 1:
+        s = grid
+    else:
+        # Nearest-neighbor upscale of the cell grid, cropped to the view
+        s = pygame.transform.scale(grid, (labels.shape[0] * cell, labels.shape[1] * cell))
+        s = s.subsurface((0, 0, view_w, view_h))
 
     cache.key = key
+    cache.cx, cache.cy = cx, cy
     cache.surface = s
     return s
 
+
+# Frozen copy of a centroid (target position, color) handed to the worker thread
+_Site = namedtuple("_Site", "x y color")
+
+
+class BackgroundVoronoi:
+    """
+    Stale-while-revalidate wrapper around get_voronoi_surface for one view.
+
+    When the cached regions are out of date, `surface()` starts a rebuild on
+    a worker thread and keeps returning the previous surface; the finished
+    surface replaces it on a later call (the swap is a single assignment on
+    the caller's thread). One rebuild runs at a time and the next one starts
+    from the centroids' latest positions, so a fast drag skips the states in
+    between. Only the very first surface is built on the caller's thread,
+    since there is nothing older to show.
+    """
+
+    def __init__(self):
+        self.cache = VoronoiCache()
+        self.stale_frames = 0  # calls answered with an out-of-date surface
+        self._surface = None
+        self._thread = None
+        self._result = None
+        self._invalidated = False
+
+    @property
+    def rebuilding(self):
+        return self._thread is not None
+
+    def invalidate(self, keep_stale=True):
+        """Force a rebuild; the current surface is still shown meanwhile unless keep_stale is False."""
+        if not keep_stale:
+            self.wait()
+            self._surface = None
+        self._invalidated = True
+
+    def wait(self):
+        """Block until a running rebuild has finished and swap it in."""
+        if self._thread is not None:
+            self._thread.join()
+            self._collect()
+
+    def surface(self, centroids, view_w, view_h, **options):
+        """Latest finished surface for get_voronoi_surface(centroids, ..., **options); may lag by a rebuild."""
+        self._collect()
+        if self._thread is not None:
+            self.stale_frames += 1
+            return self._surface
+        if not centroids or view_w <= 0 or view_h <= 0:
+            return None
+        if self._invalidated:
+            self.cache.invalidate()
+            self._invalidated = False
+        elif self._surface is not None and is_current(centroids, self.cache, view_w, view_h, **options):
+            return self._surface
+
+        sites = [_Site(getattr(c, "target_x", c.x), getattr(c, "target_y", c.y), tuple(c.color[:3])) for c in centroids]
+        if self._surface is None:
+            self._surface = self._build(sites, view_w, view_h, options)
+            return self._surface
+        self._thread = threading.Thread(target=self._run, args=(sites, view_w, view_h, options), name="voronoi", daemon=True)
+        self._thread.start()
+        self.stale_frames += 1
+        return self._surface
+
+    def _build(self, sites, view_w, view_h, options):
+        s = get_voronoi_surface(sites, self.cache, view_w, view_h, **options)
+        if s is not None and s is self.cache.grid:
+            # Per-pixel raster: the cell grid is patched in place by later
+            # rebuilds, so the surface being shown must be a copy.
+            s = s.copy()
+        return s
+
+    def _run(self, sites, view_w, view_h, options):
+        try:
+            self._result = (self._build(sites, view_w, view_h, options), None)
+        except Exception as e:  # re-raised on the caller's thread by _collect
+            self._result = (None, e)
+
+    def _collect(self):
+        if self._thread is None or self._thread.is_alive():
+            return
+        self._thread.join()
+        self._thread = None
+        surface, error = self._result
+        self._result = None
+        if error is not None:
+            raise error
+        self._surface = surface
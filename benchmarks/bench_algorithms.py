@@ -0,0 +1,283 @@
+"""
+Benchmark suite for the clustering core: times the per-step operations and
+whole runs across dataset sizes, K and generators, and checks them against a
+stored baseline.
+
+    python benchmarks/bench_algorithms.py                        # quick preset, compare to baseline.json
+    python benchmarks/bench_algorithms.py --preset full --out results.json
+    python benchmarks/bench_algorithms.py --save-baseline        # record a new baseline
+
+Operations (one case per generator / n / k):
+- assign: one full nearest-centroid assignment (`assign_clusters`)
+- assign_bounded: a steady-state step whose Hamerly bounds are warm
+- update_centroids: mean update from the store's running sums
+- update_medoids: one K-Medoids step (FastPAM up to 3000 points, CLARA above)
+- converge: K-Means from k-means++ to convergence (records iterations)
+- dbscan: one DBSCAN run (k-independent; eps scaled to ~10 neighbors per point)
+- elbow: the elbow method's work for K = 1..10, serially (k-independent)
+
+Each case records the best wall time of --repeat runs, ops/sec (1 / time),
+points/sec and peak traced memory (a separate tracemalloc run). Results go to
+a JSON file. With a baseline, a case regresses when its time, peak memory or
+iteration count exceeds the baseline by more than --threshold. Flagged cases
+are re-timed with more runs; any that still regress are reported and the
+script exits with status 1. Timings are machine-specific: record the baseline on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scripts"))
+
+from clustering import algorithms, datasets, elbow, fit, kmedoids, seeding  # noqa: E402
+from clustering.pointstore import PointStore  # noqa: E402
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+PRESETS = {
+    "quick": {"n": [1000, 10000, 100000], "k": [2, 10, 50]},
+    "full": {"n": [1000, 10000, 100000, 1000000], "k": [2, 10, 50]},
+}
+# Datasets by name. "random" is plain uniform noise here: the game's min-spaced
+# generator (datasets.spaced_random) saturates the play area at about a
+# thousand points and then spends its full retry budget on every later point.
+GENERATORS = dict(datasets.GENERATORS, random=datasets.uniform)
+# Timings below this are compared against it instead (timer noise)
+NOISE_FLOOR_S = 0.002
+# Memory below this (MB) is compared against it instead
+MEMORY_FLOOR_MB = 1.0
+# Mean neighbors per point the DBSCAN eps is scaled for
+DBSCAN_NEIGHBORS = 10
+ELBOW_MAX_K = 10
+# Repeat multiplier when re-timing a case that looked like a regression
+CONFIRM_REPEAT = 5
+
+
+def _area_size():
+    left, top, right, bottom = datasets.DEFAULT_AREA
+    return (right - left) * (bottom - top)
+
+
+def _centers(x, y, k, seed=0):
+    pick = seeding.seed_points(x, y, k, "kmeans++", seed)
+    return [fit.Center(a, b) for a, b in zip(x[pick].tolist(), y[pick].tolist())]
+
+
+def _op_assign(x, y, k):
+    store = PointStore.from_xy(x, y)
+    centers = _centers(x, y, k)
+    return lambda: (store.reset_labels(), algorithms.assign_clusters(store, centers)), None
+
+
+def _op_assign_bounded(x, y, k):
+    store = PointStore.from_xy(x, y)
+    centers = _centers(x, y, k)
+    assigner = algorithms.HamerlyAssigner()
+    algorithms.assign_clusters(store, centers, assigner=assigner)
+    algorithms.update_centroids(store, centers)
+    state = (store.cluster.copy(), assigner._labels, assigner._upper, assigner._lower, assigner._cx, assigner._cy)
+
+    def run():
+        # Restore the post-first-step state so every repeat does the same work.
+        labels, assigner._labels, assigner._upper, assigner._lower, assigner._cx, assigner._cy = state
+        store.set_labels(labels)
+        algorithms.assign_clusters(store, centers, assigner=assigner)
+
+    return run, None
+
+
+def _op_update_centroids(x, y, k):
+    store = PointStore.from_xy(x, y)
+    centers = _centers(x, y, k)
+    algorithms.assign_clusters(store, centers)
+    return lambda: algorithms.update_centroids(store, centers), None
+
+
+def _op_update_medoids(x, y, k):
+    store = PointStore.from_xy(x, y)
+    centers = _centers(x, y, k)
+    cx, cy = algorithms.centroid_arrays(centers)
+    algorithms.assign_clusters(store, centers)
+    distances = kmedoids.PairwiseDistances()
+    if store.n <= 3000:
+        distances.ensure(store.x, store.y)
+    return lambda: kmedoids.KMedoidsEngine(distances=distances, seed=0).update(store, cx, cy), None
+
+
+def _op_converge(x, y, k):
+    result = {}
+
+    def run():
+        result["iterations"] = fit.fit_kmeans(x, y, k, seed=0).iterations
+
+    return run, result
+
+
+def _op_dbscan(x, y, k):
+    store = PointStore.from_xy(x, y)
+    eps = float(np.sqrt(DBSCAN_NEIGHBORS * _area_size() / (np.pi * x.shape[0])))
+    return lambda: algorithms.dbscan(store, eps, min_samples=5), None
+
+
+def _op_elbow(x, y, k):
+    return lambda: elbow.fit_range(x, y, list(range(1, ELBOW_MAX_K + 1)), warm_start=True, seed=0), None
+
+
+# name -> (setup, depends on k)
+OPERATIONS = {
+    "assign": (_op_assign, True),
+    "assign_bounded": (_op_assign_bounded, True),
+    "update_centroids": (_op_update_centroids, True),
+    "update_medoids": (_op_update_medoids, True),
+    "converge": (_op_converge, True),
+    "dbscan": (_op_dbscan, False),
+    "elbow": (_op_elbow, False),
+}
+
+
+def measure(setup, x, y, k, repeat):
+    """(best seconds, peak MB, extra info) for one case."""
+    run, info = setup(x, y, k)
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t)
+
+    run, _info = setup(x, y, k)
+    tracemalloc.start()
+    run()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6, info or {}
+
+
+def run_case(op, name, n, k, repeat, x=None, y=None):
+    """Result row for one (operation, generator, n, k) case."""
+    if x is None:
+        x, y = GENERATORS[name](n, rng=0)
+    seconds, peak_mb, info = measure(OPERATIONS[op][0], x, y, k if k is not None else ELBOW_MAX_K, repeat)
+    return {
+        "case": f"{op}/{name}/n={n}" + (f"/k={k}" if k is not None else ""),
+        "op": op,
+        "dataset": name,
+        "n": n,
+        "k": k,
+        "seconds": seconds,
+        "ops_per_sec": 1.0 / seconds if seconds > 0 else None,
+        "points_per_sec": n / seconds if seconds > 0 else None,
+        "peak_mb": peak_mb,
+        "iterations": info.get("iterations"),
+    }
+
+
+def log_row(row):
+    print(
+        f"{row['case']:<40} {row['seconds'] * 1000:>10.2f} ms {row['peak_mb']:>9.1f} MB"
+        + (f" {row['iterations']:>4} it" if row["iterations"] is not None else "")
+    )
+
+
+def run_suite(preset, generators, operations, repeat, log=log_row):
+    results = []
+    for name in generators:
+        for n in preset["n"]:
+            x, y = GENERATORS[name](n, rng=0)
+            for op in operations:
+                for k in preset["k"] if OPERATIONS[op][1] else [None]:
+                    if k is not None and k * 10 > n:
+                        continue
+                    row = run_case(op, name, n, k, repeat, x, y)
+                    results.append(row)
+                    log(row)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Regressions as (case, metric, baseline value, new value)."""
+    base = {row["case"]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = base.get(row["case"])
+        if old is None:
+            continue
+        for metric, floor in (("seconds", NOISE_FLOOR_S), ("peak_mb", MEMORY_FLOOR_MB), ("iterations", 0)):
+            if old.get(metric) is None or row.get(metric) is None:
+                continue
+            if max(row[metric], floor) > max(old[metric], floor) * (1.0 + threshold):
+                regressions.append((row["case"], metric, old[metric], row[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the clustering core against a stored baseline.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--datasets", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--ops", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--out", default=None, help="results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown / growth (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suite(PRESETS[args.preset], args.datasets, args.ops, max(1, args.repeat))
+    report = {
+        "meta": {
+            "preset": args.preset,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    out = args.out or os.path.join(HERE, "results", time.strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results: {out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (record one with --save-baseline).")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        # Re-time flagged cases with more runs so one noisy sample does not fail the check.
+        flagged = {case for case, _metric, _old, _new in regressions}
+        print(f"Re-checking {len(flagged)} case(s)...")
+        for i, row in enumerate(results):
+            if row["case"] in flagged:
+                again = run_case(row["op"], row["dataset"], row["n"], row["k"], CONFIRM_REPEAT * max(1, args.repeat))
+                if again["seconds"] > row["seconds"]:
+                    again.update(seconds=row["seconds"], ops_per_sec=row["ops_per_sec"], points_per_sec=row["points_per_sec"])
+                results[i] = again
+        regressions = compare(results, baseline, args.threshold)
+    for case, metric, old, new in regressions:
+        print(f"REGRESSION {case}: {metric} {old:.4g} -> {new:.4g}")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} vs {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
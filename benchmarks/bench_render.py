@@ -0,0 +1,188 @@
+"""
+Frame-time benchmark for the game view, with no display (SDL dummy driver).
+
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --points 1000 10000 --scenarios plain voronoi --frames 60 --json render.json
+
+Each scenario builds a GameScene and runs it for --frames frames the way
+App.run does (events, scene.update, scene.draw, which flips the display),
+after --warmup untimed frames, and reports per-frame time percentiles; the
+JSON output also has the median time of each frame phase (see Scripts/perf.py).
+Voronoi regions are rebuilt on a worker thread as in the game; pass
+--voronoi-sync to rebuild them inside the frame instead.
+
+Scenarios (each at every --points size):
+- plain: single view, converged labels (steady-state drawing only)
+- iterating: an algorithm step every --step-every frames, reset on convergence
+- battle: A/B battle mode, iterating
+- voronoi: decision regions on, iterating (cache invalidated by moving centroids)
+- overlays: stats panel + convergence graph on, iterating
+- particles: --bursts particle bursts spawned per frame
+- everything: battle + voronoi + overlays + particles, iterating
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scripts"))
+
+from app import App  # noqa: E402
+from entities import ParticleEffect  # noqa: E402
+from scenes.game_scene import GameScene  # noqa: E402
+
+
+SCENARIOS = {
+    "plain": {},
+    "iterating": {"iterate": True},
+    "battle": {"iterate": True, "battle_mode": True},
+    "voronoi": {"iterate": True, "voronoi": True},
+    "overlays": {"iterate": True, "overlays": True},
+    "particles": {"particles": True},
+    "everything": {"iterate": True, "battle_mode": True, "voronoi": True, "overlays": True, "particles": True},
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def make_scene(app, n, options, algorithm, k, voronoi_sync=False):
+    settings = {
+        "algorithm": algorithm,
+        "dataset": "blobs",
+        "points": n,
+        "k": k,
+        "battle_mode": options.get("battle_mode", False),
+        "voronoi": options.get("voronoi", False),
+        "workers": 1,
+        "n_init": 1,
+    }
+    scene = GameScene(app, settings)
+    scene.voronoi_background = not voronoi_sync
+    scene.show_stats = scene.show_graph = options.get("overlays", False)
+    if not options.get("iterate"):
+        # Converge up front so only drawing is measured.
+        for _ in range(100):
+            scene.step_algorithm()
+            if scene.converged and (not scene.battle_mode or scene.converged_b):
+                break
+    return scene
+
+
+def spawn_bursts(scene, count, rng):
+    for points, particles in ((scene.points, scene.particles), (scene.points_b, scene.particles_b)):
+        if not points:
+            continue
+        for _ in range(count):
+            p = points[rng.randrange(len(points))]
+            particles.append(ParticleEffect(p.x, p.y, (255, 200, 120)))
+
+
+def frame(scene, frame_index, options, step_every, bursts, rng):
+    """One App.run iteration (plus the scenario's scripted input)."""
+    perf = scene.app.perf
+    perf.begin_frame()
+    with perf.span("events"):
+        for event in pygame.event.get():
+            scene.handle_event(event)
+    if options.get("iterate") and frame_index % step_every == 0:
+        if scene.converged and (not scene.battle_mode or scene.converged_b):
+            scene.reset_algorithm()
+        else:
+            scene.step_algorithm()
+    if options.get("particles"):
+        spawn_bursts(scene, bursts, rng)
+    with perf.span("update"):
+        scene.update(1000 // 60)
+    scene.draw()
+    perf.end_frame()
+
+
+def run_scenario(app, name, n, args):
+    options = SCENARIOS[name]
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    rng = random.Random(args.seed)
+    scene = make_scene(app, n, options, args.algorithm, args.k, args.voronoi_sync)
+
+    for i in range(args.warmup):
+        frame(scene, i, options, args.step_every, args.bursts, rng)
+    times = np.empty(args.frames)
+    for i in range(args.frames):
+        t = time.perf_counter()
+        frame(scene, args.warmup + i, options, args.step_every, args.bursts, rng)
+        times[i] = time.perf_counter() - t
+
+    ms = times * 1000.0
+    row = {"scenario": name, "points": n, "frames": args.frames, "mean_ms": float(ms.mean()), "max_ms": float(ms.max())}
+    for q in PERCENTILES:
+        row[f"p{q}_ms"] = float(np.percentile(ms, q))
+    # Median per phase (see perf.PHASES) over the timed frames
+    _ids, phase_ms = app.perf.frames()
+    phase_ms = phase_ms[-min(args.frames, len(phase_ms)):]
+    row["phase_p50_ms"] = {name: float(v) for name, v in zip(app.perf.phases, np.median(phase_ms, axis=0))}
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-frame time of the game view under the SDL dummy driver.")
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=60, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed frames first")
+    parser.add_argument("--algorithm", choices=["kmeans", "kmedoids", "minibatch", "dbscan"], default="kmeans")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--step-every", type=int, default=10, help="frames between algorithm steps when iterating")
+    parser.add_argument("--bursts", type=int, default=20, help="particle bursts spawned per frame and side")
+    parser.add_argument(
+        "--voronoi-sync", action="store_true", help="rebuild Voronoi regions inside the frame (no worker thread)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    args.frames = max(1, args.frames)
+    args.step_every = max(1, args.step_every)
+
+    app = App()
+    header = f"{'scenario':<11} {'points':>7} " + " ".join(f"{'p' + str(q):>8}" for q in PERCENTILES) + f" {'max':>8}  (ms)"
+    print(header)
+    rows = []
+    for n in args.points:
+        for name in args.scenarios:
+            row = run_scenario(app, name, n, args)
+            rows.append(row)
+            print(
+                f"{name:<11} {n:>7} "
+                + " ".join(f"{row[f'p{q}_ms']:>8.2f}" for q in PERCENTILES)
+                + f" {row['max_ms']:>8.2f}"
+            )
+    pygame.quit()
+
+    if args.json:
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "pygame": pygame.version.ver,
+                "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+                "algorithm": args.algorithm,
+                "k": args.k,
+                "seed": args.seed,
+                "voronoi_sync": args.voronoi_sync,
+            },
+            "results": rows,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"Results: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
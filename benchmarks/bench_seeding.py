@@ -0,0 +1,60 @@
+"""
+Iterations to convergence for each seeding method on the bundled dataset
+generators (full Lloyd's k-means, as the scene runs it).
+
+    python benchmarks/bench_seeding.py [--points 500] [--k 3 5 8] [--trials 30]
+
+Prints the mean number of Lloyd iterations and the mean final inertia per
+generator, K and seeding method.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scripts"))
+
+from clustering import datasets, fit, seeding  # noqa: E402
+
+
+GENERATORS = {
+    "random": lambda n, k, rng: datasets.spaced_random(n, min_dist=5, rng=rng),
+    "blobs": lambda n, k, rng: datasets.blobs(n, centers=max(2, min(5, k)), rng=rng),
+    "moons": lambda n, k, rng: datasets.moons(n, rng=rng),
+    "circles": lambda n, k, rng: datasets.circles(n, rng=rng),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 8])
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'dataset':<8} {'K':>3} {'method':<9} {'iters':>7} {'inertia':>12} {'seed ms':>8}")
+    for name, make in GENERATORS.items():
+        for k in args.k:
+            x, y = make(args.points, k, rng)
+            for method in seeding.METHODS:
+                iters, inertias, seed_s = [], [], 0.0
+                for _ in range(args.trials):
+                    t = time.perf_counter()
+                    pick = seeding.seed_points(x, y, k, method, rng)
+                    seed_s += time.perf_counter() - t
+                    result = fit.fit_kmeans(x, y, k, start=(x[pick], y[pick]), max_iter=500)
+                    iters.append(result.iterations)
+                    inertias.append(result.inertia)
+                print(
+                    f"{name:<8} {k:>3} {method:<9} {np.mean(iters):>7.2f} {np.mean(inertias):>12.0f}"
+                    f" {1000 * seed_s / args.trials:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
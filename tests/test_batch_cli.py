@@ -0,0 +1,72 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+import Kmeans_Batch
+from clustering import datasets, fit
+
+
+def _write_csv(path, x, y):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["x", "y"])
+        writer.writerows(zip(x.tolist(), y.tolist()))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_writes_labels_and_summary(tmp_path, jobs):
+    x, y = datasets.blobs(900, centers=3, rng=0)
+    for name in ("a", "b"):
+        _write_csv(tmp_path / f"{name}.csv", x, y)
+    out = tmp_path / "out"
+
+    status = Kmeans_Batch.main(
+        [str(tmp_path / "a.csv"), str(tmp_path / "b.csv"), "--k", "3", "--seed", "4", "--out", str(out), "--jobs", str(jobs)]
+    )
+
+    assert status == 0
+    expected = fit.fit_kmeans(x, y, 3, seed=4, max_iter=fit.MAX_ITER)
+    for name in ("a", "b"):
+        with open(out / f"{name}_labels.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["x", "y", "cluster"]
+        assert np.array_equal([int(r[2]) for r in rows[1:]], expected.labels)
+
+        summary = json.loads((out / f"{name}_summary.json").read_text())
+        assert summary["points"] == 900
+        assert summary["iterations"] == expected.iterations
+        assert summary["inertia"] == pytest.approx(expected.inertia)
+        assert sum(summary["cluster_sizes"]) == 900
+
+
+def test_batch_reports_failures(tmp_path):
+    (tmp_path / "empty.csv").write_text("x,y\n")
+    assert Kmeans_Batch.main([str(tmp_path / "empty.csv"), "--out", str(tmp_path)]) == 1
+
+
+def test_output_names_disambiguate_repeated_file_names():
+    paths = ["a/points.csv", "b/points.csv", "c/Points.txt", "points_2.csv", "other.csv"]
+    assert Kmeans_Batch.output_names(paths) == ["points", "points_3", "Points_4", "points_2", "other"]
+
+
+def test_batch_same_file_name_in_two_folders(tmp_path):
+    out = tmp_path / "out"
+    inputs = []
+    for folder, n in (("a", 300), ("b", 500)):
+        (tmp_path / folder).mkdir()
+        x, y = datasets.blobs(n, centers=3, rng=0)
+        _write_csv(tmp_path / folder / "points.csv", x, y)
+        inputs.append(str(tmp_path / folder / "points.csv"))
+
+    assert Kmeans_Batch.main(inputs + ["--k", "3", "--out", str(out), "--jobs", "2"]) == 0
+    assert json.loads((out / "points_summary.json").read_text())["points"] == 300
+    assert json.loads((out / "points_2_summary.json").read_text())["points"] == 500
+
+
+def test_play_area_matches_the_game():
+    game_datasets = pytest.importorskip("datasets")
+    assert Kmeans_Batch._area() == game_datasets.play_area()
+    # A window smaller than its margins still leaves a one-pixel area.
+    assert datasets.play_area(100, 100, 80, 80, 160) == (80, 80, 81, 81)
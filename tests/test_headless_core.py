@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from clustering import datasets, elbow, fit, pool, restarts
+
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scripts")
+
+
+def test_core_imports_without_pygame():
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]); "
+        "import clustering.fit, clustering.elbow, clustering.restarts, clustering.datasets; "
+        "print('pygame' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code, SCRIPTS], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("algorithm", ["kmeans", "kmedoids", "minibatch"])
+def test_fit_returns_labels_centers_inertia(algorithm):
+    x, y = datasets.blobs(600, centers=3, rng=0)
+    result = fit.fit(x, y, algorithm, k=3, seed=1)
+    assert result.labels.shape == (600,)
+    assert set(np.unique(result.labels).tolist()) <= {0, 1, 2}
+    assert result.cx.shape == result.cy.shape == (3,)
+    # Inertia matches the labels and centers it came with.
+    wcss = ((x - result.cx[result.labels]) ** 2 + (y - result.cy[result.labels]) ** 2).sum()
+    assert result.inertia == pytest.approx(wcss, rel=1e-9)
+
+
+def test_fit_is_reproducible_from_seed():
+    x, y = datasets.moons(500, rng=3)
+    a = fit.fit_kmeans(x, y, 4, seed=7)
+    b = fit.fit_kmeans(x, y, 4, seed=7)
+    assert np.array_equal(a.labels, b.labels)
+    assert a.inertia == b.inertia
+
+
+def test_fit_dbscan_labels():
+    x, y = datasets.circles(400, rng=0)
+    result = fit.fit(x, y, "dbscan", eps=30, min_samples=4)
+    assert result.inertia is None
+    assert result.n_clusters == int(result.labels.max()) + 1
+
+
+def test_fit_rejects_unknown_algorithm():
+    with pytest.raises(ValueError):
+        fit.fit(np.zeros(3), np.zeros(3), "spectral", k=2)
+
+
+def _wait(run, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not run.done and time.monotonic() < deadline:
+        run.poll()
+        time.sleep(0.01)
+    assert run.done
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    """Run pool tasks on threads so a test can swap in a failing task function."""
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pool, "get_pool", lambda workers: executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_elbow_run_records_failed_tasks(thread_pool, monkeypatch):
+    real = elbow._fit_range_shared
+
+    def flaky(name, n, ks, warm_start, seed, method):
+        if 3 in ks:
+            raise RuntimeError("worker died")
+        return real(name, n, ks, warm_start, seed, method)
+
+    monkeypatch.setattr(elbow, "_fit_range_shared", flaky)
+    x, y = datasets.blobs(200, centers=3, rng=0)
+    run = elbow.ElbowRun(x, y, max_k=5, workers=1, warm_start=False, seed=0)
+    _wait(run)
+    assert run.failed() == [3]
+    assert isinstance(run.errors[3], RuntimeError)
+    assert [k for k, _ in run.data()] == [1, 2, 4, 5]
+
+
+def test_restart_run_records_failed_restarts(thread_pool):
+    x, y = datasets.blobs(200, centers=3, rng=0)
+    # An unknown algorithm raises inside every task.
+    run = restarts.RestartRun(x, y, "spectral", 3, n_init=3, workers=1, init="kmeans++", params={}, seed=0)
+    _wait(run)
+    assert run.best() is None
+    assert len(run.errors) == 3
+    assert all(isinstance(e, ValueError) for e in run.errors.values())
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from clustering.dbscan_engine import dbscan_labels, parallel_dbscan_labels
+
+
+def _blobs(seed, n=6000):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 1200, (6, 2))
+    spread = rng.uniform(10, 60, 6)
+    pick = rng.integers(0, 6, n)
+    x = centers[pick, 0] + rng.normal(0, 1, n) * spread[pick]
+    y = centers[pick, 1] + rng.normal(0, 1, n) * spread[pick]
+    # Uniform background noise so strips also contain border and noise points
+    x = np.concatenate([x, rng.uniform(0, 1200, n // 4)])
+    y = np.concatenate([y, rng.uniform(0, 800, n // 4)])
+    return x, y
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("eps,min_samples", [(8.0, 4), (20.0, 10), (35.0, 5)])
+def test_parallel_matches_serial(seed, eps, min_samples):
+    x, y = _blobs(seed)
+    serial, n_serial = dbscan_labels(x, y, eps, min_samples)
+    parallel, n_parallel = parallel_dbscan_labels(x, y, eps, min_samples, workers=2, strips=6, min_points=0)
+
+    assert n_parallel == n_serial
+    # Same partition and, since both number clusters by lowest point index,
+    # the same ids.
+    np.testing.assert_array_equal(parallel, serial)
+
+
+def test_small_or_narrow_input_runs_serially():
+    x, y = _blobs(3, n=200)
+    serial, n_serial = dbscan_labels(x, y, 300.0, 3)
+    # Strips narrower than 4 * eps are merged away, leaving a single tile.
+    parallel, n_parallel = parallel_dbscan_labels(x, y, 300.0, 3, workers=2, strips=8, min_points=0)
+    assert n_parallel == n_serial
+    np.testing.assert_array_equal(parallel, serial)
+
+
+def test_parallel_skips_empty_strips():
+    # More strips than points: several cuts land in one gap, leaving strips with no points at all.
+    x = np.array([0.0, 100.0, 200.0])
+    y = np.zeros(3)
+    labels, n_clusters = parallel_dbscan_labels(x, y, 2.0, 4, workers=2, strips=5, min_points=0)
+    assert n_clusters == 0
+    np.testing.assert_array_equal(labels, [-1, -1, -1])
@@ -0,0 +1,33 @@
+import csv
+
+import perf
+
+
+def test_ring_keeps_last_frames_and_sums_repeated_spans(tmp_path):
+    timings = perf.FrameTimings(phases=("points", "flip", "frame"), capacity=4)
+    for i in range(6):
+        timings.begin_frame()
+        # Two spans of one phase in a frame (e.g. both battle sides) add up.
+        timings.add("points", i / 1000.0)
+        timings.add("points", i / 1000.0)
+        timings.end_frame()
+
+    ids, ms = timings.frames()
+    assert len(timings) == 4
+    assert ids.tolist() == [2, 3, 4, 5]
+    assert ms[:, 0].tolist() == [4.0, 6.0, 8.0, 10.0]
+    assert ms[:, 1].tolist() == [0.0] * 4
+
+    assert timings.percentiles((50,))["points"] == [7.0]
+
+    path = tmp_path / "timings.csv"
+    assert timings.write_csv(path) == 4
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["frame", "points_ms", "flip_ms", "frame_ms"]
+    assert [int(r[0]) for r in rows[1:]] == [2, 3, 4, 5]
+
+
+def test_empty_percentiles_are_zero():
+    timings = perf.FrameTimings()
+    assert timings.percentiles((50, 99))["frame"] == [0.0, 0.0]
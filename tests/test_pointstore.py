@@ -0,0 +1,55 @@
+import numpy as np
+
+from clustering.pointstore import PointStore
+
+
+class _Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+        self.cluster = self.prev_cluster = None
+
+
+def _random_edits(rng, store, steps=300, k=6):
+    """Random label writes (noise included), appends and the occasional clear; yields after each edit."""
+    for _ in range(steps):
+        op = rng.random()
+        if op < 0.35 and store.n:
+            store.set_labels(rng.integers(-1, k, store.n))
+        elif op < 0.75 and store.n:
+            idx = rng.integers(0, store.n, rng.integers(1, 20))
+            store.set_labels_at(idx, rng.integers(-1, k, idx.size))
+        elif op < 0.98:
+            for _ in range(rng.integers(1, 8)):
+                label = int(rng.integers(-1, k)) if rng.random() < 0.5 else None
+                store.append(_Point(*rng.uniform(0, 500, 2)), cluster=label)
+        else:
+            store.clear()
+        yield
+
+
+def test_running_sums_match_recount():
+    rng = np.random.default_rng(0)
+    k = 6
+    store = PointStore.from_xy(rng.uniform(0, 500, 200), rng.uniform(0, 500, 200))
+    for _ in _random_edits(rng, store, k=k):
+        lab = store.cluster
+        mask = lab >= 0
+        x, y = store.x[mask], store.y[mask]
+        count, sum_x, sum_y = store.cluster_sums(k)
+        assert np.array_equal(count, np.bincount(lab[mask], minlength=k))
+        assert np.allclose(sum_x, np.bincount(lab[mask], weights=x, minlength=k))
+        assert np.allclose(sum_y, np.bincount(lab[mask], weights=y, minlength=k))
+        assert np.allclose(store.cluster_sq_sums(k), np.bincount(lab[mask], weights=x * x + y * y, minlength=k))
+
+
+def test_grouping_matches_labels():
+    rng = np.random.default_rng(1)
+    k = 6
+    store = PointStore.from_xy(rng.uniform(0, 500, 150), rng.uniform(0, 500, 150))
+    for _ in _random_edits(rng, store, steps=200, k=k):
+        lab = store.cluster
+        # -2 is UNASSIGNED, -1 noise; k is past the last label
+        for c in range(-2, k + 1):
+            expected = np.flatnonzero(lab == c)
+            assert np.array_equal(np.sort(store.members(c)), expected)
+            assert store.label_count(c) == expected.size
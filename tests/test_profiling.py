@@ -0,0 +1,29 @@
+import pstats
+
+import profiling
+
+
+def test_cpu_profile_writes_pstats(tmp_path):
+    profile = profiling.CpuProfile()
+    profile.start()
+    assert profile.active
+    sum(i * i for i in range(10000))
+    path, seconds = profile.stop(str(tmp_path))
+    assert not profile.active
+    assert seconds >= 0
+    assert pstats.Stats(path).total_calls > 0
+
+
+def test_memory_snapshots_report_growth(tmp_path):
+    snapshots = profiling.MemorySnapshots(frames=1)
+    try:
+        assert snapshots.capture(str(tmp_path)) is None
+        held = [bytearray(4096) for _ in range(200)]
+        path = snapshots.capture(str(tmp_path))
+        report = open(path, encoding="utf-8").read()
+        assert "growth since the previous snapshot" in report
+        assert "test_profiling.py" in report
+        del held
+    finally:
+        snapshots.stop()
+    assert not snapshots.active
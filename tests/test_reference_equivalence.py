@@ -0,0 +1,140 @@
+"""Accelerated engines against brute-force references of the same math."""
+
+import numpy as np
+import pytest
+
+from clustering import algorithms, kmedoids
+from clustering.dbscan_engine import NeighborGraph, dbscan_labels
+from clustering.pointstore import PointStore
+
+
+class _Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+        self.cluster = self.prev_cluster = None
+
+
+def _reference_dbscan(x, y, eps, min_samples):
+    """The original per-point DBSCAN: clusters numbered in visiting order, borders join the first cluster to reach them."""
+    n = x.shape[0]
+    d2 = (x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2
+    neighbors = [np.flatnonzero(row <= eps * eps).tolist() for row in d2]
+    labels = [None] * n
+    visited = [False] * n
+    cluster_id = 0
+    for i in range(n):
+        if visited[i]:
+            continue
+        visited[i] = True
+        if len(neighbors[i]) < min_samples:
+            labels[i] = -1
+            continue
+        labels[i] = cluster_id
+        seeds = list(neighbors[i])
+        in_seed = set(seeds)
+        k = 0
+        while k < len(seeds):
+            j = seeds[k]
+            k += 1
+            if not visited[j]:
+                visited[j] = True
+                if len(neighbors[j]) >= min_samples:
+                    for q in neighbors[j]:
+                        if q not in in_seed:
+                            in_seed.add(q)
+                            seeds.append(q)
+            if labels[j] is None or labels[j] == -1:
+                labels[j] = cluster_id
+        cluster_id += 1
+    return np.array(labels, dtype=np.int32), cluster_id
+
+
+@pytest.mark.parametrize("eps, min_samples", [(12.0, 4), (20.0, 6), (8.0, 2)])
+def test_dbscan_matches_reference(eps, min_samples):
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(0, 300, (4, 2))
+    xy = np.concatenate([rng.normal(c, 15, (120, 2)) for c in centers] + [rng.uniform(0, 300, (60, 2))])
+    x, y = xy[:, 0].copy(), xy[:, 1].copy()
+    labels, n_clusters = dbscan_labels(x, y, eps, min_samples)
+    ref_labels, ref_clusters = _reference_dbscan(x, y, eps, min_samples)
+    assert n_clusters == ref_clusters
+    assert np.array_equal(labels, ref_labels)
+    # The scene's cached path (eps/min_samples tweaks relabel from the neighbor graph)
+    graph, store = NeighborGraph(), PointStore.from_xy(x, y)
+    graph.labels(store, eps * 1.5, min_samples)
+    cached, _n = graph.labels(store, eps, min_samples)
+    assert graph.last_cached
+    assert np.array_equal(cached, ref_labels)
+
+
+def test_hamerly_matches_brute_force_across_moves_and_appends():
+    rng = np.random.default_rng(1)
+    store = PointStore.from_xy(rng.uniform(0, 500, 400), rng.uniform(0, 400, 400))
+    cx, cy = rng.uniform(0, 500, 6), rng.uniform(0, 400, 6)
+    assigner = algorithms.HamerlyAssigner()
+    skipped = 0
+    for step in range(12):
+        labels = assigner.assign(store, cx, cy)
+        expected, _d2 = algorithms.nearest_centroids(store.x, store.y, cx, cy)
+        assert np.array_equal(labels, expected), step
+        skipped += assigner.last_skipped
+        store.set_labels(labels)
+        # Small centroid moves (the bounds' common case) plus new clicked points
+        cx = cx + rng.normal(0, 3, cx.shape)
+        cy = cy + rng.normal(0, 3, cy.shape)
+        for _ in range(step % 3 * 5):
+            store.append(_Point(*rng.uniform(0, 400, 2)))
+    assert skipped > 0
+
+
+def _cost(d, medoids):
+    return d[:, medoids].min(axis=1).sum()
+
+
+@pytest.mark.parametrize("k", [1, 3, 5])
+def test_fastpam_swap_delta_matches_recomputed_cost(k):
+    rng = np.random.default_rng(2 + k)
+    n = 90
+    x, y = rng.uniform(0, 200, n), rng.uniform(0, 200, n)
+    d = np.sqrt((x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2)
+    medoids = rng.choice(n, size=k, replace=False)
+
+    delta, slot, cand, cost = kmedoids.best_swap(lambda cols: d[:, cols], n, medoids)
+
+    base = _cost(d, medoids)
+    naive = np.full((k, n), np.inf)
+    for i in range(k):
+        for j in np.setdiff1d(np.arange(n), medoids):
+            swapped = medoids.copy()
+            swapped[i] = j
+            naive[i, j] = _cost(d, swapped) - base
+    assert cost == pytest.approx(base)
+    assert delta == pytest.approx(naive.min(), abs=1e-6)
+    assert naive[slot, cand] == pytest.approx(naive.min(), abs=1e-6)
+
+
+def test_distance_cache_rebuilds_for_same_size_replacement():
+    rng = np.random.default_rng(9)
+    x, y = rng.uniform(0, 100, 50), rng.uniform(0, 100, 50)
+    cache = kmedoids.PairwiseDistances().ensure(x, y)
+    first = cache.matrix
+    assert cache.ensure(x.copy(), y.copy()).matrix is first
+    # A different dataset of the same size, without calling invalidate()
+    x2 = rng.uniform(0, 100, 50)
+    cache.ensure(x2, y)
+    assert cache.matrix is not first
+    assert cache.matrix[0, 1] == pytest.approx(np.hypot(x2[0] - x2[1], y[0] - y[1]), rel=1e-6)
+
+
+def test_medoid_snap_is_chunked_nearest_point_and_distinct(monkeypatch):
+    monkeypatch.setattr(kmedoids, "_ROW_CHUNK", 64)
+    rng = np.random.default_rng(10)
+    x, y = rng.uniform(0, 300, 500), rng.uniform(0, 300, 500)
+    cx, cy = rng.uniform(0, 300, 7), rng.uniform(0, 300, 7)
+    d = (x[None, :] - cx[:, None]) ** 2 + (y[None, :] - cy[:, None]) ** 2
+    assert np.array_equal(kmedoids.nearest_points(x, y, cx, cy), d.argmin(axis=1))
+
+    # Centers stacked on one spot still snap to k distinct points.
+    engine = kmedoids.KMedoidsEngine(seed=0)
+    medoids = engine._sync(PointStore.from_xy(x, y), np.full(5, 150.0), np.full(5, 150.0))
+    assert np.unique(medoids).size == 5
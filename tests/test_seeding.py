@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from clustering import datasets, seeding
+
+
+def _distinct(idx):
+    return np.unique(idx).size == idx.size
+
+
+@pytest.mark.parametrize("method", seeding.METHODS)
+@pytest.mark.parametrize("n, k", [(500, 1), (500, 8), (500, 50), (5, 5), (3, 8)])
+def test_seed_points_are_distinct_indices(method, n, k):
+    x, y = datasets.uniform(n, rng=0)
+    pick = seeding.seed_points(x, y, k, method, rng=1)
+    assert pick.shape == (min(k, n),)
+    assert _distinct(pick)
+    assert pick.min() >= 0 and pick.max() < n
+
+
+@pytest.mark.parametrize("method", seeding.METHODS)
+def test_seed_points_with_many_duplicates(method):
+    # 400 points on only 3 locations: fewer distinct spots than k
+    rng = np.random.default_rng(0)
+    spots = np.array([[10.0, 10.0], [200.0, 50.0], [90.0, 300.0]])
+    xy = spots[rng.integers(0, 3, 400)]
+    pick = seeding.seed_points(xy[:, 0], xy[:, 1], 6, method, rng=2)
+    assert pick.shape == (6,)
+    assert _distinct(pick)
+    # Every distinct location is used before any is repeated.
+    assert len({tuple(p) for p in xy[pick].tolist()}) == 3
+
+
+@pytest.mark.parametrize("method", seeding.METHODS)
+def test_same_seed_same_start(method):
+    x, y = datasets.blobs(800, centers=5, rng=3)
+    a = seeding.seed_points(x, y, 7, method, rng=11)
+    b = seeding.seed_points(x, y, 7, method, rng=11)
+    assert np.array_equal(a, b)
+
+
+@pytest.mark.parametrize("rounds", [0, 1, 5])
+@pytest.mark.parametrize("oversample", [0.1, 2.0, None])
+def test_kmeans_parallel_always_yields_k_centers(rounds, oversample):
+    # Few rounds or a tiny oversampling factor leave fewer than k candidates;
+    # they are topped up with distinct unused points.
+    x, y = datasets.blobs(300, centers=4, rng=5)
+    rng = np.random.default_rng(4)
+    pick = seeding.kmeans_parallel(x, y, 12, rng, rounds=rounds, oversample=oversample)
+    assert pick.shape == (12,)
+    assert _distinct(pick)
@@ -0,0 +1,153 @@
+import numpy as np
+import pygame
+import pytest
+
+import voronoi
+
+
+class _Centroid:
+    def __init__(self, x, y, color):
+        self.x, self.y, self.color = x, y, color
+        self.target_x, self.target_y = x, y
+
+
+def test_nearest_center_grid_matches_brute_force():
+    rng = np.random.default_rng(0)
+    cx, cy = rng.uniform(0, 300, 7), rng.uniform(0, 200, 7)
+    xs, ys = np.arange(0, 300, 3.0), np.arange(0, 200, 3.0)
+    labels, best = voronoi.nearest_center_grid(cx, cy, xs, ys)
+
+    d = (xs[None, :, None] - cx[:, None, None]) ** 2 + (ys[None, None, :] - cy[:, None, None]) ** 2
+    assert labels.shape == (xs.size, ys.size)
+    assert np.array_equal(labels, d.argmin(axis=0))
+    assert np.allclose(best, d.min(axis=0))
+
+
+def test_surface_colors_follow_nearest_centroid():
+    centroids = [_Centroid(100, 100, (255, 0, 0)), _Centroid(500, 300, (0, 255, 0)), _Centroid(300, 500, (0, 0, 255))]
+    for cell, x_scale in ((1, 1.0), (7, 1.0), (4, 0.5)):
+        s = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 600, 600, cell_size=cell, x_scale=x_scale, alpha=45)
+        assert s.get_size() == (600, 600)
+        for c in centroids:
+            assert tuple(s.get_at((int(c.x * x_scale), int(c.y)))) == (*c.color, 45)
+
+
+def test_cache_hit_returns_same_surface():
+    cache = voronoi.VoronoiCache()
+    centroids = [_Centroid(10, 10, (255, 0, 0)), _Centroid(50, 50, (0, 255, 0))]
+    first = voronoi.get_voronoi_surface(centroids, cache, 80, 60)
+    assert voronoi.get_voronoi_surface(centroids, cache, 80, 60) is first
+
+
+def test_stays_cached_while_centroids_glide():
+    cache = voronoi.VoronoiCache()
+    centroids = [_Centroid(10, 10, (255, 0, 0)), _Centroid(50, 50, (0, 255, 0))]
+    centroids[0].target_x = 30
+    first = voronoi.get_voronoi_surface(centroids, cache, 80, 60, tolerance=1.0)
+    # The drawn position animates towards the target; the regions do not change.
+    centroids[0].x = 20
+    assert voronoi.get_voronoi_surface(centroids, cache, 80, 60, tolerance=1.0) is first
+    centroids[0].target_x = 30.5
+    assert voronoi.get_voronoi_surface(centroids, cache, 80, 60, tolerance=1.0) is first
+    assert cache.full_updates == 1
+
+
+def test_partial_update_matches_full_render():
+    rng = np.random.default_rng(1)
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 255, 255), (255, 0, 255)]
+    centroids = [_Centroid(*rng.uniform(0, 300, 2), color) for color in colors]
+    cache = voronoi.VoronoiCache()
+    voronoi.get_voronoi_surface(centroids, cache, 300, 200, cell_size=3)
+    for moved in ([2], [0, 4], [5]):
+        for i in moved:
+            centroids[i].target_x, centroids[i].target_y = rng.uniform(0, 300, 2)
+        patched = voronoi.get_voronoi_surface(centroids, cache, 300, 200, cell_size=3)
+        full = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 300, 200, cell_size=3)
+        assert np.array_equal(pygame.surfarray.array2d(patched), pygame.surfarray.array2d(full))
+    assert cache.partial_updates == 3
+
+
+def _area(poly):
+    return 0.5 * abs(sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(poly, poly[1:] + poly[:1])))
+
+
+def test_cell_polygons_tile_the_rect():
+    rng = np.random.default_rng(2)
+    cx, cy = rng.uniform(0, 400, 8), rng.uniform(0, 300, 8)
+    polygons = voronoi.cell_polygons(cx, cy, 400, 300)
+    assert sum(_area(p) for p in polygons) == pytest.approx(400 * 300)
+    for i, poly in enumerate(polygons):
+        # Every vertex is at least as close to its own center as to any other.
+        for x, y in poly:
+            d = (cx - x) ** 2 + (cy - y) ** 2
+            assert d[i] <= d.min() + 1e-6
+
+
+def test_cell_polygons_duplicate_center_goes_to_lower_index():
+    polygons = voronoi.cell_polygons([50, 50, 150], [50, 50, 50], 200, 100)
+    assert _area(polygons[0]) == pytest.approx(100 * 100)
+    assert polygons[1] == []
+
+
+def test_polygon_mode_matches_per_pixel_raster():
+    rng = np.random.default_rng(3)
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 255, 255)]
+    centroids = [_Centroid(*rng.uniform(0, 200, 2), color) for color in colors]
+    for x_scale in (1.0, 0.5):
+        polygons = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 240, 200, x_scale=x_scale, mode="polygons")
+        raster = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 240, 200, cell_size=1, x_scale=x_scale)
+        same = pygame.surfarray.array2d(polygons) == pygame.surfarray.array2d(raster)
+        # Only pixels on region boundaries may differ.
+        assert same.mean() > 0.99
+        assert (pygame.surfarray.array_alpha(polygons) == 45).all()
+
+
+def test_quadtree_labels_match_full_grid_with_fewer_evaluations():
+    rng = np.random.default_rng(4)
+    cx, cy = rng.uniform(0, 500, 9).astype(np.float32), rng.uniform(0, 300, 9).astype(np.float32)
+    xs, ys = np.arange(500, dtype=np.float32) + 0.5, np.arange(300, dtype=np.float32) + 0.5
+    labels, evaluated = voronoi.quadtree_center_grid(cx, cy, xs, ys, block=16)
+    assert np.array_equal(labels, voronoi.nearest_center_grid(cx, cy, xs, ys)[0])
+    assert evaluated < xs.size * ys.size // 5
+
+
+def test_quadtree_mode_matches_raster_surface():
+    rng = np.random.default_rng(5)
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+    centroids = [_Centroid(*rng.uniform(0, 200, 2), color) for color in colors]
+    for cell in (1, 3):
+        quad = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 230, 170, cell_size=cell, mode="quadtree")
+        raster = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 230, 170, cell_size=cell)
+        assert np.array_equal(pygame.surfarray.array2d(quad), pygame.surfarray.array2d(raster))
+
+
+def test_background_keeps_stale_surface_until_rebuilt():
+    renderer = voronoi.BackgroundVoronoi()
+    centroids = [_Centroid(20, 20, (255, 0, 0)), _Centroid(60, 40, (0, 255, 0))]
+    # Nothing to show yet: the first surface is built right away.
+    first = renderer.surface(centroids, 80, 60, cell_size=1)
+    assert first is not None and not renderer.rebuilding
+    assert renderer.surface(centroids, 80, 60, cell_size=1) is first
+
+    centroids[1].target_x = 10
+    assert renderer.surface(centroids, 80, 60, cell_size=1) is first
+    renderer.wait()
+    fresh = renderer.surface(centroids, 80, 60, cell_size=1)
+    assert fresh is not first and renderer.stale_frames >= 1
+    expected = voronoi.get_voronoi_surface(centroids, voronoi.VoronoiCache(), 80, 60, cell_size=1)
+    assert np.array_equal(pygame.surfarray.array2d(fresh), pygame.surfarray.array2d(expected))
+    # The surface that was shown is a copy, not the grid later rebuilds patch in place.
+    assert tuple(first.get_at((70, 50)))[:3] == (0, 255, 0)
+
+    renderer.invalidate(keep_stale=False)
+    assert renderer.surface(centroids, 80, 60, cell_size=1) is not fresh and not renderer.rebuilding
+
+
+def test_background_reraises_worker_errors():
+    renderer = voronoi.BackgroundVoronoi()
+    centroids = [_Centroid(20, 20, (255, 0, 0)), _Centroid(60, 40, (0, 255, 0))]
+    renderer.surface(centroids, 80, 60)
+    centroids[0].target_x = 50
+    renderer.surface(centroids, 80, 60, mode="hexagons")
+    with pytest.raises(ValueError):
+        renderer.wait()